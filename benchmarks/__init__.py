@@ -0,0 +1 @@
+"""Benchmarks for wnnet, run with `asv <https://asv.readthedocs.io>`_."""
@@ -0,0 +1,143 @@
+"""Timing and memory benchmarks for wnnet.
+
+The benchmarks follow the `asv <https://asv.readthedocs.io>`_ conventions: methods starting with *time_* are timed and methods starting with *peakmem_* record the peak memory of the process.  The network and zone XML files are generated once per run by :mod:`benchmarks.synthetic`.
+"""
+
+import os
+import wnutils.xml as wx
+import wnnet.net as wn
+import wnnet.flows as wf
+import wnnet.graph as wg
+import wnnet.zones as wz
+from . import synthetic
+
+#: The benchmark sizes, given as (number of species, reactions per species, number of zones).
+SIZES = {
+    "small": (50, 4, 10),
+    "medium": (200, 6, 20),
+}
+
+
+def _get_files(size):
+    return (f"net_{size}.xml", f"zones_{size}.xml")
+
+
+class _Network:
+    params = list(SIZES.keys())
+    param_names = ["size"]
+    timeout = 600
+
+    def setup_cache(self):
+        for size, (n_species, reactions_per_species, n_zones) in SIZES.items():
+            network_file, zone_file = _get_files(size)
+            synthetic.write_network_and_zones(
+                network_file,
+                zone_file,
+                n_species=n_species,
+                reactions_per_species=reactions_per_species,
+                n_zones=n_zones,
+            )
+        return os.getcwd()
+
+    def setup(self, directory, size):
+        network_file, zone_file = _get_files(size)
+        self.network_file = os.path.join(directory, network_file)
+        self.net = wn.Net(self.network_file)
+        self.zones = wx.Xml(os.path.join(directory, zone_file)).get_zone_data()
+        zone = self.zones[next(iter(self.zones))]
+        self.t9 = float(zone["properties"]["t9"])
+        self.rho = float(zone["properties"]["rho"])
+        self.mass_fractions = zone["mass fractions"]
+
+
+class Loading(_Network):
+    """Benchmarks of reading a network."""
+
+    def time_load_network(self, directory, size):
+        wn.Net(self.network_file)
+
+    def peakmem_load_network(self, directory, size):
+        wn.Net(self.network_file)
+
+
+class Rates(_Network):
+    """Benchmarks of rate computations."""
+
+    def time_compute_rates(self, directory, size):
+        self.net.compute_rates(self.t9)
+
+    def time_compute_Q_values(self, directory, size):
+        self.net.compute_Q_values()
+
+    # The Q values are stored in the network, so each sample must use the
+    # fresh network from setup.
+    time_compute_Q_values.number = 1
+    time_compute_Q_values.warmup_time = 0
+
+
+class Flows(_Network):
+    """Benchmarks of flow computations."""
+
+    def setup(self, directory, size):
+        super().setup(directory, size)
+        abundances = wz.Zone_Abundances(self.net, self.zones)
+        self.species = abundances.species
+        self.abundances = abundances.abundances.toarray()
+
+    def time_compute_flows(self, directory, size):
+        wf.compute_flows(self.net, self.t9, self.rho, self.mass_fractions)
+
+    def time_compute_flows_for_zones(self, directory, size):
+        wf.compute_flows_for_zones(self.net, self.zones)
+
+    def peakmem_compute_flows_for_zones(self, directory, size):
+        wf.compute_flows_for_zones(self.net, self.zones)
+
+    def time_compute_flows_for_abundances(self, directory, size):
+        # One temperature and density for all the zones
+        wf.compute_flows_for_abundances(
+            self.net, self.t9, self.rho, self.abundances, self.species
+        )
+
+    def time_compute_link_flows(self, directory, size):
+        wf.compute_link_flows(self.net, self.t9, self.rho, self.mass_fractions)
+
+    def time_compute_link_flows_for_zones(self, directory, size):
+        wf.compute_link_flows_for_zones(self.net, self.zones, include_dt=True)
+
+    def peakmem_compute_link_flows_for_zones(self, directory, size):
+        wf.compute_link_flows_for_zones(self.net, self.zones, include_dt=True)
+
+
+class Graphs(_Network):
+    """Benchmarks of graph creation."""
+
+    def time_create_network_graph(self, directory, size):
+        wg.create_network_graph(self.net)
+
+    # The topology is stored in the network, so each sample must use the
+    # fresh network from setup.
+    time_create_network_graph.number = 1
+    time_create_network_graph.warmup_time = 0
+
+    def time_create_flow_graph(self, directory, size):
+        wg.create_flow_graph(self.net, self.t9, self.rho, self.mass_fractions)
+
+    def time_create_zone_flow_graphs(self, directory, size):
+        wg.create_zone_flow_graphs(self.net, self.zones)
+
+    def peakmem_create_zone_flow_graphs(self, directory, size):
+        wg.create_zone_flow_graphs(self.net, self.zones)
+
+
+class Import:
+    """Benchmarks of the time to import wnnet in a fresh interpreter."""
+
+    def timeraw_import_wnnet(self):
+        return "import wnnet"
+
+    def timeraw_import_net(self):
+        return "import wnnet.net"
+
+    def timeraw_import_graph(self):
+        return "import wnnet.graph"
@@ -0,0 +1,253 @@
+"""This module generates synthetic `webnucleo <https://webnucleo.readthedocs.io>`_ network and zone XML files of configurable size for benchmarking."""
+
+import argparse
+import numpy as np
+import wnutils.xml as wx
+
+#: The reactions created for each nuclide, given as (change in Z, change in A, nuclide reactants, nuclide products, other reactants, other products, rate type).
+REACTION_TEMPLATES = (
+    (0, 1, ["n"], [], [], ["gamma"], "non_smoker_fit"),
+    (1, 1, ["h1"], [], [], ["gamma"], "non_smoker_fit"),
+    (2, 4, ["he4"], [], [], ["gamma"], "rate_table"),
+    (1, 0, [], [], [], ["electron", "anti-neutrino_e"], "single_rate"),
+    (2, 3, ["he4"], ["n"], [], [], "non_smoker_fit"),
+    (1, 0, ["h1"], ["n"], [], [], "non_smoker_fit"),
+    (-1, 0, [], [], [], ["positron", "neutrino_e"], "single_rate"),
+    (1, 3, ["he4"], ["h1"], [], [], "rate_table"),
+)
+
+
+def _create_rate_data(rate_type, rng):
+    if rate_type == "single_rate":
+        return {"type": rate_type, "rate": float(rng.uniform(1.0e-3, 1.0))}
+    if rate_type == "rate_table":
+        t9 = np.array([0.1, 0.3, 1.0, 3.0, 10.0])
+        return {
+            "type": rate_type,
+            "t9": t9,
+            "rate": np.power(10.0, rng.uniform(0, 2)) * np.power(t9, 1.5),
+            "sef": np.ones(len(t9)),
+        }
+    return {
+        "type": rate_type,
+        "fits": [
+            {
+                "a1": float(rng.normal(10.0, 2.0)),
+                "a2": float(rng.uniform(-1.0, 0.0)),
+                "a3": float(rng.normal(-5.0, 1.0)),
+                "a4": float(rng.normal(0.0, 1.0)),
+                "a5": float(rng.normal(0.0, 0.1)),
+                "a6": float(rng.normal(0.0, 0.01)),
+                "a7": float(rng.normal(-1.0, 0.5)),
+                "Tlowfit": 0.01,
+                "Thighfit": 10.0,
+            }
+        ],
+    }
+
+
+def create_nuclides(n_species, n_partf=8, rng=None):
+    """A routine to create the data for a synthetic set of nuclides.
+
+    The nuclides are added element by element, starting with the neutron, protium, and helium-4, with a band of isotopes around the line of stability for each element until *n_species* nuclides are created.
+
+    Args:
+        ``n_species`` (:obj:`int`): The number of nuclides to create.
+
+        ``n_partf`` (:obj:`int`, optional): The number of points in each partition function table.  Default is 8.
+
+        ``rng`` (:obj:`numpy.random.Generator`, optional): The random number generator.  Default is a generator with seed 0.
+
+    Returns:
+        A :obj:`dict` of `wnutils <https://wnutils.readthedocs.io>`_ nuclide data.
+
+    """
+
+    rng = rng or np.random.default_rng(0)
+    xml = wx.New_Xml("nuclear_data")
+    t9 = np.geomspace(0.1, 10.0, n_partf)
+
+    za = [(0, 1), (1, 1), (2, 4)]
+    z = 3
+    while len(za) < n_species:
+        for a in range(2 * z - 1, 2 * z + 7):
+            za.append((z, a))
+        z += 1
+
+    result = {}
+    for z, a in za[:n_species]:
+        name = xml.create_nuclide_name(z, a, "")
+        result[name] = {
+            "z": z,
+            "a": a,
+            "state": "",
+            "source": "synthetic",
+            "mass excess": float(rng.normal(0.0, 10.0)),
+            "spin": 0.5 * (a % 2),
+            "t9": t9,
+            "partf": 1.0 + 0.01 * rng.uniform() * t9,
+        }
+
+    return result
+
+
+def create_reactions(nuclides, reactions_per_species=4, rng=None):
+    """A routine to create the data for synthetic reactions among a set of nuclides.
+
+    Args:
+        ``nuclides`` (:obj:`dict`): The nuclide data, as returned by :func:`create_nuclides`.
+
+        ``reactions_per_species`` (:obj:`int`, optional): The maximum number of reactions with each nuclide as the target, taken in order from :data:`REACTION_TEMPLATES`.  Default is 4.
+
+        ``rng`` (:obj:`numpy.random.Generator`, optional): The random number generator.  Default is a generator with seed 1.
+
+    Returns:
+        A :obj:`dict` of `wnutils <https://wnutils.readthedocs.io>`_ reactions.
+
+    """
+
+    rng = rng or np.random.default_rng(1)
+    xml = wx.New_Xml("reaction_data")
+
+    result = {}
+    for name, data in nuclides.items():
+        if data["z"] < 3:
+            continue
+        for template in REACTION_TEMPLATES[:reactions_per_species]:
+            d_z, d_a, in_nucs, out_nucs, in_other, out_other, rate_type = (
+                template
+            )
+            product = xml.create_nuclide_name(
+                data["z"] + d_z, data["a"] + d_a, ""
+            )
+            if product not in nuclides:
+                continue
+            reaction = wx.Reaction()
+            reaction.nuclide_reactants = [name] + in_nucs
+            reaction.nuclide_products = [product] + out_nucs
+            reaction.reactants = reaction.nuclide_reactants + in_other
+            reaction.products = reaction.nuclide_products + out_other
+            reaction.source = "synthetic"
+            reaction.data = _create_rate_data(rate_type, rng)
+            result[reaction.get_string()] = reaction
+
+    return result
+
+
+def create_zones(nuclides, n_zones, fill_fraction=0.5, rng=None):
+    """A routine to create synthetic zone data for a set of nuclides.
+
+    The zones follow an expanding and cooling trajectory, and each has the properties *time*, *t9*, *rho*, and *dt*.
+
+    Args:
+        ``nuclides`` (:obj:`dict`): The nuclide data, as returned by :func:`create_nuclides`.
+
+        ``n_zones`` (:obj:`int`): The number of zones to create.
+
+        ``fill_fraction`` (:obj:`float`, optional): The fraction of the nuclides with a non-zero mass fraction in each zone.  Default is 0.5.
+
+        ``rng`` (:obj:`numpy.random.Generator`, optional): The random number generator.  Default is a generator with seed 2.
+
+    Returns:
+        A :obj:`dict` of `wnutils <https://wnutils.readthedocs.io>`_ zone data.
+
+    """
+
+    rng = rng or np.random.default_rng(2)
+    names = list(nuclides.keys())
+
+    result = {}
+    for i in range(n_zones):
+        time = 0.1 * (i + 1)
+        selected = rng.uniform(size=len(names)) < fill_fraction
+        x = rng.uniform(size=len(names)) * selected
+        x /= max(x.sum(), 1.0e-300)
+        mass_fractions = {}
+        for j in np.flatnonzero(selected):
+            name = names[j]
+            key = (name, nuclides[name]["z"], nuclides[name]["a"])
+            mass_fractions[key] = float(x[j])
+        result[str(i)] = {
+            "properties": {
+                "time": str(time),
+                "t9": str(9.0 * np.exp(-time / 3.0) + 0.05),
+                "rho": str(1.0e8 * np.exp(-time)),
+                "dt": str(0.1),
+            },
+            "mass fractions": mass_fractions,
+        }
+
+    return result
+
+
+def write_network_and_zones(
+    network_file,
+    zone_file,
+    n_species=100,
+    reactions_per_species=4,
+    n_zones=50,
+    n_partf=8,
+    seed=0,
+):
+    """A routine to write synthetic network and zone XML files.
+
+    Args:
+        ``network_file`` (:obj:`str`): The name of the network XML file to write.
+
+        ``zone_file`` (:obj:`str`): The name of the zone XML file to write.
+
+        ``n_species`` (:obj:`int`, optional): The number of nuclides.  Default is 100.
+
+        ``reactions_per_species`` (:obj:`int`, optional): The maximum number of reactions per target nuclide.  Default is 4.
+
+        ``n_zones`` (:obj:`int`, optional): The number of zones.  Default is 50.
+
+        ``n_partf`` (:obj:`int`, optional): The number of points in each partition function table.  Default is 8.
+
+        ``seed`` (:obj:`int`, optional): The seed of the random number generator.  Default is 0.
+
+    Returns:
+        On successful return, the files have been written.
+
+    """
+
+    rng = np.random.default_rng(seed)
+
+    nuclides = create_nuclides(n_species, n_partf=n_partf, rng=rng)
+
+    net_xml = wx.New_Xml("nuclear_network")
+    net_xml.set_nuclide_data(nuclides)
+    net_xml.set_reaction_data(
+        create_reactions(
+            nuclides, reactions_per_species=reactions_per_species, rng=rng
+        )
+    )
+    net_xml.write(network_file)
+
+    zone_xml = wx.New_Xml("zone_data")
+    zone_xml.set_zone_data(create_zones(nuclides, n_zones, rng=rng))
+    zone_xml.write(zone_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Write synthetic webnucleo network and zone XML files."
+    )
+    parser.add_argument("network_file")
+    parser.add_argument("zone_file")
+    parser.add_argument("--species", type=int, default=100)
+    parser.add_argument("--reactions-per-species", type=int, default=4)
+    parser.add_argument("--zones", type=int, default=50)
+    parser.add_argument("--partf-points", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_network_and_zones(
+        args.network_file,
+        args.zone_file,
+        n_species=args.species,
+        reactions_per_species=args.reactions_per_species,
+        n_zones=args.zones,
+        n_partf=args.partf_points,
+        seed=args.seed,
+    )
@@ -0,0 +1,207 @@
+"""Fixtures for the wnnet tests: a small network and a set of zones written to temporary XML files."""
+
+import numpy as np
+import pytest
+import wnutils.xml as wx
+import wnnet.net as wn
+import wnnet.zones as wz
+
+#: The reactions created for each nuclide, given as (change in Z, change in A, other nuclide reactants, other products, rate type).
+REACTION_TEMPLATES = (
+    (0, 1, ["n"], ["gamma"], "non_smoker_fit"),
+    (1, 1, ["h1"], ["gamma"], "non_smoker_fit"),
+    (2, 4, ["he4"], ["gamma"], "rate_table"),
+    (1, 0, [], ["electron", "anti-neutrino_e"], "single_rate"),
+    (2, 3, ["he4"], ["n"], "non_smoker_fit"),
+)
+
+
+def _create_nuclides(rng):
+    xml = wx.New_Xml("nuclear_data")
+    t9 = np.array([0.1, 0.3, 1.0, 3.0, 10.0])
+
+    za = [(0, 1), (1, 1), (2, 4)]
+    for z in range(3, 11):
+        za += [(z, a) for a in range(2 * z - 1, 2 * z + 4)]
+
+    result = {}
+    for z, a in za:
+        result[xml.create_nuclide_name(z, a, "")] = {
+            "z": z,
+            "a": a,
+            "state": "",
+            "source": "test",
+            "mass excess": float(rng.normal(0.0, 10.0)),
+            "spin": 0.5 * (a % 2),
+            "t9": t9,
+            "partf": 1.0 + 0.1 * rng.uniform() * t9,
+        }
+
+    return result
+
+
+def _create_rate_data(rate_type, rng):
+    if rate_type == "single_rate":
+        return {"type": rate_type, "rate": float(rng.uniform(1.0e-3, 1.0))}
+    if rate_type == "rate_table":
+        t9 = np.array([0.1, 0.3, 1.0, 3.0, 10.0])
+        return {
+            "type": rate_type,
+            "t9": t9,
+            "rate": np.power(10.0, rng.uniform(0, 2)) * np.power(t9, 1.5),
+            "sef": np.ones(len(t9)),
+        }
+    return {
+        "type": rate_type,
+        "fits": [
+            {
+                "a1": float(rng.normal(10.0, 2.0)),
+                "a2": float(rng.uniform(-1.0, 0.0)),
+                "a3": float(rng.normal(-5.0, 1.0)),
+                "a4": float(rng.normal(0.0, 1.0)),
+                "a5": float(rng.normal(0.0, 0.1)),
+                "a6": float(rng.normal(0.0, 0.01)),
+                "a7": float(rng.normal(-1.0, 0.5)),
+                "Tlowfit": 0.01,
+                "Thighfit": 10.0,
+            }
+        ],
+    }
+
+
+def _create_reaction(nuclide_reactants, nuclide_products, others, data):
+    reaction = wx.Reaction()
+    reaction.nuclide_reactants = nuclide_reactants
+    reaction.nuclide_products = nuclide_products
+    reaction.reactants = list(nuclide_reactants)
+    reaction.products = nuclide_products + others
+    reaction.source = "test"
+    reaction.data = data
+    return reaction
+
+
+def _create_reactions(nuclides, rng):
+    xml = wx.New_Xml("reaction_data")
+
+    result = {}
+    for name, data in nuclides.items():
+        if data["z"] < 3:
+            continue
+        for d_z, d_a, in_nucs, out, rate_type in REACTION_TEMPLATES:
+            product = xml.create_nuclide_name(
+                data["z"] + d_z, data["a"] + d_a, ""
+            )
+            if product not in nuclides:
+                continue
+            out_nucs = [sp for sp in out if sp in nuclides]
+            reaction = _create_reaction(
+                [name] + in_nucs,
+                [product] + out_nucs,
+                [sp for sp in out if sp not in nuclides],
+                _create_rate_data(rate_type, rng),
+            )
+            result[reaction.get_string()] = reaction
+
+    for reaction in (
+        _create_reaction(
+            ["he4", "he4", "he4"],
+            ["c12"],
+            ["gamma"],
+            _create_rate_data("non_smoker_fit", rng),
+        ),
+        _create_reaction(
+            ["c12", "c12"],
+            ["ne20", "he4"],
+            [],
+            {"type": "user_rate", "key": "my_rate"},
+        ),
+        _create_reaction(
+            ["n13"],
+            ["c13"],
+            ["positron", "neutrino_e"],
+            _create_rate_data("single_rate", rng),
+        ),
+        # Reactions that are not valid: one does not conserve charge and
+        # one has a product that is not in the network.
+        _create_reaction(
+            ["c12", "h1"],
+            ["n13"],
+            ["electron"],
+            _create_rate_data("single_rate", rng),
+        ),
+        _create_reaction(
+            ["ne22", "h1"],
+            ["na23"],
+            ["gamma"],
+            _create_rate_data("non_smoker_fit", rng),
+        ),
+    ):
+        result[reaction.get_string()] = reaction
+
+    return result
+
+
+def _create_zones(nuclides, rng):
+    names = list(nuclides.keys())
+
+    # Zones 2 and 3 share a temperature.
+
+    t9 = [3.0, 2.5, 2.0, 2.0, 1.5, 1.2, 1.0, 0.8]
+
+    result = {}
+    for i, t in enumerate(t9):
+        selected = rng.uniform(size=len(names)) < 0.6
+        x = rng.uniform(size=len(names)) * selected
+        x /= x.sum()
+        result[str(i)] = {
+            "properties": {
+                "time": str(0.1 * (i + 1)),
+                "t9": str(t),
+                "rho": str(1.0e6 / (i + 1)),
+                "dt": str(0.1),
+            },
+            "mass fractions": {
+                (names[j], nuclides[names[j]]["z"], nuclides[names[j]]["a"]): (
+                    float(x[j])
+                )
+                for j in np.flatnonzero(selected)
+            },
+        }
+
+    return result
+
+
+@pytest.fixture(scope="session")
+def files(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    directory = tmp_path_factory.mktemp("data")
+
+    nuclides = _create_nuclides(rng)
+
+    network_file = str(directory / "net.xml")
+    net_xml = wx.New_Xml("nuclear_network")
+    net_xml.set_nuclide_data(nuclides)
+    net_xml.set_reaction_data(_create_reactions(nuclides, rng))
+    net_xml.write(network_file)
+
+    zone_file = str(directory / "zones.xml")
+    zone_xml = wx.New_Xml("zone_data")
+    zone_xml.set_zone_data(_create_zones(nuclides, rng))
+    zone_xml.write(zone_file)
+
+    return network_file, zone_file
+
+
+@pytest.fixture
+def net(files):
+    return wn.Net(files[0])
+
+
+@pytest.fixture
+def zones(files):
+    return wz.Zones_Xml(files[1]).get_zones()
+
+
+@pytest.fixture
+def user_funcs():
+    return {"my_rate": lambda reaction, t9, zone: 2.0 * t9}
@@ -0,0 +1,91 @@
+import wnnet.cache as wca
+import wnnet.net as wn
+
+NUC_XPATHS = ["", "[z < 6]", "[a > 10]", "[z >= 4 and z < 9]"]
+
+
+def _get_cache():
+    cache = wca.Selection_Cache()
+    cache[""] = {name: {"z": i} for i, name in enumerate("abcdef")}
+    return cache
+
+
+def test_selection_views_share_base_objects():
+    cache = _get_cache()
+    base = cache[""]
+
+    cache["x"] = {"b": {"z": 1}, "d": {"z": 3}, "q": {"z": -1}}
+    view = cache["x"]
+
+    assert list(view.keys()) == ["b", "d", "q"]
+    assert view["b"] is base["b"]
+    assert view["d"] is base["d"]
+    assert view["q"] == {"z": -1}
+    assert cache["x"] is view
+
+
+def test_selection_views_are_dropped_before_entries():
+    cache = _get_cache()
+
+    for key in ["x", "y", "z"]:
+        cache[key] = {"a": {"z": 0}, "f": {"z": 5}}
+
+    statistics = cache.get_statistics()
+    assert statistics["entries"] == 3
+    assert statistics["views"] == 3
+
+    cache.set_policy(max_bytes=statistics["bytes"] - 1)
+
+    statistics = cache.get_statistics()
+    assert statistics["entries"] == 3
+    assert statistics["views"] == 2
+    assert statistics["evictions"] == 0
+
+    assert list(cache["x"].keys()) == ["a", "f"]
+    assert cache["x"]["f"] is cache[""]["f"]
+
+    cache.set_policy(max_entries=1)
+
+    statistics = cache.get_statistics()
+    assert statistics["entries"] == 1
+    assert statistics["evictions"] == 2
+    assert "x" in cache
+    assert "" in cache
+
+
+def test_lru_cache_policy():
+    cache = wca.LRU_Cache(max_entries=2)
+
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+
+    assert list(cache.keys()) == ["a", "c"]
+    assert cache.get("b") is None
+
+    statistics = cache.get_statistics()
+    assert statistics["hits"] == 1
+    assert statistics["misses"] == 1
+    assert statistics["evictions"] == 1
+
+
+def test_bounded_caches_match_fresh_network(files):
+    net = wn.Net(files[0])
+    net.set_cache_policy(max_entries=1, max_bytes=1)
+
+    for _ in range(2):
+        for nuc_xpath in NUC_XPATHS:
+            fresh = wn.Net(files[0])
+            assert list(net.get_nuclides(nuc_xpath=nuc_xpath)) == list(
+                fresh.get_nuclides(nuc_xpath=nuc_xpath)
+            )
+            assert list(net.get_valid_reactions(nuc_xpath=nuc_xpath)) == list(
+                fresh.get_valid_reactions(nuc_xpath=nuc_xpath)
+            )
+            assert net.compute_Q_values(
+                nuc_xpath=nuc_xpath
+            ) == fresh.compute_Q_values(nuc_xpath=nuc_xpath)
+
+    for statistics in net.get_cache_statistics().values():
+        assert statistics["entries"] <= 1
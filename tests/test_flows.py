@@ -0,0 +1,324 @@
+import numpy as np
+import pytest
+import wnnet.flows as wf
+import wnnet.rates as wrt
+import wnnet.zones as wz
+
+USER_REACTION = "c12 + c12 -> ne20 + he4"
+
+
+def _assert_flows_close(flows, reference, rtol=1e-12):
+    assert list(flows.keys()) == list(reference.keys())
+    for r in reference:
+        np.testing.assert_allclose(flows[r], reference[r], rtol=rtol, atol=0)
+
+
+def _assert_zone_flows_close(zone_flows, reference, rtol=1e-12):
+    assert list(zone_flows.keys()) == list(reference.keys())
+    for zone in reference:
+        _assert_flows_close(zone_flows[zone], reference[zone], rtol=rtol)
+
+
+def test_batch_user_rates_match_zone_user_rates(net, zones, user_funcs):
+    calls = []
+
+    @wrt.batch_user_rate
+    def my_rate(reaction, t9, zones):
+        calls.append(len(t9))
+        return 2.0 * t9
+
+    reference = wf.compute_flows_for_zones(net, zones, user_funcs=user_funcs)
+
+    _assert_zone_flows_close(
+        wf.compute_flows_for_zones(
+            net, zones, user_funcs={"my_rate": my_rate}
+        ),
+        reference,
+    )
+    assert calls == [len(zones)]
+
+    assert any(reference[zone][USER_REACTION][0] != 0 for zone in zones)
+
+
+def test_user_rates_are_only_evaluated_when_needed(net, zones):
+    calls = []
+
+    def my_rate(reaction, t9, zone):
+        calls.append(zone)
+        return 2.0 * t9
+
+    wf.compute_flows_for_zones(
+        net,
+        zones,
+        reac_xpath="[reactant = 'n']",
+        user_funcs={"my_rate": my_rate},
+    )
+    assert calls == []
+
+    accumulator = wf.Link_Flow_Accumulator(
+        net, reac_xpath="[reactant = 'n']", user_funcs={"my_rate": my_rate}
+    )
+    accumulator.add_zones(zones)
+    assert calls == []
+
+    wf.compute_flows_for_zones(net, zones, user_funcs={"my_rate": my_rate})
+    assert len(calls) == len(zones)
+
+
+def test_batch_user_rates_in_single_state_routines(net, zones):
+    zone = zones[next(iter(zones))]
+
+    @wrt.batch_user_rate
+    def my_batch_rate(reaction, t9, zones):
+        assert zones is None
+        return 2.0 * t9
+
+    reference = wf.compute_flows(
+        net,
+        2.0,
+        1.0e5,
+        zone["mass fractions"],
+        user_funcs={"my_rate": lambda reaction, t9: 2.0 * t9},
+    )
+
+    _assert_flows_close(
+        wf.compute_flows(
+            net,
+            2.0,
+            1.0e5,
+            zone["mass fractions"],
+            user_funcs={"my_rate": my_batch_rate},
+        ),
+        reference,
+    )
+    assert net.compute_rates_for_reaction(
+        USER_REACTION, 2.0, user_funcs={"my_rate": my_batch_rate}
+    ) == net.compute_rates_for_reaction(
+        USER_REACTION,
+        2.0,
+        user_funcs={"my_rate": lambda reaction, t9: 2.0 * t9},
+    )
+
+
+def _get_abundances(net, zones):
+    species = list(net.get_nuclides().keys())
+    index = {sp: i for i, sp in enumerate(species)}
+    y = np.zeros((len(zones), len(species)))
+    for i, zone in enumerate(zones):
+        for key, x in zones[zone]["mass fractions"].items():
+            y[i, index[key[0]]] = x / key[2]
+    return y, species
+
+
+def _get_zone_states(zones):
+    return (
+        np.array([float(zones[z]["properties"]["t9"]) for z in zones]),
+        np.array([float(zones[z]["properties"]["rho"]) for z in zones]),
+    )
+
+
+def test_abundance_flows_match_zone_flows(net, zones, user_funcs):
+    reference = wf.compute_flows_for_zones(net, zones, user_funcs=user_funcs)
+    y, species = _get_abundances(net, zones)
+    t9, rho = _get_zone_states(zones)
+
+    @wrt.batch_user_rate
+    def my_rate(reaction, t9, zones):
+        return 2.0 * t9
+
+    flows = wf.compute_flows_for_abundances(
+        net, t9, rho, y, species, user_funcs={"my_rate": my_rate}
+    )
+
+    assert flows["forward"].shape == (len(zones), len(flows["reactions"]))
+    for i, zone in enumerate(zones):
+        _assert_flows_close(
+            dict(
+                zip(
+                    flows["reactions"],
+                    zip(flows["forward"][i], flows["reverse"][i]),
+                )
+            ),
+            reference[zone],
+        )
+
+
+def test_abundance_flows_for_one_state(net, zones):
+    user_funcs = {"my_rate": lambda reaction, t9: 2.0 * t9}
+    zone = zones[next(iter(zones))]
+    reference = wf.compute_flows(
+        net, 2.0, 1.0e5, zone["mass fractions"], user_funcs=user_funcs
+    )
+    y, species = _get_abundances(net, {"0": zone})
+
+    flows = wf.compute_flows_for_abundances(
+        net, 2.0, 1.0e5, y[0], species, user_funcs=user_funcs
+    )
+    assert flows["forward"].shape == (len(flows["reactions"]),)
+    _assert_flows_close(
+        dict(zip(flows["reactions"], zip(flows["forward"], flows["reverse"]))),
+        reference,
+    )
+
+    # A single state is shared by all the rows.
+
+    flows = wf.compute_flows_for_abundances(
+        net,
+        2.0,
+        1.0e5,
+        np.vstack((y[0], y[0])),
+        species,
+        user_funcs=user_funcs,
+    )
+    assert np.array_equal(flows["forward"][0], flows["forward"][1])
+
+    with pytest.raises(ValueError):
+        wf.compute_flows_for_abundances(
+            net, [2.0, 3.0], 1.0e5, y[0], species, user_funcs=user_funcs
+        )
+
+
+def test_rate_stage_matches_flows(net, zones):
+    user_funcs = {"my_rate": lambda reaction, t9: 2.0 * t9}
+    stage = wf.Rate_Stage(net, 2.0, 1.0e5, user_funcs=user_funcs)
+    y, species = _get_abundances(net, zones)
+
+    for zone in zones:
+        mass_fractions = zones[zone]["mass fractions"]
+        _assert_flows_close(
+            stage.compute_flows_for_mass_fractions(mass_fractions),
+            wf.compute_flows(
+                net, 2.0, 1.0e5, mass_fractions, user_funcs=user_funcs
+            ),
+        )
+
+    flows = stage.compute_flows(y, species)
+    one = stage.compute_flows(y[-1], species)
+    assert np.array_equal(flows["forward"][-1], one["forward"])
+    assert np.array_equal(flows["reverse"][-1], one["reverse"])
+
+
+def test_binned_flows_with_zero_tolerance_are_exact(net, zones, user_funcs):
+    reference = wf.compute_flows_for_zones(net, zones, user_funcs=user_funcs)
+    t9 = _get_zone_states(zones)[0]
+
+    result = wf.compute_binned_flows_for_zones(
+        net, zones, 0, user_funcs=user_funcs
+    )
+
+    assert result["bins"] == len(np.unique(t9))
+    assert result["bins"] < len(zones)
+    assert result["max relative error"] == 0
+    _assert_zone_flows_close(result["flows"], reference, rtol=0)
+
+
+def test_binned_flows_share_rates(net, zones, user_funcs):
+    reference = wf.compute_flows_for_zones(net, zones, user_funcs=user_funcs)
+
+    result = wf.compute_binned_flows_for_zones(
+        net, zones, 0.5, user_funcs=user_funcs
+    )
+
+    assert result["bins"] < len(np.unique(_get_zone_states(zones)[0]))
+    assert result["max relative error"] > 0
+    for zone in zones:
+        assert result["flows"][zone][USER_REACTION] == (
+            reference[zone][USER_REACTION]
+        )
+
+    with pytest.raises(AssertionError):
+        wf.compute_binned_flows_for_zones(
+            net, zones, -0.1, user_funcs=user_funcs
+        )
+
+
+def test_species_flows_match_flows(net, zones):
+    user_funcs = {"my_rate": lambda reaction, t9: 2.0 * t9}
+    mass_fractions = zones[next(iter(zones))]["mass fractions"]
+    reference = wf.compute_flows(
+        net, 2.0, 1.0e5, mass_fractions, user_funcs=user_funcs
+    )
+    reactions = net.get_reactions()
+
+    for species in (["c12"], ["he4", "o16"], ["ne20"]):
+        expected = [
+            r
+            for r in reference
+            if set(species)
+            & set(
+                reactions[r].nuclide_reactants + reactions[r].nuclide_products
+            )
+        ]
+        assert list(net.get_reactions_for_species(species)) == expected
+
+        _assert_flows_close(
+            wf.compute_flows_for_species(
+                net,
+                2.0,
+                1.0e5,
+                mass_fractions,
+                species,
+                user_funcs=user_funcs,
+            ),
+            {r: reference[r] for r in expected},
+        )
+
+
+@pytest.mark.parametrize("flow_type", ["net", "forward", "reverse"])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_top_flows_match_sorted_flows(net, zones, flow_type, sparse):
+    user_funcs = {"my_rate": lambda reaction, t9, zone: 2.0 * t9}
+    if sparse:
+        flows = wf.compute_flows_for_zone_abundances(
+            net, wz.Zone_Abundances(net, zones), user_funcs=user_funcs
+        )
+        forward = flows["forward"].toarray()
+        reverse = flows["reverse"].toarray()
+    else:
+        y, species = _get_abundances(net, zones)
+        t9, rho = _get_zone_states(zones)
+        flows = wf.compute_flows_for_abundances(
+            net,
+            t9,
+            rho,
+            y,
+            species,
+            user_funcs={"my_rate": lambda reaction, t9: 2.0 * t9},
+        )
+        forward = flows["forward"]
+        reverse = flows["reverse"]
+
+    values = {
+        "net": forward - reverse,
+        "forward": forward,
+        "reverse": reverse,
+    }[flow_type]
+
+    def key(v):
+        return abs(v) if flow_type == "net" else v
+
+    for k, species in ((5, None), (3, ["c12", "he4"]), (1000, ["o16"])):
+        top = wf.get_top_flows(
+            net, flows, k, flow_type=flow_type, species=species
+        )
+
+        if species is None:
+            cols = list(range(len(flows["reactions"])))
+        else:
+            selected = net.get_reactions_for_species(species)
+            cols = [
+                j for j, r in enumerate(flows["reactions"]) if r in selected
+            ]
+
+        assert top["zones"] == flows.get("zones")
+        assert top["indices"].shape == (len(zones), min(k, len(cols)))
+
+        for i in range(len(zones)):
+            expected = sorted((values[i, j] for j in cols), key=key)[::-1]
+            assert [key(v) for v in top["flows"][i]] == [
+                key(v) for v in expected[: min(k, len(cols))]
+            ]
+            assert set(top["indices"][i]) <= set(cols)
+            assert np.array_equal(
+                top["flows"][i], values[i, top["indices"][i]]
+            )
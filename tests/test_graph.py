@@ -0,0 +1,52 @@
+import networkx as nx
+import pytest
+import wnnet.graph as wg
+
+
+def _get_signature(G):
+    return (
+        sorted((n, sorted(d.items(), key=str)) for n, d in G.nodes(data=True)),
+        sorted(
+            str((u, v, sorted(d.items()))) for u, v, d in G.edges(data=True)
+        ),
+        G.graph.get("label"),
+    )
+
+
+@pytest.mark.parametrize(
+    "flow_type, keyframe_interval", [("net", 0), ("full", 3)]
+)
+def test_zone_flow_graph_diffs_rebuild_zone_graphs(
+    net, zones, user_funcs, flow_type, keyframe_interval
+):
+    kwargs = {
+        "flow_type": flow_type,
+        "induced_nuc_xpath": "[z < 9]",
+        "user_funcs": user_funcs,
+    }
+
+    graphs = wg.create_zone_flow_graphs(net, zones, **kwargs)
+    diffs = wg.create_zone_flow_graph_diffs(
+        net, zones, keyframe_interval=keyframe_interval, **kwargs
+    )
+
+    assert list(diffs.keys()) == list(graphs.keys())
+
+    G = None
+    for zone in graphs:
+        if diffs[zone]["keyframe"] is not None:
+            G = nx.MultiDiGraph(diffs[zone]["keyframe"])
+        else:
+            wg.apply_graph_diff(G, diffs[zone]["diff"])
+        assert _get_signature(G) == _get_signature(graphs[zone])
+
+
+def test_graph_diff_round_trip(net, zones, user_funcs):
+    graphs = list(
+        wg.create_zone_flow_graphs(net, zones, user_funcs=user_funcs).values()
+    )
+
+    G = nx.MultiDiGraph(graphs[0])
+    wg.apply_graph_diff(G, wg.compute_graph_diff(graphs[0], graphs[-1]))
+
+    assert _get_signature(G) == _get_signature(graphs[-1])
@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+import wnnet.flows as wf
+
+
+def _sum_zone_link_flows(zone_link_flows, weights=None):
+    result = {}
+    for i, zone in enumerate(zone_link_flows):
+        weight = 1.0 if weights is None else weights[i]
+        for r, links in zone_link_flows[zone].items():
+            total = result.setdefault(r, [[s, t, 0.0] for s, t, f in links])
+            for link, (source, target, flow) in zip(total, links):
+                assert link[:2] == [source, target]
+                link[2] += weight * flow
+    return result
+
+
+def _assert_link_flows_close(link_flows, reference):
+    assert list(link_flows.keys()) == list(reference.keys())
+    for r in reference:
+        assert [tuple(link[:2]) for link in link_flows[r]] == [
+            tuple(link[:2]) for link in reference[r]
+        ]
+        np.testing.assert_allclose(
+            [link[2] for link in link_flows[r]],
+            [link[2] for link in reference[r]],
+            rtol=1e-12,
+            atol=0,
+        )
+
+
+@pytest.mark.parametrize("direction", ["forward", "reverse", "both"])
+@pytest.mark.parametrize("order", ["normal", "reversed"])
+def test_accumulator_matches_summed_link_flows(
+    net, zones, user_funcs, direction, order
+):
+    reference = _sum_zone_link_flows(
+        wf.compute_link_flows_for_zones(
+            net,
+            zones,
+            user_funcs=user_funcs,
+            direction=direction,
+            order=order,
+            include_dt=True,
+        )
+    )
+
+    accumulator = wf.Link_Flow_Accumulator(
+        net, user_funcs=user_funcs, direction=direction, order=order
+    )
+    accumulator.add_zones(zones)
+
+    assert accumulator.number_of_zones == len(zones)
+    _assert_link_flows_close(accumulator.get_link_flows(), reference)
+
+    matrix = accumulator.get_matrix()
+    species = list(net.get_nuclides().keys())
+    index = {sp: i for i, sp in enumerate(species)}
+    expected = np.zeros((len(species), len(species)))
+    for links in reference.values():
+        for source, target, flow in links:
+            expected[index[source], index[target]] += flow
+    np.testing.assert_allclose(matrix.toarray(), expected, rtol=1e-12)
+
+
+def test_accumulator_trapezoid_rule(net, zones, user_funcs):
+    zone_link_flows = wf.compute_link_flows_for_zones(
+        net, zones, user_funcs=user_funcs
+    )
+    time = np.array([float(zones[z]["properties"]["time"]) for z in zones])
+    dt = np.diff(time)
+    weights = np.zeros(len(time))
+    weights[:-1] += 0.5 * dt
+    weights[1:] += 0.5 * dt
+
+    accumulator = wf.Link_Flow_Accumulator(
+        net, user_funcs=user_funcs, method="trapezoid"
+    )
+    accumulator.add_zones(zones)
+
+    _assert_link_flows_close(
+        accumulator.get_link_flows(),
+        _sum_zone_link_flows(zone_link_flows, weights),
+    )
+
+
+@pytest.mark.parametrize("group", ["z", "a", "n"])
+def test_group_link_flows_match_summed_links(net, zones, user_funcs, group):
+    zone_link_flows = wf.compute_link_flows_for_zones(
+        net, zones, user_funcs=user_funcs
+    )
+    nuclides = net.get_nuclides()
+
+    result = wf.compute_group_link_flows_for_zones(
+        net, zone_link_flows, group=group
+    )
+    groups = list(result["groups"])
+
+    assert result["zones"] == list(zones.keys())
+
+    for zone, link_flows in zone_link_flows.items():
+        expected = np.zeros((len(groups), len(groups)))
+        scale = np.zeros((len(groups), len(groups)))
+        for links in link_flows.values():
+            for source, target, flow in links:
+                i = groups.index(nuclides[source][group])
+                j = groups.index(nuclides[target][group])
+                expected[i, j] += flow
+                scale[i, j] += abs(flow)
+
+        # Links of both signs cancel within a group, so the roundoff is
+        # relative to the summed magnitudes of the links.
+
+        flows = result["flows"][zone].toarray()
+        assert np.all(np.abs(flows - expected) <= 1e-12 * scale)
+
+        net_flows = result["net flows"][zone].toarray()
+        assert np.all(
+            np.abs(net_flows - (expected - expected.T))
+            <= 1e-12 * (scale + scale.T)
+        )
+
+        single = wf.compute_group_link_flows(net, link_flows, group=group)
+        assert np.all(
+            np.abs(single["flows"].toarray() - expected) <= 1e-12 * scale
+        )
+
+
+def test_group_link_flows_from_accumulator(net, zones, user_funcs):
+    accumulator = wf.Link_Flow_Accumulator(net, user_funcs=user_funcs)
+    accumulator.add_zones(zones)
+    link_flows = accumulator.get_link_flows()
+
+    from_matrix = wf.compute_group_link_flows(net, accumulator.get_matrix())
+    from_links = wf.compute_group_link_flows(net, link_flows)
+
+    nuclides = net.get_nuclides()
+    groups = list(from_links["groups"])
+    scale = np.zeros((len(groups), len(groups)))
+    for links in link_flows.values():
+        for source, target, flow in links:
+            scale[
+                groups.index(nuclides[source]["z"]),
+                groups.index(nuclides[target]["z"]),
+            ] += abs(flow)
+
+    assert np.all(
+        np.abs(from_matrix["flows"].toarray() - from_links["flows"].toarray())
+        <= 1e-12 * scale
+    )
@@ -0,0 +1,156 @@
+import math
+import pytest
+import wnnet.consts as wc
+import wnnet.reac as wr
+
+NUC_XPATHS = ["", "[z <= 8]", "[a >= 12]"]
+
+
+def _obeys_conservation_laws(nuclides, reaction):
+    charge = {"electron": -1, "positron": 1}
+    leptons = {
+        "electron": ("e", 1),
+        "positron": ("e", -1),
+        "neutrino_e": ("e", 1),
+        "anti-neutrino_e": ("e", -1),
+        "neutrino_mu": ("mu", 1),
+        "anti-neutrino_mu": ("mu", -1),
+        "neutrino_tau": ("tau", 1),
+        "anti-neutrino_tau": ("tau", -1),
+    }
+
+    changes = {"z": 0, "a": 0, "e": 0, "mu": 0, "tau": 0}
+    for species, sign in ((reaction.reactants, 1), (reaction.products, -1)):
+        for sp in species:
+            if sp in nuclides:
+                changes["z"] += sign * nuclides[sp]["z"]
+                changes["a"] += sign * nuclides[sp]["a"]
+            changes["z"] += sign * charge.get(sp, 0)
+            if sp in leptons:
+                changes[leptons[sp][0]] += sign * leptons[sp][1]
+
+    return not any(changes.values())
+
+
+def _is_valid_reaction(nuclides, reaction):
+    return _obeys_conservation_laws(nuclides, reaction) and all(
+        sp in nuclides
+        for sp in reaction.nuclide_reactants + reaction.nuclide_products
+    )
+
+
+@pytest.mark.parametrize("nuc_xpath", NUC_XPATHS)
+def test_valid_reactions_obey_conservation_laws(net, nuc_xpath):
+    nuclides = net.get_nuclides(nuc_xpath=nuc_xpath)
+    reactions = net.get_reactions()
+
+    expected = [
+        r for r in reactions if _is_valid_reaction(nuclides, reactions[r])
+    ]
+
+    assert 0 < len(expected) < len(reactions)
+    assert list(net.get_valid_reactions(nuc_xpath=nuc_xpath)) == expected
+    for r in reactions:
+        assert net.is_valid_reaction(r, nuc_xpath=nuc_xpath) == (r in expected)
+
+    selected = net.get_valid_reactions(
+        nuc_xpath=nuc_xpath, reac_xpath="[reactant = 'h1']"
+    )
+    assert list(selected) == [
+        r for r in expected if "h1" in reactions[r].reactants
+    ]
+
+
+def _compute_Q_value(nuclides, reaction):
+    result = sum(
+        nuclides[sp]["mass excess"] for sp in reaction.nuclide_reactants
+    ) - sum(nuclides[sp]["mass excess"] for sp in reaction.nuclide_products)
+    if "positron" in reaction.products and "neutrino_e" in reaction.products:
+        result -= 2.0 * wc.m_e_in_MeV
+    return result
+
+
+@pytest.mark.parametrize("nuc_xpath", NUC_XPATHS)
+def test_Q_values_match_mass_excesses(net, nuc_xpath):
+    nuclides = net.get_nuclides()
+    reactions = net.get_reactions()
+    valid = net.get_valid_reactions(nuc_xpath=nuc_xpath)
+
+    q_values = net.compute_Q_values(nuc_xpath=nuc_xpath)
+    assert list(q_values) == [r for r in valid if r in q_values]
+    for r in valid:
+        q = _compute_Q_value(nuclides, reactions[r])
+        assert q_values.get(r, 0.0) == pytest.approx(q, rel=1e-12, abs=1e-12)
+
+    for r in reactions:
+        q = net.compute_reaction_Q_value(r)
+        if all(
+            sp in nuclides
+            for sp in reactions[r].nuclide_reactants
+            + reactions[r].nuclide_products
+        ):
+            assert q == pytest.approx(
+                _compute_Q_value(nuclides, reactions[r]), rel=1e-12, abs=1e-12
+            )
+        else:
+            assert q is None
+
+    assert any(
+        "positron" in reactions[r].products for r in q_values
+    ), "the network should include a positron emission"
+
+
+@pytest.mark.parametrize("nuc_xpath", NUC_XPATHS)
+def test_Q_value_queries_match_sorted_Q_values(net, nuc_xpath):
+    q_values = net.compute_Q_values(nuc_xpath=nuc_xpath)
+    ordered = sorted(q_values.items(), key=lambda item: item[1])
+
+    for k in (1, 5, len(ordered) + 3):
+        top = net.get_most_exothermic_reactions(k, nuc_xpath=nuc_xpath)
+        assert list(top.values()) == [q for r, q in ordered[::-1][:k]]
+        assert all(q_values[r] == q for r, q in top.items())
+
+    for q_min, q_max in ((-5.0, 5.0), (0.0, 1.0e3), (3.0, -3.0)):
+        assert net.get_reactions_in_Q_range(
+            q_min, q_max, nuc_xpath=nuc_xpath
+        ) == {r: q for r, q in ordered if q_min <= q <= q_max}
+
+
+def _compute_duplicate_factor(species):
+    result = 1
+    for sp in set(species):
+        result *= math.factorial(species.count(sp))
+    return result
+
+
+def test_reaction_table_matches_reactions(net):
+    reactions = net.get_reactions()
+    table = net.get_reaction_table()
+
+    assert table["reactions"] == list(reactions.keys())
+    assert net.get_reaction_table() is table
+
+    for r, reaction in reactions.items():
+        i = table["index"][r]
+        factors = (
+            _compute_duplicate_factor(reaction.nuclide_reactants),
+            _compute_duplicate_factor(reaction.nuclide_products),
+        )
+        assert net.compute_reaction_duplicate_factors(r) == factors
+        assert net.is_weak_reaction(r) == any(
+            "electron" in sp or "positron" in sp or "neutrino" in sp
+            for sp in reaction.reactants + reaction.products
+        )
+        assert table["number of reactants"][i] == len(
+            reaction.nuclide_reactants
+        )
+        assert table["number of products"][i] == len(reaction.nuclide_products)
+        assert wr.RATE_TYPES[table["rate type"][i]] == reaction.data["type"]
+
+    assert net.compute_duplicate_factors(reac_xpath="[reactant = 'he4']") == {
+        r: net.compute_reaction_duplicate_factors(r)
+        for r in net.get_reactions(reac_xpath="[reactant = 'he4']")
+    }
+    assert net.compute_reaction_duplicate_factors(
+        "he4 + he4 + he4 -> c12 + gamma"
+    ) == (6, 1)
@@ -0,0 +1,99 @@
+import os
+import numpy as np
+import pytest
+import wnnet.net as wn
+import wnnet.rates as wrt
+
+USER_REACTION = "c12 + c12 -> ne20 + he4"
+
+
+def _get_max_relative_error(rates, reference):
+    result = 0.0
+    for r in reference:
+        for rate, ref in zip(rates[r], reference[r]):
+            if ref != 0:
+                result = max(result, abs(rate / ref - 1.0))
+            else:
+                assert rate == 0
+    return result
+
+
+def test_rate_table_matches_direct_rates(files):
+    user_funcs = {"my_rate": lambda reaction, t9: 2.0 * t9}
+    net = wn.Net(files[0])
+    reference = wn.Net(files[0])
+
+    rate_table = net.create_rate_table(t9_min=0.1, t9_max=5.0, max_error=1e-4)
+    net.set_rate_table(rate_table)
+
+    assert rate_table.max_error <= 1e-4
+    assert rate_table.direct[rate_table.index[USER_REACTION]]
+
+    for t9 in np.geomspace(0.11, 4.9, 7):
+        rates = net.compute_rates(t9, user_funcs=user_funcs)
+        assert rates[USER_REACTION] == reference.compute_rates_for_reaction(
+            USER_REACTION, t9, user_funcs=user_funcs
+        )
+        assert (
+            _get_max_relative_error(
+                rates, reference.compute_rates(t9, user_funcs=user_funcs)
+            )
+            < 1e-3
+        )
+
+    # Outside the table, the rates are computed directly.
+
+    for r in rate_table.reactions[:5]:
+        assert net.compute_rates_for_reaction(
+            r, 9.0
+        ) == reference.compute_rates_for_reaction(r, 9.0)
+
+
+def test_rate_table_warns_when_error_not_met(net):
+    with pytest.warns(RuntimeWarning) as record:
+        rate_table = net.create_rate_table(
+            n_points=3, max_error=1e-12, max_points=5
+        )
+
+    assert record[0].filename == __file__
+
+    assert len(rate_table.t9) == 5
+    assert rate_table.max_error > 1e-12
+
+
+def test_rate_table_file_reuse(files, tmp_path):
+    file = str(tmp_path / "rates.npz")
+    net = wn.Net(files[0])
+
+    written = net.create_rate_table(
+        t9_min=0.1, t9_max=5.0, max_error=1e-2, file=file
+    )
+    mtime = os.stat(file).st_mtime_ns
+
+    read = wn.Net(files[0]).create_rate_table(
+        t9_min=0.1, t9_max=5.0, max_error=1e-2, file=file
+    )
+    assert os.stat(file).st_mtime_ns == mtime
+    assert read.fingerprint == written.fingerprint
+    assert np.array_equal(read.t9, written.t9)
+    assert np.array_equal(read.log_forward, written.log_forward)
+
+    stored = wrt.read_rate_table(file)
+    assert stored.reactions == written.reactions
+    assert stored.max_error == written.max_error
+
+    # Tighter error bounds and changed nuclide data both force a rebuild.
+
+    tighter = net.create_rate_table(
+        t9_min=0.1, t9_max=5.0, max_error=1e-4, file=file
+    )
+    assert tighter.max_error <= 1e-4
+    assert wrt.read_rate_table(file).max_error == tighter.max_error
+
+    changed = wn.Net(files[0])
+    changed.get_nuclides()["c12"]["mass excess"] += 1.0
+    rebuilt = changed.create_rate_table(
+        t9_min=0.1, t9_max=5.0, max_error=1e-2, file=file
+    )
+    assert rebuilt.fingerprint != written.fingerprint
+    assert wrt.read_rate_table(file).fingerprint == rebuilt.fingerprint
@@ -0,0 +1,82 @@
+import networkx as nx
+import pytest
+
+NUC_XPATH = "[z >= 2 and z < 8]"
+
+
+@pytest.fixture
+def topology(net):
+    return net.get_topology(nuc_xpath=NUC_XPATH)
+
+
+@pytest.fixture
+def subgraph(topology):
+    return nx.DiGraph(topology.get_graph()).subgraph(
+        topology.get_subset_species()
+    )
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_reachable_species_match_networkx(topology, subgraph, reverse):
+    G = subgraph.reverse() if reverse else subgraph
+
+    for name in ["he4", "li7", "c12"]:
+        assert topology.get_reachable_species(name, reverse=reverse) == dict(
+            nx.single_source_shortest_path_length(G, name)
+        )
+        assert topology.get_reachable_species(
+            name, max_steps=2, reverse=reverse
+        ) == dict(nx.single_source_shortest_path_length(G, name, cutoff=2))
+
+
+def test_reachable_species_stay_in_subset(topology):
+    subset = set(topology.get_subset_species())
+
+    assert set(topology.get_reachable_species("he4")) <= subset
+
+
+def test_strongly_connected_components_match_networkx(topology, subgraph):
+    components = topology.get_strongly_connected_components()
+
+    assert sorted(map(sorted, components)) == sorted(
+        map(sorted, nx.strongly_connected_components(subgraph))
+    )
+
+
+def test_shortest_reaction_chain(net, topology, subgraph):
+    reachable = topology.get_reachable_species("he4")
+
+    for target, distance in reachable.items():
+        chain = topology.get_shortest_reaction_chain("he4", target)
+        assert len(chain) == distance
+        previous = "he4"
+        for source, link_target, reactions in chain:
+            assert source == previous
+            assert subgraph.has_edge(source, link_target)
+            for reaction in reactions:
+                _reaction = net.get_reactions()[reaction]
+                assert source in _reaction.nuclide_reactants + (
+                    _reaction.nuclide_products
+                )
+            previous = link_target
+        assert previous == target
+
+    outside = [
+        sp
+        for sp in topology.get_subset_species() + ["ne20"]
+        if sp not in reachable
+    ]
+    assert topology.get_shortest_reaction_chain("he4", outside[0]) is None
+
+
+def test_query_cache_policy(topology):
+    topology.set_cache_policy(max_entries=2)
+
+    for name in ["he4", "li7", "c12"]:
+        topology.get_reachable_species(name)
+    topology.get_reachable_species("c12")
+
+    statistics = topology.get_cache_statistics()["queries"]
+    assert statistics["entries"] == 2
+    assert statistics["evictions"] == 1
+    assert statistics["hits"] == 1
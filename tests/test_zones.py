@@ -0,0 +1,73 @@
+import numpy as np
+import wnnet.flows as wf
+import wnnet.rates as wrt
+import wnnet.zones as wz
+
+
+def test_zone_arrays_match_zone_data(zones):
+    arrays = wz.get_zone_arrays(zones)
+
+    assert arrays["zones"] == list(zones.keys())
+
+    for i, zone in enumerate(zones):
+        properties = zones[zone]["properties"]
+        for name in ["time", "t9", "rho", "dt"]:
+            assert arrays["properties"][name][i] == float(properties[name])
+        for key, x in zones[zone]["mass fractions"].items():
+            assert (
+                arrays["mass fractions"][i, arrays["species index"][key[0]]]
+                == x
+            )
+        assert np.count_nonzero(arrays["mass fractions"][i]) == len(
+            zones[zone]["mass fractions"]
+        )
+
+    sparse = wz.get_zone_arrays(zones, sparse=True)
+    assert sparse["species"] == arrays["species"]
+    assert np.array_equal(
+        sparse["mass fractions"].toarray(), arrays["mass fractions"]
+    )
+
+
+def test_zone_abundances_match_mass_fractions(net, zones):
+    abundances = wz.Zone_Abundances(net, zones)
+    nuclides = net.get_nuclides()
+
+    assert abundances.get_number_of_zones() == len(zones)
+
+    for zone in zones:
+        y = dict(zip(abundances.species, abundances.get_abundances(zone)))
+        mass_fractions = zones[zone]["mass fractions"]
+        for sp in abundances.species:
+            x = mass_fractions.get((sp, nuclides[sp]["z"], nuclides[sp]["a"]))
+            assert y[sp] == (0.0 if x is None else x / nuclides[sp]["a"])
+
+        indices, values = abundances.get_row(zone)
+        assert len(indices) == len(mass_fractions)
+        assert np.all(values != 0)
+
+
+def test_zone_abundance_flows_match_zone_flows(net, zones, user_funcs):
+    reference = wf.compute_flows_for_zones(net, zones, user_funcs=user_funcs)
+
+    @wrt.batch_user_rate
+    def my_rate(reaction, t9, zones):
+        return 2.0 * t9
+
+    flows = wf.compute_flows_for_zone_abundances(
+        net, wz.Zone_Abundances(net, zones), user_funcs={"my_rate": my_rate}
+    )
+
+    assert flows["zones"] == list(reference.keys())
+
+    forward = flows["forward"].toarray()
+    reverse = flows["reverse"].toarray()
+
+    for i, zone in enumerate(flows["zones"]):
+        for j, r in enumerate(flows["reactions"]):
+            np.testing.assert_allclose(
+                (forward[i, j], reverse[i, j]),
+                reference[zone][r],
+                rtol=1e-12,
+                atol=0,
+            )
@@ -1,11 +1,32 @@
 """
 A package of python routines to handle webnucleo networks.
+
+The submodules are imported on first access, so that, for example, the
+graph dependencies are only loaded when :mod:`wnnet.graph` is used.
 """
 
-import wnnet.consts
-import wnnet.nuc
-import wnnet.reac
-import wnnet.net
-import wnnet.graph
-import wnnet.flows
-import wnnet.zones
+import importlib
+
+_SUBMODULES = (
+    "cache",
+    "consts",
+    "flows",
+    "graph",
+    "instrument",
+    "net",
+    "nuc",
+    "rates",
+    "reac",
+    "topology",
+    "zones",
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module("wnnet." + name)
+    raise AttributeError(f"module 'wnnet' has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_SUBMODULES))
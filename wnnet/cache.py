@@ -0,0 +1,383 @@
+"""This module handles the caches of XPath-selected nuclides and reactions and of the data computed for XPath selections."""
+
+import sys
+from collections import OrderedDict
+import numpy as np
+
+
+class Selection_Cache:
+    """A class for caching subsets selected from a base collection.
+
+    The base collection is stored in full and never evicted.  Every other entry is stored as an array of indices into the base collection (plus copies of any items not in the base collection), so that cached selections share the base data.  The :obj:`dict` of a selection is also kept, built from the indices so that its items are the objects of the base collection, and repeated retrievals return the same object without rebuilding it.  When the cache exceeds its memory policy, these dictionaries are dropped first, least recently used first, and rebuilt from the indices when next needed; after that, whole entries are evicted in least-recently-used order.  The most recently used entry is always kept.
+
+    Args:
+        ``loader`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that takes no arguments and returns the base collection as a \
+            :obj:`dict`.  It is called the first time the base collection \
+            is needed if the base collection has not been set directly.
+
+        ``base_key`` (optional): The key of the base collection.  Default is the empty string.
+
+        ``max_entries`` (:obj:`int`, optional): The maximum number of selections (not counting the base collection) to keep.  Default is no limit.
+
+        ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the stored selections.  Default is no limit.
+
+    """
+
+    def __init__(
+        self, loader=None, base_key="", max_entries=None, max_bytes=None
+    ):
+        self.loader = loader
+        self.base_key = base_key
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.base = None
+        self.base_names = None
+        self.base_index = None
+        self.entries = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_policy(self, max_entries=None, max_bytes=None):
+        """Method to set the eviction policy of the cache.
+
+        Args:
+            ``max_entries`` (:obj:`int`, optional): The maximum number of selections (not counting the base collection) to keep.  Default is no limit.
+
+            ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the stored selections.  Default is no limit.
+
+        Returns:
+            On successful return, the policy has been set and any entries beyond it evicted.
+
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def get_statistics(self):
+        """Method to return the statistics of the cache.
+
+        Returns:
+            A :obj:`dict` with the number of *entries*, the number of entries whose :obj:`dict` is kept (*views*), the approximate *bytes* they use, and the number of *hits*, *misses*, and *evictions*.
+
+        """
+
+        return {
+            "entries": len(self.entries),
+            "views": sum(
+                entry[3] is not None for entry in self.entries.values()
+            ),
+            "bytes": self.n_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Method to remove all entries, including the base collection, from the cache.
+
+        Returns:
+            On successful return, the cache is empty.  The statistics are kept.
+
+        """
+
+        self.base = None
+        self.base_names = None
+        self.base_index = None
+        self.entries.clear()
+        self.n_bytes = 0
+
+    def _set_base(self, base):
+        self.base = base
+        self.base_names = list(base.keys())
+        self.base_index = {name: i for i, name in enumerate(self.base_names)}
+
+    def _get_base(self):
+        if self.base is None and self.loader:
+            self._set_base(self.loader())
+        return self.base
+
+    def _is_over_bytes(self):
+        return self.max_bytes is not None and self.n_bytes > self.max_bytes
+
+    def _evict(self):
+        while len(self.entries) > 1 and (
+            self.max_entries is not None
+            and len(self.entries) > self.max_entries
+        ):
+            self._pop_oldest()
+
+        if not self._is_over_bytes():
+            return
+
+        for entry in list(self.entries.values())[:-1]:
+            if entry[3] is not None:
+                self.n_bytes -= entry[4]
+                entry[3] = None
+                entry[4] = 0
+                if not self._is_over_bytes():
+                    return
+
+        while len(self.entries) > 1 and self._is_over_bytes():
+            self._pop_oldest()
+
+    def _pop_oldest(self):
+        key, entry = self.entries.popitem(last=False)
+        self.n_bytes -= entry[2] + entry[4]
+        self.evictions += 1
+
+    def _materialize(self, entry):
+        indices, extras = entry[0], entry[1]
+        result = {}
+        for i in indices.tolist():
+            if i >= 0:
+                name = self.base_names[i]
+                result[name] = self.base[name]
+            else:
+                name, value = extras[-1 - i]
+                result[name] = value
+        return result
+
+    def __contains__(self, key):
+        if key == self.base_key:
+            return self.base is not None
+        return key in self.entries
+
+    def __getitem__(self, key):
+        if key == self.base_key:
+            if self.base is None:
+                raise KeyError(key)
+            return self.base
+        entry = self.entries[key]
+        self.entries.move_to_end(key)
+        result = entry[3]
+        if result is None:
+            result = self._materialize(entry)
+            entry[3] = result
+            entry[4] = sys.getsizeof(result)
+            self.n_bytes += entry[4]
+            self._evict()
+        return result
+
+    def __setitem__(self, key, value):
+        if key == self.base_key:
+            self._set_base(value)
+            return
+
+        if key in self.entries:
+            entry = self.entries.pop(key)
+            self.n_bytes -= entry[2] + entry[4]
+
+        base = self._get_base() or {}
+        indices = np.zeros(len(value), dtype=np.int32)
+        extras = []
+        for j, name in enumerate(value):
+            if name in base:
+                indices[j] = self.base_index[name]
+            else:
+                indices[j] = -1 - len(extras)
+                extras.append((name, value[name]))
+
+        n_bytes = indices.nbytes + sum(
+            sys.getsizeof(extra[1]) for extra in extras
+        )
+
+        entry = [indices, extras, n_bytes, None, 0]
+        entry[3] = self._materialize(entry)
+        entry[4] = sys.getsizeof(entry[3])
+
+        self.entries[key] = entry
+        self.n_bytes += n_bytes + entry[4]
+        self._evict()
+
+    def __iter__(self):
+        if self.base is not None:
+            yield self.base_key
+        yield from list(self.entries.keys())
+
+    def __len__(self):
+        return len(self.entries) + (self.base is not None)
+
+    def keys(self):
+        """Method to return the keys of the cached collections.
+
+        Returns:
+            A :obj:`list` of the keys, starting with the base key if the base collection is stored.
+
+        """
+
+        return list(self)
+
+    def get(self, key, default=None):
+        """Method to retrieve a cached collection and record a hit or miss.
+
+        Args:
+            ``key``: The key of the collection.
+
+            ``default`` (optional): The value to return if the collection is not cached.  Default is None.
+
+        Returns:
+            A :obj:`dict` giving the collection, or *default* if it is not cached.
+
+        """
+
+        if key in self:
+            self.hits += 1
+            return self[key]
+        self.misses += 1
+        return default
+
+
+class LRU_Cache:
+    """A class for caching data computed for XPath selections under a least-recently-used policy.
+
+    Entries are evicted in least-recently-used order when the cache exceeds its policy.  The most recently used entry is always kept.  The memory of an entry is estimated when it is stored.
+
+    Args:
+        ``max_entries`` (:obj:`int`, optional): The maximum number of entries to keep.  Default is no limit.
+
+        ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the stored entries.  Default is no limit.
+
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_policy(self, max_entries=None, max_bytes=None):
+        """Method to set the eviction policy of the cache.
+
+        Args:
+            ``max_entries`` (:obj:`int`, optional): The maximum number of entries to keep.  Default is no limit.
+
+            ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the stored entries.  Default is no limit.
+
+        Returns:
+            On successful return, the policy has been set and any entries beyond it evicted.
+
+        """
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def get_statistics(self):
+        """Method to return the statistics of the cache.
+
+        Returns:
+            A :obj:`dict` with the number of *entries*, the approximate *bytes* they use, and the number of *hits*, *misses*, and *evictions*.
+
+        """
+
+        return {
+            "entries": len(self.entries),
+            "bytes": self.n_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self):
+        """Method to remove all entries from the cache.
+
+        Returns:
+            On successful return, the cache is empty.  The statistics are kept.
+
+        """
+
+        self.entries.clear()
+        self.n_bytes = 0
+
+    def _evict(self):
+        while len(self.entries) > 1 and (
+            (
+                self.max_entries is not None
+                and len(self.entries) > self.max_entries
+            )
+            or (self.max_bytes is not None and self.n_bytes > self.max_bytes)
+        ):
+            key, entry = self.entries.popitem(last=False)
+            self.n_bytes -= entry[1]
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __getitem__(self, key):
+        entry = self.entries[key]
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def __setitem__(self, key, value):
+        if key in self.entries:
+            self.n_bytes -= self.entries.pop(key)[1]
+
+        n_bytes = _estimate_bytes(value)
+        self.entries[key] = (value, n_bytes)
+        self.n_bytes += n_bytes
+        self._evict()
+
+    def __iter__(self):
+        yield from list(self.entries.keys())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def keys(self):
+        """Method to return the keys of the cached entries.
+
+        Returns:
+            A :obj:`list` of the keys in least-recently-used order.
+
+        """
+
+        return list(self)
+
+    def get(self, key, default=None):
+        """Method to retrieve a cached entry and record a hit or miss.
+
+        Args:
+            ``key``: The key of the entry.
+
+            ``default`` (optional): The value to return if the entry is not cached.  Default is None.
+
+        Returns:
+            The cached value, or *default* if it is not cached.
+
+        """
+
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+
+def _estimate_bytes(value, depth=2):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "indptr"):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    result = sys.getsizeof(value)
+    if depth == 0:
+        return result
+    if isinstance(value, dict):
+        items = value.values()
+    elif isinstance(value, (list, tuple)):
+        items = value
+    elif hasattr(value, "__dict__"):
+        items = vars(value).values()
+    else:
+        return result
+    return result + sum(_estimate_bytes(item, depth - 1) for item in items)
@@ -2,6 +2,12 @@
 
 import wnutils.xml as wx
 import numpy as np
+import wnnet.reac as wr
+import wnnet.zones as wz
+import wnnet.instrument as wi
+
+# Number of flow entries per block of zones in get_top_flows
+_TOP_FLOWS_BLOCK_SIZE = 1 << 22
 
 
 def _compute_flows_for_valid_reactions(
@@ -10,33 +16,48 @@ def _compute_flows_for_valid_reactions(
     rho,
     mass_fractions,
     valid_reactions,
-    dups,
-    nuc_xpath,
-    reac_xpath,
-    user_funcs,
+    table,
+    user_rates,
+    i_state,
+    rates=None,
 ):
 
     result = {}
 
     for reaction in valid_reactions:
         _reaction = valid_reactions[reaction]
+        i = table["index"][reaction]
 
-        forward, reverse = net.compute_rates_for_reaction(
-            reaction, t9, user_funcs=user_funcs
-        )
-
-        forward *= np.power(rho, len(_reaction.nuclide_reactants) - 1)
-        forward /= dups[reaction][0]
-        forward *= _compute_abundance_product(
+        p_forward = _compute_abundance_product(
             net, mass_fractions, _reaction.nuclide_reactants
         )
 
-        if not net.is_weak_reaction(reaction):
-            reverse *= np.power(rho, len(_reaction.nuclide_products) - 1)
-            reverse /= dups[reaction][1]
-            reverse *= _compute_abundance_product(
+        if not table["weak"][i]:
+            p_reverse = _compute_abundance_product(
                 net, mass_fractions, _reaction.nuclide_products
             )
+        else:
+            p_reverse = 0
+
+        if p_forward == 0 and p_reverse == 0:
+            result[reaction] = (0.0, 0.0)
+            continue
+
+        if rates is not None and reaction in rates:
+            forward, reverse = rates[reaction]
+        else:
+            forward, reverse = net.compute_rates_for_reaction(
+                reaction, t9, forward=user_rates.get(reaction, i_state)
+            )
+
+        forward *= np.power(rho, table["number of reactants"][i] - 1)
+        forward /= table["forward duplicate factor"][i]
+        forward *= p_forward
+
+        if not table["weak"][i]:
+            reverse *= np.power(rho, table["number of products"][i] - 1)
+            reverse /= table["reverse duplicate factor"][i]
+            reverse *= p_reverse
         else:
             reverse = 0
 
@@ -45,6 +66,7 @@ def _compute_flows_for_valid_reactions(
     return result
 
 
+@wi.timed("flows")
 def compute_flows(
     net, t9, rho, mass_fractions, nuc_xpath="", reac_xpath="", user_funcs=""
 ):
@@ -86,7 +108,7 @@ def compute_flows(
         nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
     )
 
-    dups = net.compute_duplicate_factors()
+    table = net.get_reaction_table()
 
     return _compute_flows_for_valid_reactions(
         net,
@@ -94,13 +116,74 @@ def compute_flows(
         rho,
         mass_fractions,
         valid_reactions,
-        dups,
-        nuc_xpath,
-        reac_xpath,
-        user_funcs,
+        table,
+        _User_Rates(net, [t9], user_funcs, None, nuc_xpath, reac_xpath),
+        0,
+    )
+
+
+@wi.timed("species flows")
+def compute_flows_for_species(
+    net,
+    t9,
+    rho,
+    mass_fractions,
+    species,
+    nuc_xpath="",
+    reac_xpath="",
+    user_funcs="",
+):
+    """A routine to compute flows of the reactions involving a set of species for a given set of mass fractions at the input temperature and density.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the flows.
+
+        ``rho`` (:obj:`float`):  The density in g/cc at which to compute the flows.
+
+        ``mass_fractions`` (:obj:`float`): A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of mass fractions.
+
+        ``species`` (:obj:`list`): A list of the names of the species.  Only the valid reactions in which at least one of the species participates are included (see :meth:`wnnet.net.Net.get_reactions_for_species`).
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*), where
+        *t9* is the temperature in billions of Kelvin and *reaction*
+        is a `wnutils <https://wnutils.readthedocs.io>`_ reaction
+        instance.  Other data can be bound to the function.
+
+    Returns:
+        A :obj:`dict` of reactions with each
+        item in the dictionary a tuple giving the forward and
+        reverse flow.
+
+    """
+
+    return _compute_flows_for_valid_reactions(
+        net,
+        t9,
+        rho,
+        mass_fractions,
+        net.get_reactions_for_species(
+            species, nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+        ),
+        net.get_reaction_table(),
+        _User_Rates(net, [t9], user_funcs, None, nuc_xpath, reac_xpath),
+        0,
     )
 
 
+@wi.timed("zone flows")
 def compute_flows_for_zones(
     net, zones, nuc_xpath="", reac_xpath="", user_funcs=""
 ):
@@ -126,6 +209,9 @@ def compute_flows_for_zones(
         *t9* is the temperature in billions of Kelvin and *reaction* and
         *zone* are `wnutils <https://wnutils.readthedocs.io>`_ reaction and
         zone instances.  Other data can be bound to the function.
+        Functions marked with :func:`wnnet.rates.batch_user_rate` are
+        instead called once per reaction for all the zones (see
+        :meth:`wnnet.net.Net.compute_user_rates`).
 
 
     Returns:
@@ -142,151 +228,230 @@ def compute_flows_for_zones(
         nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
     )
 
-    dups = net.compute_duplicate_factors()
+    table = net.get_reaction_table()
 
-    for zone in zones:
-        s_t9 = "t9"
-        s_rho = "rho"
+    labels, user_rates = _get_user_rates_for_zones(
+        net, zones, user_funcs, nuc_xpath, reac_xpath
+    )
+
+    for i, zone in enumerate(labels):
         _zone = zones[zone]
         props = _zone["properties"]
-        if s_t9 in props and s_rho in props:
-            t9 = float(props[s_t9])
-            rho = float(props[s_rho])
-            _user_funcs = {}
-            if user_funcs:
-                for func in user_funcs:
-                    _user_funcs[
-                        func
-                    ] = lambda reaction, t9, func=func: user_funcs[func](
-                        reaction, t9, _zone
-                    )
-            zone_flows[zone] = _compute_flows_for_valid_reactions(
-                net,
-                t9,
-                rho,
-                _zone["mass fractions"],
-                valid_reactions,
-                dups,
-                nuc_xpath,
-                reac_xpath,
-                _user_funcs,
-            )
+        zone_flows[zone] = _compute_flows_for_valid_reactions(
+            net,
+            float(props["t9"]),
+            float(props["rho"]),
+            _zone["mass fractions"],
+            valid_reactions,
+            table,
+            user_rates,
+            i,
+        )
 
     return zone_flows
 
 
-def _compute_link_flows_for_valid_reactions(
-    net,
-    t9,
-    rho,
-    mass_fractions,
-    valid_reactions,
-    dups,
-    scale,
-    nuc_xpath,
-    reac_xpath,
-    user_funcs,
-    direction,
-    order,
+def _compute_unbinned_rates(net, reactions, t9):
+    return {r: net.compute_rates_for_reaction(r, t9) for r in reactions}
+
+
+def _compute_rate_error(rates, reference):
+    result = 0.0
+    for r in rates:
+        for rate, ref in zip(rates[r], reference[r]):
+            if ref != 0:
+                result = max(result, abs(rate / ref - 1.0))
+            elif rate != 0:
+                result = max(result, 1.0)
+    return result
+
+
+@wi.timed("binned zone flows")
+def compute_binned_flows_for_zones(
+    net, zones, t9_tolerance, nuc_xpath="", reac_xpath="", user_funcs=""
 ):
-    nuclides = net.get_nuclides()
+    """A routine to compute flows for a set of zones with rates shared among zones of similar temperature.
 
-    link_flows = {}
+    The zone temperatures are binned evenly in log t9 with a bin width of log(1 + *t9_tolerance*), and the rates are evaluated once per bin at the geometric mean of the zone temperatures in the bin, so the number of rate evaluations scales with the number of bins rather than the number of zones.  For bins with more than one distinct temperature, the rates are also evaluated at the lowest and highest zone temperature in the bin to find the maximum relative error of the shared rates.  Reactions with user-defined rates are evaluated for each zone.
 
-    for reaction in valid_reactions:
-        tup_array = []
-        _reaction = valid_reactions[reaction]
+    Args:
+        ``net``: A wnnet network.
 
-        reactants = _reaction.nuclide_reactants
-        products = _reaction.nuclide_products
+        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.
 
-        forward, reverse = net.compute_rates_for_reaction(
-            reaction, t9, user_funcs=user_funcs
+        ``t9_tolerance`` (:obj:`float`): The relative width of the temperature bins.  It must not be negative.  For zero, each bin holds the zones of one distinct temperature, so the rates are exact.
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.  The prototype is as in
+        :func:`compute_flows_for_zones`.
+
+    Returns:
+        A :obj:`dict` with three entries.  The entry *flows* gives the flows for each zone, as returned by :func:`compute_flows_for_zones`; the entry *bins* is an :obj:`int` giving the number of temperature bins; and the entry *max relative error* is a :obj:`float` giving the maximum relative error of the shared rates with respect to rates evaluated at the zone temperatures.
+
+    """
+
+    assert t9_tolerance >= 0
+
+    valid_reactions = net.get_valid_reactions(
+        nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+    )
+
+    table = net.get_reaction_table()
+
+    i_user = wr.RATE_TYPES.index("user_rate")
+    shared = [
+        r
+        for r in valid_reactions
+        if table["rate type"][table["index"][r]] != i_user
+    ]
+
+    labels, user_rates = _get_user_rates_for_zones(
+        net, zones, user_funcs, nuc_xpath, reac_xpath
+    )
+
+    t9 = np.array([float(zones[zone]["properties"]["t9"]) for zone in labels])
+
+    if t9_tolerance > 0:
+        bins, inverse = np.unique(
+            np.round(np.log(t9) / np.log1p(t9_tolerance)).astype(np.int64),
+            return_inverse=True,
+        )
+    else:
+        bins, inverse = np.unique(t9, return_inverse=True)
+
+    max_error = 0.0
+    bin_rates = []
+
+    for k in range(len(bins)):
+        members = t9[inverse == k]
+        t_min, t_max = members.min(), members.max()
+        if t_min == t_max:
+            bin_rates.append(_compute_unbinned_rates(net, shared, t_min))
+            continue
+        rates = _compute_unbinned_rates(
+            net, shared, np.exp(np.log(members).mean())
         )
+        for t in (t_min, t_max):
+            max_error = max(
+                max_error,
+                _compute_rate_error(
+                    rates, _compute_unbinned_rates(net, shared, t)
+                ),
+            )
+        bin_rates.append(rates)
 
-        if direction == "forward" or direction == "both":
-            forward *= np.power(rho, len(_reaction.nuclide_reactants) - 1)
-            forward /= dups[reaction][0]
+    zone_flows = {}
 
-            for i in range(len(reactants)):
-                source = reactants[i]
-                p_source = _compute_abundance_product(
-                    net, mass_fractions, reactants, exclude_index=i
-                )
-                for target in products:
-                    if order == "normal":
-                        tup = (source, target, forward * p_source * scale)
-                    else:
-                        tup = (target, source, forward * p_source * scale)
-                    tup_array.append(tup)
+    for i, zone in enumerate(labels):
+        _zone = zones[zone]
+        zone_flows[zone] = _compute_flows_for_valid_reactions(
+            net,
+            t9[i],
+            float(_zone["properties"]["rho"]),
+            _zone["mass fractions"],
+            valid_reactions,
+            table,
+            user_rates,
+            i,
+            rates=bin_rates[inverse[i]],
+        )
 
-                if direction == "both":
-                    for target in reactants:
-                        if order == "normal":
-                            tup = (source, target, -forward * p_source * scale)
-                        else:
-                            tup = (target, source, -forward * p_source * scale)
-                        tup_array.append(tup)
+    return {
+        "flows": zone_flows,
+        "bins": len(bins),
+        "max relative error": max_error,
+    }
 
-        if not net.is_weak_reaction(reaction):
-            if direction == "reverse" or direction == "both":
-                reverse *= np.power(rho, len(_reaction.nuclide_products) - 1)
-                reverse /= dups[reaction][1]
 
-                for i in range(len(products)):
-                    source = products[i]
-                    p_source = _compute_abundance_product(
-                        net, mass_fractions, products, exclude_index=i
-                    )
-                    for target in reactants:
-                        if order == "normal":
-                            tup = (source, target, reverse * p_source * scale)
-                        else:
-                            tup = (target, source, reverse * p_source * scale)
-                        tup_array.append(tup)
+def _get_padded_species_indices(reactions, elements, species_index):
+    n_max = max(
+        (len(getattr(reactions[r], elements)) for r in reactions), default=0
+    )
+    indices = np.zeros((len(reactions), n_max), dtype=np.intp)
+    mask = np.zeros((len(reactions), n_max), dtype=bool)
+    missing = np.zeros(len(reactions), dtype=bool)
+    for i, r in enumerate(reactions):
+        for j, sp in enumerate(getattr(reactions[r], elements)):
+            if sp in species_index:
+                indices[i, j] = species_index[sp]
+                mask[i, j] = True
+            else:
+                missing[i] = True
+    return indices, mask, missing
 
-                    if direction == "both":
-                        for target in products:
-                            if order == "normal":
-                                tup = (
-                                    source,
-                                    target,
-                                    -reverse * p_source * scale,
-                                )
-                            else:
-                                tup = (
-                                    target,
-                                    source,
-                                    -reverse * p_source * scale,
-                                )
-                            tup_array.append(tup)
 
-        link_flows[reaction] = tup_array
+def _compute_abundance_products(y, indices, mask, missing):
+    factors = y[..., indices]
+    result = np.where(mask, factors, 1.0).prod(axis=-1)
+    result[..., missing] = 0
+    return result
 
-    return link_flows
 
+@wi.timed("rate arrays")
+def _compute_rate_arrays(
+    net, t9, rho, valid_reactions, table, nuc_xpath, reac_xpath, user_funcs
+):
+    reactions = list(valid_reactions.keys())
+    index = [table["index"][r] for r in reactions]
+
+    user_rates = _User_Rates(net, t9, user_funcs, None, nuc_xpath, reac_xpath)
 
-def compute_link_flows(
+    forward = np.zeros((len(t9), len(reactions)))
+    reverse = np.zeros((len(t9), len(reactions)))
+
+    for k, t in enumerate(t9.tolist()):
+        for i, r in enumerate(reactions):
+            forward[k, i], reverse[k, i] = net.compute_rates_for_reaction(
+                r, t, forward=user_rates.get(r, k)
+            )
+
+    forward *= np.power(
+        rho[:, np.newaxis], table["number of reactants"][index] - 1
+    )
+    forward /= table["forward duplicate factor"][index]
+
+    reverse *= np.power(
+        rho[:, np.newaxis], table["number of products"][index] - 1
+    )
+    reverse /= table["reverse duplicate factor"][index]
+    reverse[:, table["weak"][index]] = 0
+
+    return forward, reverse
+
+
+@wi.timed("abundance flows")
+def compute_flows_for_abundances(
     net,
     t9,
     rho,
-    mass_fractions,
+    abundances,
+    species,
     nuc_xpath="",
     reac_xpath="",
     user_funcs="",
-    direction="both",
-    order="normal",
 ):
-    """A routine to compute link flows for a given set of mass fractions at the input temperature and density.
+    """A routine to compute flows from arrays of abundances.
+
+    The abundances are used as given, without conversion to a dictionary of mass fractions, so abundances held by an integrator can be passed directly.
 
     Args:
         ``net``: A wnnet network.
 
-        ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the flows.
+        ``t9`` (:obj:`float` or :obj:`numpy.array`):  The temperature in 10\ :sup:`9` K at which to compute the flows, or an array of the temperatures of each zone.
 
-        ``rho`` (:obj:`float`):  The density in g/cc at which to compute the flows.
+        ``rho`` (:obj:`float` or :obj:`numpy.array`):  The density in g/cc at which to compute the flows, or an array of the densities of each zone.
 
-        ``mass_fractions`` (:obj:`float`): A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of mass fractions.
+        ``abundances`` (:obj:`numpy.array`):  The abundances (Y, mass fraction divided by mass number) of the species in the order given by *species*.  For several zones, a two-dimensional array with one row per zone.
+
+        ``species`` (:obj:`list`):  The names of the species corresponding to the columns of *abundances*.  Species not in the list have zero abundance.
 
         ``nuc_xpath`` (:obj:`str`, optional): XPath expression
         to select nuclides for flow computations.  Defaults to all
@@ -303,68 +468,88 @@ def compute_link_flows(
         *t9* is the temperature in billions of Kelvin and *reaction*
         is a `wnutils <https://wnutils.readthedocs.io>`_ reaction
         instance.  Other data can be bound to the function.
-
-        ``direction`` (:obj:`str`, optional):  A string indicating the direction of the links ("forward", from reactants to products; "reverse", from products to reactants; "both", both "forward" and "reverse").  Default is "both".
-
-        ``order`` (:obj:`str`, optional):  A string indicating the order of the links.  Default is *normal*, in which the *source* and *target* of the link are in the time-forward direction of the reaction.  For *reversed*, the *source* and *target* are in the opposite of the time-forward direction of the reaction such that the *target* is the *contribution* to the *source* over some interval.
+        Functions marked with :func:`wnnet.rates.batch_user_rate` are
+        instead called once per reaction for all the zones.
 
     Returns:
-        A :obj:`dict` of reactions with each
-        item in the dictionary an array of three-element :obj:`tuple` objects.
-        The tuple elements are the *source*, *target*, and *link flow*.
-        The *source* and *target* are determined from the time-forward
-        direction of the reaction.
+        A :obj:`dict` with three entries.  The entry *reactions* is a :obj:`list` of the valid reaction strings.  The entries *forward* and *reverse* are :obj:`numpy.array` objects giving the forward and reverse flows of the reactions.  For a one-dimensional *abundances*, the arrays have shape (number of reactions,), and, for a two-dimensional *abundances*, they have shape (number of zones, number of reactions).
+
+    Raises:
+        :obj:`ValueError`: If *t9* or *rho* is an array whose length is neither one nor the number of zones in *abundances*.
 
     """
 
-    assert (
-        direction == "forward"
-        or direction == "reverse"
-        or direction == "both"
-        or direction == "all"
-    )
-    assert order == "normal" or order == "reversed"
+    y = np.asarray(abundances, dtype=float)
 
     valid_reactions = net.get_valid_reactions(
         nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
     )
 
-    dups = net.compute_duplicate_factors()
+    table = net.get_reaction_table()
 
-    scale = 1
+    species_index = {sp: i for i, sp in enumerate(species)}
 
-    return _compute_link_flows_for_valid_reactions(
+    # A single state is evaluated once and broadcast over the zones
+
+    t9, rho = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(t9, dtype=float)),
+        np.atleast_1d(np.asarray(rho, dtype=float)),
+    )
+
+    n_rows = 1 if y.ndim == 1 else y.shape[0]
+    if len(t9) != 1 and len(t9) != n_rows:
+        raise ValueError(
+            "Number of temperatures and densities ({:d}) does not match "
+            "the number of abundance rows ({:d}).".format(len(t9), n_rows)
+        )
+
+    forward, reverse = _compute_rate_arrays(
         net,
         t9,
         rho,
-        mass_fractions,
         valid_reactions,
-        dups,
-        scale,
+        table,
         nuc_xpath,
         reac_xpath,
         user_funcs,
-        direction,
-        order,
     )
 
+    forward = forward * _compute_abundance_products(
+        y,
+        *_get_padded_species_indices(
+            valid_reactions, "nuclide_reactants", species_index
+        ),
+    )
+    reverse = reverse * _compute_abundance_products(
+        y,
+        *_get_padded_species_indices(
+            valid_reactions, "nuclide_products", species_index
+        ),
+    )
 
-def compute_link_flows_for_zones(
-    net,
-    zones,
-    nuc_xpath="",
-    reac_xpath="",
-    user_funcs="",
-    direction="both",
-    include_dt=False,
-    order="normal",
+    if y.ndim == 1:
+        forward = forward[0]
+        reverse = reverse[0]
+
+    return {
+        "reactions": list(valid_reactions.keys()),
+        "forward": forward,
+        "reverse": reverse,
+    }
+
+
+@wi.timed("zone abundance flows")
+def compute_flows_for_zone_abundances(
+    net, abundances, nuc_xpath="", reac_xpath="", user_funcs=""
 ):
-    """A routine to compute link flows for a set of zones.
+    """A routine to compute flows for zones stored in a sparse abundance store.
+
+    For each zone, the abundance products of the reactants and products are computed first, and the rates are only evaluated for reactions with a non-zero product.
 
     Args:
         ``net``: A wnnet network.
 
-        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.
+        ``abundances`` (:obj:`wnnet.zones.Zone_Abundances`): The zone abundances, aligned with the species of *net*.  Zones without *t9* or *rho* properties are skipped.
 
         ``nuc_xpath`` (:obj:`str`, optional): XPath expression
         to select nuclides for flow computations.  Defaults to all
@@ -381,24 +566,558 @@ def compute_link_flows_for_zones(
         *t9* is the temperature in billions of Kelvin and *reaction* and
         *zone* are `wnutils <https://wnutils.readthedocs.io>`_ reaction and
         zone instances.  Other data can be bound to the function.
-
-        ``direction`` (:obj:`str`, optional):  A string indicating the direction of the links ("forward", from reactants to products; "reverse", from products to reactants; "both", both "forward" and "reverse").  Default is "both".
-
-        ``include_dt`` (:obj:`bool`, optional):  Boolean determining whether to include the *dt* (time interval) in the flow (True) or not (False).  Default is False.
-
-        ``order`` (:obj:`str`, optional):  A string indicating the order of the links.  Default is *normal*, in which the *source* and *target* of the link are in the time-forward direction of the reaction.  For *reversed*, the *source* and *target* are in the opposite of the time-forward direction of the reaction such that the *target* is the *contribution* to the *source* over some interval.
+        Functions marked with :func:`wnnet.rates.batch_user_rate` are
+        instead called once per reaction for all the zones.
 
     Returns:
-        A :obj:`dict` of flow links for each zone.  The data for
-        each zone are themselves a :obj:`dict` of reactions with each
-        item in the dictionary an array of three-element :obj:`tuple` objects.
-        The tuple elements are the *source*, *target*, and *link flow*.
-        The *source* and *target* are determined from the time-forward
-        direction of the reaction.
+        A :obj:`dict` with four entries.  The entry *zones* is a :obj:`list` of the labels of the zones with flows, the entry *reactions* is a :obj:`list` of the valid reaction strings, and the entries *forward* and *reverse* are `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ objects with shape (number of zones, number of reactions) giving the forward and reverse flows.
 
     """
 
-    assert (
+    from scipy.sparse import csr_matrix
+
+    valid_reactions = net.get_valid_reactions(
+        nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+    )
+    reactions = list(valid_reactions.keys())
+
+    table = net.get_reaction_table()
+    index = [table["index"][r] for r in reactions]
+    weak = table["weak"][index]
+    n_reactants = table["number of reactants"][index]
+    n_products = table["number of products"][index]
+    forward_dup = table["forward duplicate factor"][index]
+    reverse_dup = table["reverse duplicate factor"][index]
+
+    reactant_indices = _get_padded_species_indices(
+        valid_reactions, "nuclide_reactants", abundances.species_index
+    )
+    product_indices = _get_padded_species_indices(
+        valid_reactions, "nuclide_products", abundances.species_index
+    )
+
+    t9 = abundances.properties["t9"]
+    rho = abundances.properties["rho"]
+
+    valid = ~(np.isnan(t9) | np.isnan(rho))
+    user_rates = _User_Rates(
+        net,
+        t9[valid],
+        user_funcs,
+        [
+            abundances.zones[abundances.labels[i]]
+            for i in np.flatnonzero(valid)
+        ],
+        nuc_xpath,
+        reac_xpath,
+    )
+
+    y = np.zeros(len(abundances.species))
+
+    labels = []
+    rows = []
+    cols = []
+    forward_data = []
+    reverse_data = []
+
+    for i, zone in enumerate(abundances.labels):
+        if np.isnan(t9[i]) or np.isnan(rho[i]):
+            continue
+
+        indices, values = abundances.get_row(zone)
+        y[indices] = values
+
+        p_forward = _compute_abundance_products(y, *reactant_indices)
+        p_reverse = _compute_abundance_products(y, *product_indices)
+        p_reverse[weak] = 0
+
+        y[indices] = 0
+
+        active = np.flatnonzero((p_forward != 0) | (p_reverse != 0))
+
+        forward = np.zeros(len(active))
+        reverse = np.zeros(len(active))
+        for k, j in enumerate(active.tolist()):
+            forward[k], reverse[k] = net.compute_rates_for_reaction(
+                reactions[j],
+                t9[i],
+                forward=user_rates.get(reactions[j], len(labels)),
+            )
+
+        forward *= (
+            np.power(rho[i], n_reactants[active] - 1)
+            / forward_dup[active]
+            * p_forward[active]
+        )
+        reverse *= (
+            np.power(rho[i], n_products[active] - 1)
+            / reverse_dup[active]
+            * p_reverse[active]
+        )
+
+        rows.append(np.full(len(active), len(labels)))
+        cols.append(active)
+        forward_data.append(forward)
+        reverse_data.append(reverse)
+        labels.append(zone)
+
+    shape = (len(labels), len(reactions))
+
+    if labels:
+        rows = np.concatenate(rows)
+        cols = np.concatenate(cols)
+        forward_data = np.concatenate(forward_data)
+        reverse_data = np.concatenate(reverse_data)
+    else:
+        rows = cols = np.zeros(0, dtype=np.intp)
+        forward_data = reverse_data = np.zeros(0)
+
+    return {
+        "zones": labels,
+        "reactions": reactions,
+        "forward": csr_matrix((forward_data, (rows, cols)), shape=shape),
+        "reverse": csr_matrix((reverse_data, (rows, cols)), shape=shape),
+    }
+
+
+class Rate_Stage:
+    """A class for storing the rate part of the flows of the valid reactions at a fixed temperature and density.
+
+    The forward and reverse rates are evaluated once, multiplied by the appropriate power of the density, and divided by the duplicate factors.  Flows for any number of abundance vectors at that state then only require the abundance products, so the object can be kept and reused, for example, in iterative solvers.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K.
+
+        ``rho`` (:obj:`float`):  The density in g/cc.
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*), where
+        *t9* is the temperature in billions of Kelvin and *reaction*
+        is a `wnutils <https://wnutils.readthedocs.io>`_ reaction
+        instance.  Other data can be bound to the function.
+
+    """
+
+    @wi.timed("rate stage")
+    def __init__(
+        self, net, t9, rho, nuc_xpath="", reac_xpath="", user_funcs=""
+    ):
+        self.net = net
+        self.t9 = t9
+        self.rho = rho
+        self.valid_reactions = net.get_valid_reactions(
+            nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+        )
+        self.reactions = list(self.valid_reactions.keys())
+        forward, reverse = _compute_rate_arrays(
+            net,
+            np.array([t9], dtype=float),
+            np.array([rho], dtype=float),
+            self.valid_reactions,
+            net.get_reaction_table(),
+            nuc_xpath,
+            reac_xpath,
+            user_funcs,
+        )
+        self.forward = forward[0]
+        self.reverse = reverse[0]
+        self.species_indices = {}
+
+    def _get_species_indices(self, species):
+        key = tuple(species)
+        if key not in self.species_indices:
+            species_index = {sp: i for i, sp in enumerate(species)}
+            self.species_indices[key] = (
+                _get_padded_species_indices(
+                    self.valid_reactions, "nuclide_reactants", species_index
+                ),
+                _get_padded_species_indices(
+                    self.valid_reactions, "nuclide_products", species_index
+                ),
+            )
+        return self.species_indices[key]
+
+    @wi.timed("abundance contraction")
+    def compute_flows(self, abundances, species):
+        """Method to compute the flows for arrays of abundances.
+
+        Args:
+            ``abundances`` (:obj:`numpy.array`):  The abundances (Y, mass fraction divided by mass number) of the species in the order given by *species*.  For several abundance vectors, a two-dimensional array with one vector per row.
+
+            ``species`` (:obj:`list`):  The names of the species corresponding to the columns of *abundances*.  Species not in the list have zero abundance.
+
+        Returns:
+            A :obj:`dict` with three entries.  The entry *reactions* is a :obj:`list` of the valid reaction strings.  The entries *forward* and *reverse* are :obj:`numpy.array` objects giving the forward and reverse flows of the reactions, with shape (number of reactions,) for a one-dimensional *abundances* and (number of rows, number of reactions) for a two-dimensional *abundances*.
+
+        """
+
+        y = np.asarray(abundances, dtype=float)
+
+        reactant_indices, product_indices = self._get_species_indices(species)
+
+        return {
+            "reactions": self.reactions,
+            "forward": self.forward
+            * _compute_abundance_products(y, *reactant_indices),
+            "reverse": self.reverse
+            * _compute_abundance_products(y, *product_indices),
+        }
+
+    def compute_flows_for_mass_fractions(self, mass_fractions):
+        """Method to compute the flows for a set of mass fractions.
+
+        Args:
+            ``mass_fractions`` (:obj:`float`): A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of mass fractions.
+
+        Returns:
+            A :obj:`dict` of reactions with each
+            item in the dictionary a tuple giving the forward and
+            reverse flow.
+
+        """
+
+        species = list(self.net.get_nuclides().keys())
+        species_index = {sp: i for i, sp in enumerate(species)}
+
+        y = np.zeros(len(species))
+        for key, x in mass_fractions.items():
+            i = species_index.get(key[0])
+            if i is not None:
+                y[i] = x / key[2]
+
+        flows = self.compute_flows(y, species)
+
+        return dict(
+            zip(
+                self.reactions,
+                zip(flows["forward"].tolist(), flows["reverse"].tolist()),
+            )
+        )
+
+
+def _compute_link_flows_for_valid_reactions(
+    net,
+    t9,
+    rho,
+    mass_fractions,
+    valid_reactions,
+    table,
+    scale,
+    user_rates,
+    i_state,
+    direction,
+    order,
+):
+    nuclides = net.get_nuclides()
+
+    link_flows = {}
+
+    for reaction in valid_reactions:
+        tup_array = []
+        _reaction = valid_reactions[reaction]
+
+        reactants = _reaction.nuclide_reactants
+        products = _reaction.nuclide_products
+        i_reaction = table["index"][reaction]
+
+        forward, reverse = net.compute_rates_for_reaction(
+            reaction, t9, forward=user_rates.get(reaction, i_state)
+        )
+
+        if direction == "forward" or direction == "both":
+            forward *= np.power(
+                rho, table["number of reactants"][i_reaction] - 1
+            )
+            forward /= table["forward duplicate factor"][i_reaction]
+
+            for i in range(len(reactants)):
+                source = reactants[i]
+                p_source = _compute_abundance_product(
+                    net, mass_fractions, reactants, exclude_index=i
+                )
+                for target in products:
+                    if order == "normal":
+                        tup = (source, target, forward * p_source * scale)
+                    else:
+                        tup = (target, source, forward * p_source * scale)
+                    tup_array.append(tup)
+
+                if direction == "both":
+                    for target in reactants:
+                        if order == "normal":
+                            tup = (source, target, -forward * p_source * scale)
+                        else:
+                            tup = (target, source, -forward * p_source * scale)
+                        tup_array.append(tup)
+
+        if not table["weak"][i_reaction]:
+            if direction == "reverse" or direction == "both":
+                reverse *= np.power(
+                    rho, table["number of products"][i_reaction] - 1
+                )
+                reverse /= table["reverse duplicate factor"][i_reaction]
+
+                for i in range(len(products)):
+                    source = products[i]
+                    p_source = _compute_abundance_product(
+                        net, mass_fractions, products, exclude_index=i
+                    )
+                    for target in reactants:
+                        if order == "normal":
+                            tup = (source, target, reverse * p_source * scale)
+                        else:
+                            tup = (target, source, reverse * p_source * scale)
+                        tup_array.append(tup)
+
+                    if direction == "both":
+                        for target in products:
+                            if order == "normal":
+                                tup = (
+                                    source,
+                                    target,
+                                    -reverse * p_source * scale,
+                                )
+                            else:
+                                tup = (
+                                    target,
+                                    source,
+                                    -reverse * p_source * scale,
+                                )
+                            tup_array.append(tup)
+
+        link_flows[reaction] = tup_array
+
+    return link_flows
+
+
+@wi.timed("link flows")
+def compute_link_flows(
+    net,
+    t9,
+    rho,
+    mass_fractions,
+    nuc_xpath="",
+    reac_xpath="",
+    user_funcs="",
+    direction="both",
+    order="normal",
+):
+    """A routine to compute link flows for a given set of mass fractions at the input temperature and density.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the flows.
+
+        ``rho`` (:obj:`float`):  The density in g/cc at which to compute the flows.
+
+        ``mass_fractions`` (:obj:`float`): A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of mass fractions.
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*), where
+        *t9* is the temperature in billions of Kelvin and *reaction*
+        is a `wnutils <https://wnutils.readthedocs.io>`_ reaction
+        instance.  Other data can be bound to the function.
+
+        ``direction`` (:obj:`str`, optional):  A string indicating the direction of the links ("forward", from reactants to products; "reverse", from products to reactants; "both", both "forward" and "reverse").  Default is "both".
+
+        ``order`` (:obj:`str`, optional):  A string indicating the order of the links.  Default is *normal*, in which the *source* and *target* of the link are in the time-forward direction of the reaction.  For *reversed*, the *source* and *target* are in the opposite of the time-forward direction of the reaction such that the *target* is the *contribution* to the *source* over some interval.
+
+    Returns:
+        A :obj:`dict` of reactions with each
+        item in the dictionary an array of three-element :obj:`tuple` objects.
+        The tuple elements are the *source*, *target*, and *link flow*.
+        The *source* and *target* are determined from the time-forward
+        direction of the reaction.
+
+    """
+
+    assert (
+        direction == "forward"
+        or direction == "reverse"
+        or direction == "both"
+        or direction == "all"
+    )
+    assert order == "normal" or order == "reversed"
+
+    valid_reactions = net.get_valid_reactions(
+        nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+    )
+
+    table = net.get_reaction_table()
+
+    scale = 1
+
+    return _compute_link_flows_for_valid_reactions(
+        net,
+        t9,
+        rho,
+        mass_fractions,
+        valid_reactions,
+        table,
+        scale,
+        _User_Rates(net, [t9], user_funcs, None, nuc_xpath, reac_xpath),
+        0,
+        direction,
+        order,
+    )
+
+
+@wi.timed("species link flows")
+def compute_link_flows_for_species(
+    net,
+    t9,
+    rho,
+    mass_fractions,
+    species,
+    nuc_xpath="",
+    reac_xpath="",
+    user_funcs="",
+    direction="both",
+    order="normal",
+):
+    """A routine to compute link flows of the reactions involving a set of species for a given set of mass fractions at the input temperature and density.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the flows.
+
+        ``rho`` (:obj:`float`):  The density in g/cc at which to compute the flows.
+
+        ``mass_fractions`` (:obj:`float`): A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of mass fractions.
+
+        ``species`` (:obj:`list`): A list of the names of the species.  Only the valid reactions in which at least one of the species participates are included (see :meth:`wnnet.net.Net.get_reactions_for_species`).
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*), where
+        *t9* is the temperature in billions of Kelvin and *reaction*
+        is a `wnutils <https://wnutils.readthedocs.io>`_ reaction
+        instance.  Other data can be bound to the function.
+
+        ``direction`` (:obj:`str`, optional):  A string indicating the direction of the links ("forward", from reactants to products; "reverse", from products to reactants; "both", both "forward" and "reverse").  Default is "both".
+
+        ``order`` (:obj:`str`, optional):  A string indicating the order of the links.  Default is *normal*, in which the *source* and *target* of the link are in the time-forward direction of the reaction.  For *reversed*, the *source* and *target* are in the opposite of the time-forward direction of the reaction such that the *target* is the *contribution* to the *source* over some interval.
+
+    Returns:
+        A :obj:`dict` of reactions with each
+        item in the dictionary an array of three-element :obj:`tuple` objects.
+        The tuple elements are the *source*, *target*, and *link flow*.
+        The *source* and *target* are determined from the time-forward
+        direction of the reaction.
+
+    """
+
+    assert (
+        direction == "forward" or direction == "reverse" or direction == "both"
+    )
+    assert order == "normal" or order == "reversed"
+
+    scale = 1
+
+    return _compute_link_flows_for_valid_reactions(
+        net,
+        t9,
+        rho,
+        mass_fractions,
+        net.get_reactions_for_species(
+            species, nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+        ),
+        net.get_reaction_table(),
+        scale,
+        _User_Rates(net, [t9], user_funcs, None, nuc_xpath, reac_xpath),
+        0,
+        direction,
+        order,
+    )
+
+
+@wi.timed("zone link flows")
+def compute_link_flows_for_zones(
+    net,
+    zones,
+    nuc_xpath="",
+    reac_xpath="",
+    user_funcs="",
+    direction="both",
+    include_dt=False,
+    order="normal",
+):
+    """A routine to compute link flows for a set of zones.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*, *zone*), where
+        *t9* is the temperature in billions of Kelvin and *reaction* and
+        *zone* are `wnutils <https://wnutils.readthedocs.io>`_ reaction and
+        zone instances.  Other data can be bound to the function.
+        Functions marked with :func:`wnnet.rates.batch_user_rate` are
+        instead called once per reaction for all the zones (see
+        :meth:`wnnet.net.Net.compute_user_rates`).
+
+        ``direction`` (:obj:`str`, optional):  A string indicating the direction of the links ("forward", from reactants to products; "reverse", from products to reactants; "both", both "forward" and "reverse").  Default is "both".
+
+        ``include_dt`` (:obj:`bool`, optional):  Boolean determining whether to include the *dt* (time interval) in the flow (True) or not (False).  Default is False.
+
+        ``order`` (:obj:`str`, optional):  A string indicating the order of the links.  Default is *normal*, in which the *source* and *target* of the link are in the time-forward direction of the reaction.  For *reversed*, the *source* and *target* are in the opposite of the time-forward direction of the reaction such that the *target* is the *contribution* to the *source* over some interval.
+
+    Returns:
+        A :obj:`dict` of flow links for each zone.  The data for
+        each zone are themselves a :obj:`dict` of reactions with each
+        item in the dictionary an array of three-element :obj:`tuple` objects.
+        The tuple elements are the *source*, *target*, and *link flow*.
+        The *source* and *target* are determined from the time-forward
+        direction of the reaction.
+
+    """
+
+    assert (
         direction == "forward" or direction == "reverse" or direction == "both"
     )
     assert order == "normal" or order == "reversed"
@@ -414,44 +1133,374 @@ def compute_link_flows_for_zones(
         nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
     )
 
-    dups = net.compute_duplicate_factors()
+    table = net.get_reaction_table()
+
+    labels, user_rates = _get_user_rates_for_zones(
+        net, zones, user_funcs, nuc_xpath, reac_xpath
+    )
 
     zone_link_flows = {}
 
-    for zone in zones:
+    for i, zone in enumerate(labels):
         props = zones[zone]["properties"]
-        f = {}
-        if s_t9 in props and s_rho in props:
-            if include_dt:
-                scale = float(props[s_dt])
-            else:
-                scale = 1
-            _user_funcs = {}
-            if user_funcs:
-                for func in user_funcs:
-                    _user_funcs[
-                        func
-                    ] = lambda reaction, t9, func=func: user_funcs[func](
-                        reaction, t9, zones[zone]
+        if include_dt:
+            scale = float(props[s_dt])
+        else:
+            scale = 1
+        zone_link_flows[zone] = _compute_link_flows_for_valid_reactions(
+            net,
+            float(props[s_t9]),
+            float(props[s_rho]),
+            zones[zone]["mass fractions"],
+            valid_reactions,
+            table,
+            scale,
+            user_rates,
+            i,
+            direction,
+            order,
+        )
+
+    return zone_link_flows
+
+
+class Link_Flow_Accumulator:
+    """A class for integrating link flows over time as zones are added one at a time.
+
+    The links of the valid reactions are laid out once, so adding a zone only requires the rates and the abundance products for that zone, and the integrated flows are stored in a single array with one entry per link.  This avoids keeping the link flows of every zone, as :meth:`compute_link_flows_for_zones` does.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*, *zone*), where
+        *t9* is the temperature in billions of Kelvin and *reaction* and
+        *zone* are `wnutils <https://wnutils.readthedocs.io>`_ reaction and
+        zone instances.  Other data can be bound to the function.
+
+        ``direction`` (:obj:`str`, optional):  A string indicating the direction of the links ("forward", from reactants to products; "reverse", from products to reactants; "both", both "forward" and "reverse").  Default is "both".
+
+        ``order`` (:obj:`str`, optional):  A string indicating the order of the links.  Default is *normal*, in which the *source* and *target* of the link are in the time-forward direction of the reaction.  For *reversed*, the *source* and *target* are in the opposite of the time-forward direction of the reaction.
+
+        ``method`` (:obj:`str`, optional):  A string indicating how to integrate over time.  For *dt*, the link flows of each zone are multiplied by the zone's *dt* property, as with the *include_dt* option of :meth:`compute_link_flows_for_zones`.  For *left*, the left-point rule, and *trapezoid*, the trapezoidal rule, the intervals are the differences of the *time* properties of successive zones, which must be added in time order.  Default is *dt*.
+
+    """
+
+    def __init__(
+        self,
+        net,
+        nuc_xpath="",
+        reac_xpath="",
+        user_funcs="",
+        direction="both",
+        order="normal",
+        method="dt",
+    ):
+        assert (
+            direction == "forward"
+            or direction == "reverse"
+            or direction == "both"
+        )
+        assert order == "normal" or order == "reversed"
+        assert method == "dt" or method == "left" or method == "trapezoid"
+
+        self.net = net
+        self.nuc_xpath = nuc_xpath
+        self.reac_xpath = reac_xpath
+        self.user_funcs = user_funcs
+        self.method = method
+
+        self.valid_reactions = net.get_valid_reactions(
+            nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+        )
+        self.reactions = list(self.valid_reactions.keys())
+        self.species = list(net.get_nuclides().keys())
+        self.species_index = {sp: i for i, sp in enumerate(self.species)}
+
+        table = net.get_reaction_table()
+        index = [table["index"][r] for r in self.reactions]
+        self.weak = table["weak"][index]
+        self.forward_factor = (
+            table["number of reactants"][index] - 1,
+            table["forward duplicate factor"][index],
+        )
+        self.reverse_factor = (
+            table["number of products"][index] - 1,
+            table["reverse duplicate factor"][index],
+        )
+
+        self.reactant_indices = _get_padded_species_indices(
+            self.valid_reactions, "nuclide_reactants", self.species_index
+        )
+        self.product_indices = _get_padded_species_indices(
+            self.valid_reactions, "nuclide_products", self.species_index
+        )
+
+        self._set_links(direction, order)
+
+        self.flows = np.zeros(len(self.link_reaction))
+        self.number_of_zones = 0
+        self.last_time = None
+        self.last_flows = None
+
+    def _set_links(self, direction, order):
+        reaction = []
+        source = []
+        target = []
+        side = []
+        position = []
+        sign = []
+
+        for i, r in enumerate(self.reactions):
+            reactants = self.valid_reactions[r].nuclide_reactants
+            products = self.valid_reactions[r].nuclide_products
+
+            sides = []
+            if direction != "reverse":
+                sides.append((0, reactants, products))
+            if direction != "forward" and not self.weak[i]:
+                sides.append((1, products, reactants))
+
+            for s, sources, others in sides:
+                for j, sp in enumerate(sources):
+                    targets = [(tg, 1.0) for tg in others]
+                    if direction == "both":
+                        targets += [(tg, -1.0) for tg in sources]
+                    for tg, sg in targets:
+                        if order == "normal":
+                            source.append(self.species_index[sp])
+                            target.append(self.species_index[tg])
+                        else:
+                            source.append(self.species_index[tg])
+                            target.append(self.species_index[sp])
+                        reaction.append(i)
+                        side.append(s)
+                        position.append(j)
+                        sign.append(sg)
+
+        self.link_reaction = np.array(reaction, dtype=np.intp)
+        self.link_source = np.array(source, dtype=np.intp)
+        self.link_target = np.array(target, dtype=np.intp)
+        self.link_side = np.array(side, dtype=np.intp)
+        self.link_position = np.array(position, dtype=np.intp)
+        self.link_sign = np.array(sign)
+
+    def _compute_link_flows(self, zone):
+        props = zone["properties"]
+        t9 = float(props["t9"])
+        rho = float(props["rho"])
+
+        y = np.zeros(len(self.species))
+        for key, x in zone["mass fractions"].items():
+            i = self.species_index.get(key[0])
+            if i is not None:
+                y[i] = x / key[2]
+
+        # Abundance products of the other members of each link source
+
+        p_link = np.zeros(len(self.link_reaction))
+        for s, (indices, mask, missing) in enumerate(
+            (self.reactant_indices, self.product_indices)
+        ):
+            factors = np.where(mask, y[indices], 1.0)
+            on_side = self.link_side == s
+            for j in range(indices.shape[1]):
+                at_j = on_side & (self.link_position == j)
+                others = factors.copy()
+                others[:, j] = 1.0
+                p_link[at_j] = others.prod(axis=1)[self.link_reaction[at_j]]
+            p_link[on_side & missing[self.link_reaction]] = 0
+
+        # Rates only for the reactions with a non-zero link
+
+        active = np.unique(self.link_reaction[p_link != 0])
+
+        user_rates = _User_Rates(
+            self.net,
+            [t9],
+            self.user_funcs,
+            [zone],
+            self.nuc_xpath,
+            self.reac_xpath,
+        )
+
+        rates = np.zeros((2, len(self.reactions)))
+        for i in active.tolist():
+            rates[:, i] = self.net.compute_rates_for_reaction(
+                self.reactions[i],
+                t9,
+                forward=user_rates.get(self.reactions[i], 0),
+            )
+
+        for s, (power, dup) in enumerate(
+            (self.forward_factor, self.reverse_factor)
+        ):
+            rates[s, active] *= np.power(rho, power[active]) / dup[active]
+
+        return (
+            self.link_sign * rates[self.link_side, self.link_reaction] * p_link
+        )
+
+    @wi.timed("link flow accumulation")
+    def add_zone(self, zone):
+        """Method to add the link flows of a zone to the integrated link flows.
+
+        Args:
+            ``zone``: A `wnutils <https://wnutils.readthedocs.io>`_ zone instance.  Zones without *t9* or *rho* properties are skipped.
+
+        Returns:
+            On successful return, the link flows of the zone have been added to the integrated link flows.
+
+        """
+
+        props = zone["properties"]
+        if "t9" not in props or "rho" not in props:
+            return
+
+        flows = self._compute_link_flows(zone)
+
+        if self.method == "dt":
+            self.flows += float(props["dt"]) * flows
+        else:
+            time = float(props["time"])
+            if self.last_flows is not None:
+                if self.method == "left":
+                    self.flows += (time - self.last_time) * self.last_flows
+                else:
+                    self.flows += (
+                        0.5
+                        * (time - self.last_time)
+                        * (self.last_flows + flows)
                     )
-            f = _compute_link_flows_for_valid_reactions(
-                net,
-                float(props[s_t9]),
-                float(props[s_rho]),
-                zones[zone]["mass fractions"],
-                valid_reactions,
-                dups,
-                scale,
-                nuc_xpath,
-                reac_xpath,
-                _user_funcs,
-                direction,
-                order,
+            self.last_time = time
+            self.last_flows = flows
+
+        self.number_of_zones += 1
+
+    def add_zones(self, zones):
+        """Method to add the link flows of a set of zones to the integrated link flows.
+
+        Args:
+            ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.  For the *left* and *trapezoid* methods, the zones must be in time order.
+
+        Returns:
+            On successful return, the link flows of the zones have been added to the integrated link flows.
+
+        """
+
+        for zone in zones:
+            self.add_zone(zones[zone])
+
+    def get_link_flows(self):
+        """Method to return the integrated link flows for each reaction.
+
+        Returns:
+            A :obj:`dict` of reactions with each
+            item in the dictionary an array of three-element :obj:`tuple` objects.
+            The tuple elements are the *source*, *target*, and integrated
+            *link flow*, as for :meth:`compute_link_flows`.  The result can
+            be drawn with :meth:`wnnet.graph.create_link_flow_graph`.
+
+        """
+
+        result = {r: [] for r in self.reactions}
+
+        for i, source, target, flow in zip(
+            self.link_reaction.tolist(),
+            self.link_source.tolist(),
+            self.link_target.tolist(),
+            self.flows.tolist(),
+        ):
+            result[self.reactions[i]].append(
+                (self.species[source], self.species[target], flow)
             )
 
-            zone_link_flows[zone] = f
+        return result
 
-    return zone_link_flows
+    def get_matrix(self):
+        """Method to return the integrated link flows summed over reactions.
+
+        Returns:
+            A `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ with shape (number of species, number of species) giving the integrated link flow from the species of each row to the species of each column.  The species are in the order of :meth:`wnnet.net.Net.get_nuclides`.
+
+        """
+
+        from scipy.sparse import csr_matrix
+
+        return csr_matrix(
+            (self.flows, (self.link_source, self.link_target)),
+            shape=(len(self.species), len(self.species)),
+        )
+
+
+class _User_Rates:
+    # The forward rates of the reactions with user-defined rates at a set of
+    # states.  A reaction is evaluated for all the states the first time one
+    # of its rates is needed, so reactions that are never computed are never
+    # evaluated.
+
+    def __init__(self, net, t9, user_funcs, zones, nuc_xpath, reac_xpath):
+        self.net = net
+        self.t9 = np.asarray(t9, dtype=float)
+        self.user_funcs = user_funcs
+        self.zones = zones
+        self.nuc_xpath = nuc_xpath
+        self.reac_xpath = reac_xpath
+        self.rates = {}
+
+        self.user_reactions = set()
+        if user_funcs:
+            table = net.get_reaction_table()
+            self.user_reactions = {
+                table["reactions"][i]
+                for i in np.flatnonzero(
+                    table["rate type"] == wr.RATE_TYPES.index("user_rate")
+                )
+            }
+
+    def get(self, reaction, i):
+        if reaction not in self.user_reactions:
+            return None
+        if reaction not in self.rates:
+            self.rates[reaction] = self.net.compute_user_rates(
+                self.t9,
+                self.user_funcs,
+                zones=self.zones,
+                nuc_xpath=self.nuc_xpath,
+                reac_xpath=self.reac_xpath,
+                reactions=[reaction],
+            ).get(reaction)
+        rates = self.rates[reaction]
+        if rates is None:
+            return None
+        return float(rates[i])
+
+
+def _get_user_rates_for_zones(net, zones, user_funcs, nuc_xpath, reac_xpath):
+    labels = []
+    for zone in zones:
+        props = zones[zone]["properties"]
+        if "t9" in props and "rho" in props:
+            labels.append(zone)
+
+    return labels, _User_Rates(
+        net,
+        [float(zones[zone]["properties"]["t9"]) for zone in labels],
+        user_funcs,
+        [zones[zone] for zone in labels],
+        nuc_xpath,
+        reac_xpath,
+    )
 
 
 def _compute_abundance_product(net, x, sp_array, exclude_index=None):
@@ -467,3 +1516,329 @@ def _compute_abundance_product(net, x, sp_array, exclude_index=None):
                 y = 0
             result *= y
     return result
+
+
+def get_flow_currents_for_zones(zones):
+    """A routine to retrieve the integrated flow currents stored in a set of zones.
+
+    Args:
+        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.  The flow currents are the zone properties with names of the form ("flow current", *reaction*).
+
+    Returns:
+        A :obj:`dict` with three entries.  The entry *zones* is a :obj:`list` of the zone labels, the entry *reactions* is a :obj:`list` of the reaction strings for which at least one zone has a flow current, and the entry *currents* is a two-dimensional :obj:`numpy.array` with shape (number of zones, number of reactions) giving the flow currents.  Currents not present in a zone are zero.
+
+    """
+
+    labels = []
+    reactions = {}
+    rows = []
+    cols = []
+    values = []
+
+    for i, zone in enumerate(zones):
+        labels.append(zone)
+        props = zones[zone]["properties"]
+        for prop in props:
+            if isinstance(prop, tuple) and prop[0] == "flow current":
+                if prop[1] not in reactions:
+                    reactions[prop[1]] = len(reactions)
+                rows.append(i)
+                cols.append(reactions[prop[1]])
+                values.append(props[prop])
+
+    currents = np.zeros((len(labels), len(reactions)))
+    if values:
+        currents[rows, cols] = np.array(values, dtype=float)
+
+    return {
+        "zones": labels,
+        "reactions": list(reactions.keys()),
+        "currents": currents,
+    }
+
+
+@wi.timed("zone flow currents")
+def compute_flow_currents_for_zones(
+    net, zones, nuc_xpath="", reac_xpath="", user_funcs="", attach=False
+):
+    """A routine to compute the integrated flow currents of a set of zones from their flows.
+
+    The integrated current of a reaction in a zone is the sum over that zone and the preceding ones of the net flow (forward minus reverse) multiplied by the zone's *dt* property, the quantity stored as the ("flow current", *reaction*) zone properties.  The flows of all zones are computed with :meth:`compute_flows_for_zone_abundances`.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data* in time order.  Zones without *t9* or *rho* properties add no current.
+
+        ``nuc_xpath`` (:obj:`str`, optional): XPath expression
+        to select nuclides for flow computations.  Defaults to all
+        species.
+
+        ``reac_xpath`` (:obj:`str`, optional): XPath expression
+        to select reactions for flow computations.  Defaults to all
+        reactions.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*, *zone*), where
+        *t9* is the temperature in billions of Kelvin and *reaction* and
+        *zone* are `wnutils <https://wnutils.readthedocs.io>`_ reaction and
+        zone instances.  Other data can be bound to the function.
+
+        ``attach`` (:obj:`bool`, optional):  Boolean determining whether to also store the currents in the zones as ("flow current", *reaction*) properties (True) or not (False).  Default is False.
+
+    Returns:
+        A :obj:`dict` in the format of :meth:`get_flow_currents_for_zones` with the valid reactions as the *reactions*.  The last row of *currents* gives the currents integrated over all the zones.
+
+    """
+
+    abundances = wz.Zone_Abundances(net, zones)
+
+    flows = compute_flows_for_zone_abundances(
+        net,
+        abundances,
+        nuc_xpath=nuc_xpath,
+        reac_xpath=reac_xpath,
+        user_funcs=user_funcs,
+    )
+
+    rows = [abundances.zone_index[zone] for zone in flows["zones"]]
+    dt = np.array(
+        [float(zones[zone]["properties"]["dt"]) for zone in flows["zones"]]
+    )
+
+    currents = np.zeros((len(abundances.labels), len(flows["reactions"])))
+    currents[rows, :] = (
+        (flows["forward"] - flows["reverse"]).multiply(dt[:, np.newaxis])
+    ).toarray()
+    np.cumsum(currents, axis=0, out=currents)
+
+    if attach:
+        for i, zone in enumerate(abundances.labels):
+            props = zones[zone]["properties"]
+            for j, reaction in enumerate(flows["reactions"]):
+                props[("flow current", reaction)] = str(currents[i, j])
+
+    return {
+        "zones": abundances.labels,
+        "reactions": flows["reactions"],
+        "currents": currents,
+    }
+
+
+def get_link_flow_matrix(net, link_flows):
+    """A routine to sum link flows over reactions into a sparse species matrix.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``link_flows`` (:obj:`dict`): A dictionary of link flows, as returned by :meth:`compute_link_flows`.
+
+    Returns:
+        A `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ with shape (number of species, number of species) giving the link flow from the species of each row to the species of each column.  The species are in the order of :meth:`wnnet.net.Net.get_nuclides`.
+
+    """
+
+    from scipy.sparse import csr_matrix
+
+    species_index = {sp: i for i, sp in enumerate(net.get_nuclides())}
+
+    rows = []
+    cols = []
+    data = []
+    for r in link_flows:
+        for source, target, flow in link_flows[r]:
+            rows.append(species_index[source])
+            cols.append(species_index[target])
+            data.append(flow)
+
+    return csr_matrix(
+        (data, (rows, cols)), shape=(len(species_index), len(species_index))
+    )
+
+
+@wi.timed("group link flows")
+def compute_group_link_flows(net, link_flows, group="z"):
+    """A routine to aggregate link flows into flows between groups of species.
+
+    The species link-flow matrix *L* is projected onto the groups as *P*\ :sup:`T` *L* *P*, where *P* is the projection matrix from :meth:`wnnet.nuc.Nuc.get_projection_matrix`.  Links within a group add to the diagonal.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``link_flows``: A :obj:`dict` of link flows, as returned by :meth:`compute_link_flows` or :meth:`Link_Flow_Accumulator.get_link_flows`, or a sparse species matrix of link flows, as returned by :meth:`get_link_flow_matrix` or :meth:`Link_Flow_Accumulator.get_matrix`.
+
+        ``group`` (:obj:`str`, optional): A string giving the group, one of :data:`wnnet.nuc.GROUPS`.  Default is *z*, the elements.
+
+    Returns:
+        A :obj:`dict` with three entries.  The entry *groups* is a :obj:`numpy.array` giving the atomic, mass, or neutron number of the groups.  The entry *flows* is a `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ with shape (number of groups, number of groups) giving the flow from the group of each row to the group of each column, and the entry *net flows* is that matrix minus its transpose.
+
+    """
+
+    if isinstance(link_flows, dict):
+        matrix = get_link_flow_matrix(net, link_flows)
+    else:
+        matrix = link_flows
+
+    projection = net.get_projection_matrix(group=group)
+    p = projection["matrix"]
+
+    flows = (p.T @ matrix @ p).tocsr()
+
+    return {
+        "groups": projection["groups"],
+        "flows": flows,
+        "net flows": (flows - flows.T).tocsr(),
+    }
+
+
+@wi.timed("zone group link flows")
+def compute_group_link_flows_for_zones(net, zone_link_flows, group="z"):
+    """A routine to aggregate the link flows of a set of zones into flows between groups of species.
+
+    The link flows of all zones are stacked into one sparse matrix, which is projected onto the groups with a single pair of sparse products.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``zone_link_flows`` (:obj:`dict`): A dictionary of the link flows of each zone, as returned by :meth:`compute_link_flows_for_zones`.
+
+        ``group`` (:obj:`str`, optional): A string giving the group, one of :data:`wnnet.nuc.GROUPS`.  Default is *z*, the elements.
+
+    Returns:
+        A :obj:`dict` with four entries.  The entry *zones* is a :obj:`list` of the zone labels, and the entry *groups* is as for :meth:`compute_group_link_flows`.  The entries *flows* and *net flows* are :obj:`dict` objects with the zone labels as keys and, as values, the group flow matrices of the zones as for :meth:`compute_group_link_flows`.
+
+    """
+
+    from scipy.sparse import csr_matrix, identity, kron
+
+    labels = list(zone_link_flows.keys())
+    species_index = {sp: i for i, sp in enumerate(net.get_nuclides())}
+    n_species = len(species_index)
+
+    rows = []
+    cols = []
+    data = []
+    for k, zone in enumerate(labels):
+        offset = k * n_species
+        for r in zone_link_flows[zone]:
+            for source, target, flow in zone_link_flows[zone][r]:
+                rows.append(offset + species_index[source])
+                cols.append(species_index[target])
+                data.append(flow)
+
+    stacked = csr_matrix(
+        (data, (rows, cols)), shape=(len(labels) * n_species, n_species)
+    )
+
+    projection = net.get_projection_matrix(group=group)
+    p = projection["matrix"]
+    n_groups = p.shape[1]
+
+    left = kron(identity(len(labels), format="csr"), p.T, format="csr")
+    result = (left @ (stacked @ p)).tocsr()
+
+    flows = {}
+    net_flows = {}
+    for k, zone in enumerate(labels):
+        flows[zone] = result[k * n_groups : (k + 1) * n_groups]
+        net_flows[zone] = (flows[zone] - flows[zone].T).tocsr()
+
+    return {
+        "zones": labels,
+        "groups": projection["groups"],
+        "flows": flows,
+        "net flows": net_flows,
+    }
+
+
+@wi.timed("top flows")
+def get_top_flows(net, flows, k, flow_type="net", species=None):
+    """A routine to find the reactions with the largest flows in each zone of a batch of flows.
+
+    The flows are processed in blocks of zones, and the largest flows in each zone are found with a partial sort (:func:`numpy.argpartition`), so only the *k* selected flows are fully sorted.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``flows`` (:obj:`dict`): A dictionary of batched flows with the entries *reactions*, *forward*, and *reverse*, as returned by :meth:`compute_flows_for_zone_abundances` or :meth:`compute_flows_for_abundances`.  The *forward* and *reverse* flows may be dense or sparse, with one row per zone.
+
+        ``k`` (:obj:`int`):  The number of flows to return for each zone.
+
+        ``flow_type`` (:obj:`str`, optional): A string giving the flow to rank.  The possible values are *net*, the forward minus the reverse flow, ranked by absolute value; *forward*; and *reverse*.  Default is *net*.
+
+        ``species`` (:obj:`list`, optional): A list of species names.  If supplied, only reactions in which at least one of the species participates are ranked (see :meth:`wnnet.net.Net.get_reactions_for_species`).  Default is all reactions in *flows*.
+
+    Returns:
+        A :obj:`dict` with four entries.  The entry *zones* is the *zones* entry of *flows*, if present, and the entry *reactions* is the *reactions* entry of *flows*.  The entry *indices* is a two-dimensional :obj:`numpy.array` with shape (number of zones, *k*) giving, for each zone, the indices into *reactions* of the reactions with the largest flows, in decreasing order, and the entry *flows* gives the corresponding flows.  If fewer than *k* reactions are ranked, the arrays have one column per ranked reaction.
+
+    """
+
+    assert (
+        flow_type == "net" or flow_type == "forward" or flow_type == "reverse"
+    )
+
+    reactions = flows["reactions"]
+
+    if species is None:
+        cols = np.arange(len(reactions))
+    else:
+        selected = net.get_reactions_for_species(species)
+        cols = np.array(
+            [j for j, r in enumerate(reactions) if r in selected],
+            dtype=np.intp,
+        )
+
+    forward = flows["forward"]
+    reverse = flows["reverse"]
+    if not hasattr(forward, "tocsr"):
+        forward = np.atleast_2d(forward)
+        reverse = np.atleast_2d(reverse)
+
+    n_zones = forward.shape[0]
+    n_top = min(k, len(cols))
+
+    indices = np.zeros((n_zones, n_top), dtype=np.intp)
+    values = np.zeros((n_zones, n_top))
+
+    block = max(1, _TOP_FLOWS_BLOCK_SIZE // max(len(cols), 1))
+
+    for start in range(0, n_zones, block):
+        end = min(start + block, n_zones)
+
+        if flow_type == "reverse":
+            v = _get_flow_block(reverse, start, end, cols)
+        else:
+            v = _get_flow_block(forward, start, end, cols)
+            if flow_type == "net":
+                v -= _get_flow_block(reverse, start, end, cols)
+
+        if flow_type == "net":
+            key = -np.abs(v)
+        else:
+            key = -v
+
+        if n_top < len(cols):
+            top = np.argpartition(key, n_top - 1, axis=1)[:, :n_top]
+        else:
+            top = np.broadcast_to(np.arange(len(cols)), key.shape)
+
+        order = np.argsort(np.take_along_axis(key, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        indices[start:end] = cols[top]
+        values[start:end] = np.take_along_axis(v, top, axis=1)
+
+    return {
+        "zones": flows.get("zones"),
+        "reactions": reactions,
+        "indices": indices,
+        "flows": values,
+    }
+
+
+def _get_flow_block(matrix, start, end, cols):
+    if hasattr(matrix, "tocsr"):
+        return matrix[start:end][:, cols].toarray()
+    return np.array(matrix[start:end][:, cols], dtype=float)
@@ -1,9 +1,12 @@
 import operator
+import weakref
 from math import floor, log10
+import numpy as np
 import networkx as nx
 import wnnet.net as wn
 import wnnet.zones as wz
 import wnnet.flows as wf
+import wnnet.instrument as wi
 
 
 def get_solar_species():
@@ -406,6 +409,29 @@ def make_t9_rho_flow_string(f_max, t9, rho):
     )
 
 
+def make_link_flow_string(f_max):
+    """The default title function for link flow graphs.
+
+    Args:
+        ``f_max`` (:obj:`float`):  The maximum link flow in the scope of the graph.
+
+    Returns:
+        A :obj:`str`.  The title string.
+
+    """
+
+    def fexp(f):
+        # Add 0.01 for rounding for :.2f mantissa formating
+        return int(floor(log10(abs(f)) + 0.01)) if f != 0.0 else 0
+
+    def fman(f):
+        return f / 10.0 ** fexp(f)
+
+    return "<max. link flow = {:.2f} x 10<sup>{:d}</sup>>".format(
+        fman(f_max), fexp(f_max)
+    )
+
+
 def make_node_label(name, g_names):
     """The default node label function.
 
@@ -480,7 +506,23 @@ def _color_edges(G, net, color_tuples):
             G.edges[edge]["color"] = color[G.edges[edge]["reaction"]]
 
 
-def _get_pos(net, name, state_scaling):
+class _Node_Presentation:
+    def __init__(self):
+        self.positions = {}
+        self.graphviz_names = {}
+        self.subsets = {}
+
+
+_node_presentations = weakref.WeakKeyDictionary()
+
+
+def _get_node_presentation(net):
+    if net not in _node_presentations:
+        _node_presentations[net] = _Node_Presentation()
+    return _node_presentations[net]
+
+
+def _compute_pos(net, name, state_scaling):
     z, a, state = net.xml.get_z_a_state_from_nuclide_name(name)
     n = a - z
     if state == "g":
@@ -491,7 +533,42 @@ def _get_pos(net, name, state_scaling):
     # return str(n) + ".," + str(z) + ".!"
 
 
+def _get_positions(net, names, state_scaling):
+    presentation = _get_node_presentation(net)
+    if state_scaling not in presentation.positions:
+        presentation.positions[state_scaling] = {}
+    positions = presentation.positions[state_scaling]
+    for name in names:
+        if name not in positions:
+            positions[name] = _compute_pos(net, name, state_scaling)
+    return positions
+
+
+def _get_graphviz_names(net, names):
+    g_names = _get_node_presentation(net).graphviz_names
+    missing = [name for name in names if name not in g_names]
+    if missing:
+        g_names.update(net.xml.get_graphviz_names(missing))
+    return g_names
+
+
+def _set_node_positions_and_labels(G, net, state_scaling, node_label_func):
+    positions = _get_positions(net, G.nodes, state_scaling)
+    for node in G.nodes:
+        G.nodes[node]["pos"] = positions[node]
+        G.nodes[node]["label"] = node_label_func(node)
+
+
 def _get_subset_and_anchors(net, induced_nuc_xpath):
+    subsets = _get_node_presentation(net).subsets
+    if induced_nuc_xpath not in subsets:
+        subsets[induced_nuc_xpath] = _compute_subset_and_anchors(
+            net, induced_nuc_xpath
+        )
+    return subsets[induced_nuc_xpath]
+
+
+def _compute_subset_and_anchors(net, induced_nuc_xpath):
     val = []
     dict = {}
     z_dict = {}
@@ -501,8 +578,7 @@ def _get_subset_and_anchors(net, induced_nuc_xpath):
         dict[(nuclides[sp]["z"], nuclides[sp]["a"])] = sp
         if nuclides[sp]["z"] not in z_dict:
             z_dict[nuclides[sp]["z"]] = []
-        else:
-            z_dict[nuclides[sp]["z"]].append(nuclides[sp]["a"])
+        z_dict[nuclides[sp]["z"]].append(nuclides[sp]["a"])
 
     z_array = []
 
@@ -563,10 +639,9 @@ def _apply_special_node_attributes(G, special_node_attributes):
                 G.nodes[node][key] = special_node_attributes[node][key]
 
 
-def _create_flow_graph(
+def _finish_flow_graph(
+    DG,
     net,
-    f,
-    flow_type,
     subset_nuclides,
     anchors,
     allow_isolated_species,
@@ -585,77 +660,12 @@ def _create_flow_graph(
     special_node_attributes,
 ):
 
-    nuclides = net.get_nuclides()
-    reactions = net.get_reactions()
-
     # Solar species
 
     _solar_species = solar_species
     if not solar_species:
         _solar_species = get_solar_species()
 
-    # Solar species
-
-    _solar_species = solar_species
-    if not solar_species:
-        _solar_species = get_solar_species()
-
-    DG = nx.MultiDiGraph()
-
-    for nuc in nuclides:
-        DG.add_node(nuc, shape="box", fontsize=16)
-
-    for r in f:
-        tup = f[r]
-
-        if flow_type == "full":
-            if tup[0] > 0:
-                for reactant in reactions[r].nuclide_reactants:
-                    for product in reactions[r].nuclide_products:
-                        DG.add_edge(
-                            reactant,
-                            product,
-                            weight=tup[0],
-                            reaction=r,
-                            arrowsize=0.2,
-                        )
-
-            if tup[1] > 0:
-                for product in reactions[r].nuclide_products:
-                    for reactant in reactions[r].nuclide_reactants:
-                        DG.add_edge(
-                            product,
-                            reactant,
-                            weight=tup[1],
-                            reaction=r,
-                            arrowsize=0.2,
-                        )
-
-        elif flow_type == "net":
-            net_flow = tup[0] - tup[1]
-
-            if net_flow > 0:
-                for reactant in reactions[r].nuclide_reactants:
-                    for product in reactions[r].nuclide_products:
-                        DG.add_edge(
-                            reactant,
-                            product,
-                            weight=net_flow,
-                            reaction=r,
-                            arrowsize=0.2,
-                        )
-
-            if net_flow < 0:
-                for product in reactions[r].nuclide_products:
-                    for reactant in reactions[r].nuclide_reactants:
-                        DG.add_edge(
-                            product,
-                            reactant,
-                            weight=-net_flow,
-                            reaction=r,
-                            arrowsize=0.2,
-                        )
-
     # Apply attributes
 
     _apply_graph_attributes(DG, graph_attributes)
@@ -715,9 +725,7 @@ def _create_flow_graph(
 
     S2 = nx.subgraph(DG, subset_nuclides)
 
-    for node in S2.nodes:
-        S2.nodes[node]["pos"] = _get_pos(net, node, state_scaling)
-        S2.nodes[node]["label"] = node_label_func(node)
+    _set_node_positions_and_labels(S2, net, state_scaling, node_label_func)
 
     # Title
 
@@ -728,6 +736,110 @@ def _create_flow_graph(
     return S2
 
 
+def _create_flow_graph(
+    net,
+    f,
+    flow_type,
+    subset_nuclides,
+    anchors,
+    allow_isolated_species,
+    reaction_color_tuples,
+    threshold,
+    scale,
+    state_scaling,
+    title_func,
+    node_label_func,
+    scale_edge_weight_func,
+    graph_attributes,
+    node_attributes,
+    edge_attributes,
+    solar_species,
+    solar_node_attributes,
+    special_node_attributes,
+):
+
+    nuclides = net.get_nuclides()
+    reactions = net.get_reactions()
+
+    DG = nx.MultiDiGraph()
+
+    for nuc in nuclides:
+        DG.add_node(nuc, shape="box", fontsize=16)
+
+    for r in f:
+        tup = f[r]
+
+        if flow_type == "full":
+            if tup[0] > 0:
+                for reactant in reactions[r].nuclide_reactants:
+                    for product in reactions[r].nuclide_products:
+                        DG.add_edge(
+                            reactant,
+                            product,
+                            weight=tup[0],
+                            reaction=r,
+                            arrowsize=0.2,
+                        )
+
+            if tup[1] > 0:
+                for product in reactions[r].nuclide_products:
+                    for reactant in reactions[r].nuclide_reactants:
+                        DG.add_edge(
+                            product,
+                            reactant,
+                            weight=tup[1],
+                            reaction=r,
+                            arrowsize=0.2,
+                        )
+
+        elif flow_type == "net":
+            net_flow = tup[0] - tup[1]
+
+            if net_flow > 0:
+                for reactant in reactions[r].nuclide_reactants:
+                    for product in reactions[r].nuclide_products:
+                        DG.add_edge(
+                            reactant,
+                            product,
+                            weight=net_flow,
+                            reaction=r,
+                            arrowsize=0.2,
+                        )
+
+            if net_flow < 0:
+                for product in reactions[r].nuclide_products:
+                    for reactant in reactions[r].nuclide_reactants:
+                        DG.add_edge(
+                            product,
+                            reactant,
+                            weight=-net_flow,
+                            reaction=r,
+                            arrowsize=0.2,
+                        )
+
+    return _finish_flow_graph(
+        DG,
+        net,
+        subset_nuclides,
+        anchors,
+        allow_isolated_species,
+        reaction_color_tuples,
+        threshold,
+        scale,
+        state_scaling,
+        title_func,
+        node_label_func,
+        scale_edge_weight_func,
+        graph_attributes,
+        node_attributes,
+        edge_attributes,
+        solar_species,
+        solar_node_attributes,
+        special_node_attributes,
+    )
+
+
+@wi.timed("flow graph")
 def create_flow_graph(
     net,
     t9,
@@ -787,103 +899,564 @@ def create_flow_graph(
         
         ``allow_isolated_species`` (:obj:`bool`, optional):  Boolean to choose whether to allow isolated species (ones without incoming or outgoing arcs) in the graph.
 
-        ``title_func`` (optional): A `function <https://docs.python.org/3/library/stdtypes.html#functions>`_ that applies the title to the graph.  The function must take one :obj:`float` argument giving the maximum flow. Other data can be bound to the function.  The function must return a :obj:`str` giving the title.  The default is :meth:`wnnet.graph.make_t9_rho_flow_string`.
-        
-        ``node_label_func`` (optional): A `function \
-            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
-            that applies a label to each node in the graph.  The function \
-            must take as argument a species name.  Other data can be bound to \
-            the function.  The function must return a :obj:`str` \
-            giving the label.  \
-            The default is :meth:`wnnet.graph.make_node_label`.
-        
-        ``scale_edge_weight_func`` (optional): A `function \
-            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
-            that applies scales each edge weight in the graph.  The function \
-            must take as four arguments: a dictionary of edge data, the \
-            maximum edge weight in the scope of the graph, a scale factor \
-            by which to scale the weight (input as *scale* to this routine), \
-            and a threshold for not including the edge in the graph \
-            (input as *threshold* to this routine). \
-            Other data can be bound to \
-            the function.  The function must modify the weight in the \
-            edge data and return a :obj:`bool` indicating whether to include \
-            the edge in the graph (True) or not (False).\
-            The default is :meth:`wnnet.graph.scale_edge_weight`.
-        
-        ``graph_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the graph.
+        ``title_func`` (optional): A `function <https://docs.python.org/3/library/stdtypes.html#functions>`_ that applies the title to the graph.  The function must take one :obj:`float` argument giving the maximum flow. Other data can be bound to the function.  The function must return a :obj:`str` giving the title.  The default is :meth:`wnnet.graph.make_t9_rho_flow_string`.
+        
+        ``node_label_func`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that applies a label to each node in the graph.  The function \
+            must take as argument a species name.  Other data can be bound to \
+            the function.  The function must return a :obj:`str` \
+            giving the label.  \
+            The default is :meth:`wnnet.graph.make_node_label`.
+        
+        ``scale_edge_weight_func`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that applies scales each edge weight in the graph.  The function \
+            must take as four arguments: a dictionary of edge data, the \
+            maximum edge weight in the scope of the graph, a scale factor \
+            by which to scale the weight (input as *scale* to this routine), \
+            and a threshold for not including the edge in the graph \
+            (input as *threshold* to this routine). \
+            Other data can be bound to \
+            the function.  The function must modify the weight in the \
+            edge data and return a :obj:`bool` indicating whether to include \
+            the edge in the graph (True) or not (False).\
+            The default is :meth:`wnnet.graph.scale_edge_weight`.
+        
+        ``graph_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the graph.
+
+        ``edge_attributes`` (:obj:`dict`, optional):  A dictionary of grapvhiz attributes for the edges in the graph.
+
+        ``node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the nodes in the graph.
+
+        ``solar_species`` (:obj:`list`, optional):  A list of species to be considered as the naturally occurring species.  The default is the list returned from :meth:`wnnet.graph.get_solar_species`.
+
+        ``solar_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the solar species in the graph.
+
+        ``special_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the special nodes in the graph.  The dictionary has as keys the names of the special nodes and as values a dictionary of graphviz properties to be applied to the given special node.
+
+    Returns:
+        A `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the flows.
+     
+
+    """
+    assert flow_type == "net" or flow_type == "full"
+
+    # Get the subset of nuclides to view in the graph.  Get anchors.
+
+    subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
+
+    # Only reactions involving the subset can give arcs in the graph
+
+    if induced_nuc_xpath:
+        f = wf.compute_flows_for_species(
+            net,
+            t9,
+            rho,
+            mass_fractions,
+            subset_nuclides,
+            reac_xpath=induced_reac_xpath,
+            user_funcs=user_funcs,
+        )
+    else:
+        f = wf.compute_flows(
+            net,
+            t9,
+            rho,
+            mass_fractions,
+            reac_xpath=induced_reac_xpath,
+            user_funcs=user_funcs,
+        )
+
+    # Title
+
+    if not title_func:
+        _title_func = lambda f_max: make_t9_rho_flow_string(f_max, t9, rho)
+    else:
+        _title_func = title_func
+
+    # Node label
+
+    if not node_label_func:
+        g_names = _get_graphviz_names(net, subset_nuclides)
+        _node_label_func = lambda name: make_node_label(name, g_names)
+    else:
+        _node_label_func = node_label_func
+
+    return _create_flow_graph(
+        net,
+        f,
+        flow_type,
+        subset_nuclides,
+        anchors,
+        allow_isolated_species,
+        reaction_color_tuples,
+        threshold,
+        scale,
+        state_scaling,
+        _title_func,
+        _node_label_func,
+        scale_edge_weight_func,
+        graph_attributes,
+        node_attributes,
+        edge_attributes,
+        solar_species,
+        solar_node_attributes,
+        special_node_attributes,
+    )
+
+
+@wi.timed("link flow graph")
+def create_link_flow_graph(
+    net,
+    link_flows,
+    induced_nuc_xpath="",
+    reaction_color_tuples=None,
+    threshold=0.01,
+    scale=10,
+    state_scaling=0.325,
+    allow_isolated_species=False,
+    title_func=None,
+    node_label_func=None,
+    scale_edge_weight_func=None,
+    graph_attributes=None,
+    edge_attributes=None,
+    node_attributes=None,
+    solar_species=None,
+    solar_node_attributes=None,
+    special_node_attributes=None,
+):
+    """A routine to create a graph of link flows.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``link_flows`` (:obj:`dict`): A dictionary of link flows, as returned by :meth:`wnnet.flows.compute_link_flows` or :meth:`wnnet.flows.Link_Flow_Accumulator.get_link_flows`.  Each link with a positive flow is shown as an arc from its *source* to its *target*.
+
+        ``induced_nuc_xpath`` (:obj:`str`, optional): An XPath expression to select the subset of nuclides in the graph.  The default is all species in the network.
+
+        ``reaction_color_tuples`` (:obj:`tuple`, optional): A tuple to select arc colors for reaction types.  The first member of the tuple is an XPath expression to select the reaction type while the second member is a string giving the color for that reaction type.  The default is that all arcs are black.
+
+        ``threshold`` (:obj:`float`, optional):  The minimum link flow (relative to the maximum link flow) to be shown on the graph
+
+        ``scale`` (:obj:`float`, optional):  Scaling factor for the maximum weight arc.
+
+        ``state_scaling`` (:obj:`float`, optional):  Scaling factor for isomeric states.
+
+        ``allow_isolated_species`` (:obj:`bool`, optional):  Boolean to choose whether to allow isolated species (ones without incoming or outgoing arcs) in the graph.
+
+        ``title_func`` (optional): A `function <https://docs.python.org/3/library/stdtypes.html#functions>`_ that applies the title to the graph.  The function must take one :obj:`float` argument giving the maximum link flow. Other data can be bound to the function.  The function must return a :obj:`str` giving the title.  The default is :meth:`wnnet.graph.make_link_flow_string`.
+
+        ``node_label_func`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that applies a label to each node in the graph.  The function \
+            must take as argument a species name.  Other data can be bound to \
+            the function.  The function must return a :obj:`str` \
+            giving the label.  \
+            The default is :meth:`wnnet.graph.make_node_label`.
+
+        ``scale_edge_weight_func`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that applies scales each edge weight in the graph.  The function \
+            must take as four arguments: a dictionary of edge data, the \
+            maximum edge weight in the scope of the graph, a scale factor \
+            by which to scale the weight (input as *scale* to this routine), \
+            and a threshold for not including the edge in the graph \
+            (input as *threshold* to this routine). \
+            Other data can be bound to \
+            the function.  The function must modify the weight in the \
+            edge data and return a :obj:`bool` indicating whether to include \
+            the edge in the graph (True) or not (False).\
+            The default is :meth:`wnnet.graph.scale_edge_weight`.
+
+        ``graph_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the graph.
+
+        ``edge_attributes`` (:obj:`dict`, optional):  A dictionary of grapvhiz attributes for the edges in the graph.
+
+        ``node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the nodes in the graph.
+
+        ``solar_species`` (:obj:`list`, optional):  A list of species to be considered as the naturally occurring species.  The default is the list returned from :meth:`wnnet.graph.get_solar_species`.
+
+        ``solar_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the solar species in the graph.
+
+        ``special_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the special nodes in the graph.  The dictionary has as keys the names of the special nodes and as values a dictionary of graphviz properties to be applied to the given special node.
+
+    Returns:
+        A `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the link flows.
+
+    """
+
+    subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
+
+    if not title_func:
+        _title_func = make_link_flow_string
+    else:
+        _title_func = title_func
+
+    if not node_label_func:
+        g_names = _get_graphviz_names(net, subset_nuclides)
+        _node_label_func = lambda name: make_node_label(name, g_names)
+    else:
+        _node_label_func = node_label_func
+
+    DG = nx.MultiDiGraph()
+
+    for nuc in net.get_nuclides():
+        DG.add_node(nuc, shape="box", fontsize=16)
+
+    for r in link_flows:
+        for source, target, flow in link_flows[r]:
+            if flow > 0:
+                DG.add_edge(
+                    source,
+                    target,
+                    weight=flow,
+                    reaction=r,
+                    arrowsize=0.2,
+                )
+
+    return _finish_flow_graph(
+        DG,
+        net,
+        subset_nuclides,
+        anchors,
+        allow_isolated_species,
+        reaction_color_tuples,
+        threshold,
+        scale,
+        state_scaling,
+        _title_func,
+        _node_label_func,
+        scale_edge_weight_func,
+        graph_attributes,
+        node_attributes,
+        edge_attributes,
+        solar_species,
+        solar_node_attributes,
+        special_node_attributes,
+    )
+
+
+@wi.timed("zone flow graphs")
+def create_zone_flow_graphs(
+    net,
+    zones,
+    flow_type="net",
+    induced_nuc_xpath="",
+    induced_reac_xpath="",
+    reaction_color_tuples=None,
+    user_funcs="",
+    threshold=0.01,
+    scale=10,
+    state_scaling=0.325,
+    allow_isolated_species=False,
+    title_func=None,
+    zone_node_label_func=None,
+    scale_edge_weight_func=None,
+    graph_attributes=None,
+    edge_attributes=None,
+    node_attributes=None,
+    solar_species=None,
+    solar_node_attributes=None,
+    special_node_attributes=None,
+):
+    """A routine to create flow graphs for a set of zones.
+
+    Args:
+        ``net``: A wnnet network. 
+
+        ``zones``: A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of zones.
+
+        ``flow_type`` (:obj:`str`, optional): A string giving the flow type to be presented.  The possible values are `net`, which shows the forward minus the reverse flow (or the opposite if the reverse flow is larger), and `full`, which shows both the foward and reverse flows.
+
+        ``induced_nuc_xpath`` (:obj:`str`, optional): An XPath expression to select the subset of nuclides in the graph.  The default is all species in the network.
+
+        ``induced_reac_xpath`` (:obj:`str`, optional): An XPath expression to select the subset of reactions in the graph.  The default is all reactions in the network.
+
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined
+        functions associated with a user_rate key.
+        The prototype for each
+        user rate function should be (*reaction*, *t9*, *zone*), where
+        *t9* is the temperature in billions of Kelvin and *reaction* and
+        *zone* are `wnutils <https://wnutils.readthedocs.io>`_ reaction and
+        zone instances.  Other data can be bound to the function.
+
+        ``reaction_color_tuples`` (:obj:`tuple`, optional): A tuple to select arc colors for reaction types.  The first member of the tuple is an XPath expression to select the reaction type while the second member is a string giving the color for that reaction type.  The default is that all arcs are black.
+
+        ``threshold`` (:obj:`float`, optional):  The minimum flow (relative to the maximum flow) to be shown on the graph
+        
+        ``scale`` (:obj:`float`, optional):  Scaling factor for the maximum weight arc.
+        
+        ``state_scaling`` (:obj:`float`, optional):  Scaling factor for isomeric states.
+        
+        ``allow_isolated_species`` (:obj:`bool`, optional):  Boolean to choose whether to allow isolated species (ones without incoming or outgoing arcs) in the graph.
+
+        ``title_func`` (optional): A `function \
+             <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+             that applies the title to the graph.  The function must take \
+             three arguments.  The first is the zone object corresponding to\
+             the graph while the second is the zone label and the third is \
+             a :obj:`float` giving the maximum flow. Other data can \
+             be bound to the function.  The function must return a :obj:`str` \
+             giving the title.  \
+             The default is :meth:`wnnet.graph.make_time_t9_rho_flow_string.`.
+        
+        ``zone_node_label_func`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that applies a label to each node in the graph.  The function \
+            must take as arguments a zone, the zone label, and a species name. \
+            Other data can be bound to \
+            the function.  The function must return a :obj:`str` \
+            giving the label.  The default is \
+            :meth:`wnnet.graph.make_zone_node_label`.
+        
+        ``scale_edge_weight_func`` (optional): A `function \
+            <https://docs.python.org/3/library/stdtypes.html#functions>`_ \
+            that applies scales each edge weight in the graph.  The function \
+            must take as four arguments: a dictionary of edge data, the \
+            maximum edge weight in the scope of the graph, a scale factor \
+            by which to scale the weight (input as *scale* to this routine), \
+            and a threshold for not including the edge in the graph \
+            (input as *threshold* to this routine). \
+            Other data can be bound to \
+            the function.  The function must modify the weight in the \
+            edge data and return a :obj:`bool` indicating whether to include \
+            the edge in the graph (True) or not (False).\
+            The default is :meth:`wnnet.graph.scale_edge_weight`.
+        
+        ``graph_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the graph.
+
+        ``edge_attributes`` (:obj:`dict`, optional):  A dictionary of grapvhiz attributes for the edges in the graph.
+
+        ``node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the nodes in the graph.
+
+        ``solar_species`` (:obj:`list`, optional):  A list of species to be considered as the naturally occurring species.  The default is the list returned from :meth:`wnnet.graph.get_solar_species`.
+
+        ``solar_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the solar species in the graph.
+
+        ``special_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the special nodes in the graph.  The dictionary has as keys the names of the special nodes and as values a dictionary of graphviz properties to be applied to the given special node.
+
+    Returns:
+        A :obj:`dict` of `networkx multidigraphs <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the flows.  The keys are the zone labels.
+     
+
+    """
+
+    result = {}
+
+    for zone, G in _generate_zone_flow_graphs(
+        net,
+        zones,
+        flow_type,
+        induced_nuc_xpath,
+        induced_reac_xpath,
+        reaction_color_tuples,
+        user_funcs,
+        threshold,
+        scale,
+        state_scaling,
+        allow_isolated_species,
+        title_func,
+        zone_node_label_func,
+        scale_edge_weight_func,
+        graph_attributes,
+        edge_attributes,
+        node_attributes,
+        solar_species,
+        solar_node_attributes,
+        special_node_attributes,
+    ):
+        result[zone] = G
+
+    return result
+
+
+def _generate_zone_flow_graphs(
+    net,
+    zones,
+    flow_type,
+    induced_nuc_xpath,
+    induced_reac_xpath,
+    reaction_color_tuples,
+    user_funcs,
+    threshold,
+    scale,
+    state_scaling,
+    allow_isolated_species,
+    title_func,
+    zone_node_label_func,
+    scale_edge_weight_func,
+    graph_attributes,
+    edge_attributes,
+    node_attributes,
+    solar_species,
+    solar_node_attributes,
+    special_node_attributes,
+):
+    f = wf.compute_flows_for_zones(
+        net, zones, reac_xpath=induced_reac_xpath, user_funcs=user_funcs
+    )
+
+    subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
+
+    g_names = _get_graphviz_names(net, subset_nuclides)
+
+    # Loop on zones
+
+    for zone in f:
+
+        # Title
+
+        if not title_func:
+            _title_func = lambda f_max: make_time_t9_rho_flow_string(
+                zones[zone], zone, f_max
+            )
+        else:
+            _title_func = lambda f_max: title_func(zones[zone], zone, f_max)
+
+        # Node label
+
+        if not zone_node_label_func:
+            _zone_node_label_func = lambda name: make_zone_node_label(
+                zones[zone], zone, name, g_names
+            )
+        else:
+            _zone_node_label_func = lambda name: zone_node_label_func(
+                zones[zone], zone, name
+            )
+
+        # Create graph
+
+        yield zone, _create_flow_graph(
+            net,
+            f[zone],
+            flow_type,
+            subset_nuclides,
+            anchors,
+            allow_isolated_species,
+            reaction_color_tuples,
+            threshold,
+            scale,
+            state_scaling,
+            _title_func,
+            _zone_node_label_func,
+            scale_edge_weight_func,
+            graph_attributes,
+            node_attributes,
+            edge_attributes,
+            solar_species,
+            solar_node_attributes,
+            special_node_attributes,
+        )
+
+
+def _get_edge_signatures(G):
+    result = {}
+    counts = {}
+    for u, v, key, data in G.edges(keys=True, data=True):
+        tup = (u, v, data.get("reaction"))
+        counts[tup] = counts.get(tup, -1) + 1
+        result[tup + (counts[tup],)] = (key, data)
+    return result
+
+
+def compute_graph_diff(G_old, G_new):
+    """A routine to compute the difference between two graphs.
+
+    Args:
+        ``G_old``: The earlier `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_.
+
+        ``G_new``: The later `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_.
 
-        ``edge_attributes`` (:obj:`dict`, optional):  A dictionary of grapvhiz attributes for the edges in the graph.
+    Returns:
+        A :obj:`dict` giving the changes that take *G_old* to *G_new*.  The entry *graph* is a :obj:`dict` of the new graph attributes, or None if they did not change.  The entries *added nodes* and *changed nodes* are :obj:`dict` objects with the node names as keys and the new node attributes as values.  The entry *removed nodes* is a :obj:`list` of the removed nodes.  Edges are identified by a four-element :obj:`tuple` giving the *source*, the *target*, the *reaction*, and the index of the edge among edges with the same *source*, *target*, and *reaction*.  The entries *added edges* and *changed edges* are :obj:`dict` objects with the edge tuples as keys and the new edge attributes (such as the *penwidth*) as values.  The entry *removed edges* is a :obj:`list` of the tuples of the removed edges.
 
-        ``node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes for the nodes in the graph.
+    """
 
-        ``solar_species`` (:obj:`list`, optional):  A list of species to be considered as the naturally occurring species.  The default is the list returned from :meth:`wnnet.graph.get_solar_species`.
+    result = {
+        "graph": None,
+        "added nodes": {},
+        "removed nodes": [],
+        "changed nodes": {},
+        "added edges": {},
+        "removed edges": [],
+        "changed edges": {},
+    }
+
+    if G_old.graph != G_new.graph:
+        result["graph"] = dict(G_new.graph)
+
+    for node in G_new.nodes:
+        if node not in G_old.nodes:
+            result["added nodes"][node] = dict(G_new.nodes[node])
+        elif G_old.nodes[node] != G_new.nodes[node]:
+            result["changed nodes"][node] = dict(G_new.nodes[node])
+
+    for node in G_old.nodes:
+        if node not in G_new.nodes:
+            result["removed nodes"].append(node)
+
+    old_edges = _get_edge_signatures(G_old)
+    new_edges = _get_edge_signatures(G_new)
+
+    for edge in new_edges:
+        if edge not in old_edges:
+            result["added edges"][edge] = dict(new_edges[edge][1])
+        elif old_edges[edge][1] != new_edges[edge][1]:
+            result["changed edges"][edge] = dict(new_edges[edge][1])
+
+    for edge in old_edges:
+        if edge not in new_edges:
+            result["removed edges"].append(edge)
 
-        ``solar_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the solar species in the graph.
+    return result
 
-        ``special_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the special nodes in the graph.  The dictionary has as keys the names of the special nodes and as values a dictionary of graphviz properties to be applied to the given special node.
+
+def apply_graph_diff(G, diff):
+    """A routine to apply a graph difference to a graph.
+
+    Args:
+        ``G``: A `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_.  The graph must not be a subgraph view.
+
+        ``diff`` (:obj:`dict`): A graph difference, as returned by :meth:`wnnet.graph.compute_graph_diff`.
 
     Returns:
-        A `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the flows.
-     
+        On successful return, *G* has been modified in place by *diff*.
 
     """
-    assert flow_type == "net" or flow_type == "full"
 
-    f = wf.compute_flows(
-        net,
-        t9,
-        rho,
-        mass_fractions,
-        reac_xpath=induced_reac_xpath,
-        user_funcs=user_funcs,
-    )
+    if diff["graph"] is not None:
+        G.graph.clear()
+        G.graph.update(diff["graph"])
 
-    # Get the subset of nuclides to view in the graph.  Get anchors.
+    edges = _get_edge_signatures(G)
 
-    subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
+    for edge in sorted(diff["removed edges"], key=lambda e: -e[3]):
+        G.remove_edge(edge[0], edge[1], key=edges[edge][0])
 
-    # Title
+    for edge in diff["changed edges"]:
+        edge_data = G.edges[edge[0], edge[1], edges[edge][0]]
+        edge_data.clear()
+        edge_data.update(diff["changed edges"][edge])
 
-    if not title_func:
-        _title_func = lambda f_max: make_t9_rho_flow_string(f_max, t9, rho)
-    else:
-        _title_func = title_func
+    G.remove_nodes_from(diff["removed nodes"])
 
-    # Node label
+    for node in diff["added nodes"]:
+        G.add_node(node, **diff["added nodes"][node])
 
-    if not node_label_func:
-        g_names = net.xml.get_graphviz_names(subset_nuclides)
-        _node_label_func = lambda name: make_node_label(name, g_names)
-    else:
-        _node_label_func = node_label_func
+    for node in diff["changed nodes"]:
+        G.nodes[node].clear()
+        G.nodes[node].update(diff["changed nodes"][node])
 
-    return _create_flow_graph(
-        net,
-        f,
-        flow_type,
-        subset_nuclides,
-        anchors,
-        allow_isolated_species,
-        reaction_color_tuples,
-        threshold,
-        scale,
-        state_scaling,
-        _title_func,
-        _node_label_func,
-        scale_edge_weight_func,
-        graph_attributes,
-        node_attributes,
-        edge_attributes,
-        solar_species,
-        solar_node_attributes,
-        special_node_attributes,
-    )
+    for edge in sorted(diff["added edges"], key=lambda e: e[3]):
+        G.add_edge(edge[0], edge[1], **diff["added edges"][edge])
 
 
-def create_zone_flow_graphs(
+@wi.timed("zone flow graph diffs")
+def create_zone_flow_graph_diffs(
     net,
     zones,
+    keyframe_interval=0,
     flow_type="net",
     induced_nuc_xpath="",
     induced_reac_xpath="",
@@ -903,13 +1476,17 @@ def create_zone_flow_graphs(
     solar_node_attributes=None,
     special_node_attributes=None,
 ):
-    """A routine to create flow graphs for a set of zones.
+    """A routine to create flow graphs for a set of zones as differences between consecutive zones.
+
+    Only the first zone, and optionally every *keyframe_interval* zones, is stored as a full graph.  The graphs for the other zones are stored as differences from the graph of the previous zone, which may be applied with :meth:`wnnet.graph.apply_graph_diff`.  This saves memory and rendering time for animations of long trajectories, whose consecutive graphs are nearly identical.
 
     Args:
         ``net``: A wnnet network. 
 
         ``zones``: A `wnutils <https://wnutils.readthedocs.io>`_ dictionary of zones.
 
+        ``keyframe_interval`` (:obj:`int`, optional): The number of zones between full graphs.  The default (0) is to store only the first zone's graph in full.
+
         ``flow_type`` (:obj:`str`, optional): A string giving the flow type to be presented.  The possible values are `net`, which shows the forward minus the reverse flow (or the opposite if the reverse flow is larger), and `full`, which shows both the foward and reverse flows.
 
         ``induced_nuc_xpath`` (:obj:`str`, optional): An XPath expression to select the subset of nuclides in the graph.  The default is all species in the network.
@@ -980,71 +1557,53 @@ def create_zone_flow_graphs(
         ``special_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the special nodes in the graph.  The dictionary has as keys the names of the special nodes and as values a dictionary of graphviz properties to be applied to the given special node.
 
     Returns:
-        A :obj:`dict` of `networkx multidigraphs <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the flows.  The keys are the zone labels.
-     
+        A :obj:`dict` with the zone labels as keys.  Each value is a :obj:`dict` with two entries.  For keyframe zones, the entry *keyframe* is a `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the flows and the entry *diff* is None.  For the other zones, the entry *keyframe* is None and the entry *diff* is the difference, as returned by :meth:`wnnet.graph.compute_graph_diff`, from the previous zone's graph.
 
     """
 
     result = {}
 
-    f = wf.compute_flows_for_zones(
-        net, zones, reac_xpath=induced_reac_xpath, user_funcs=user_funcs
-    )
-
-    subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
-
-    # Loop on zones
-
-    for zone in f:
-
-        # Title
-
-        if not title_func:
-            _title_func = lambda f_max: make_time_t9_rho_flow_string(
-                zones[zone], zone, f_max
-            )
-        else:
-            _title_func = lambda f_max: title_func(zones[zone], zone, f_max)
-
-        # Node label
-
-        g_names = net.xml.get_graphviz_names(subset_nuclides)
-        if not zone_node_label_func:
-            _zone_node_label_func = lambda name: make_zone_node_label(
-                zones[zone], zone, name, g_names
-            )
-        else:
-            _zone_node_label_func = lambda name: zone_node_label_func(
-                zones[zone], zone, name
-            )
-
-        # Create graph
+    G_prev = None
 
-        result[zone] = _create_flow_graph(
+    for i, (zone, G) in enumerate(
+        _generate_zone_flow_graphs(
             net,
-            f[zone],
+            zones,
             flow_type,
-            subset_nuclides,
-            anchors,
-            allow_isolated_species,
+            induced_nuc_xpath,
+            induced_reac_xpath,
             reaction_color_tuples,
+            user_funcs,
             threshold,
             scale,
             state_scaling,
-            _title_func,
-            _zone_node_label_func,
+            allow_isolated_species,
+            title_func,
+            zone_node_label_func,
             scale_edge_weight_func,
             graph_attributes,
-            node_attributes,
             edge_attributes,
+            node_attributes,
             solar_species,
             solar_node_attributes,
             special_node_attributes,
         )
+    ):
+        if G_prev is None or (
+            keyframe_interval and i % keyframe_interval == 0
+        ):
+            result[zone] = {"keyframe": nx.MultiDiGraph(G), "diff": None}
+        else:
+            result[zone] = {
+                "keyframe": None,
+                "diff": compute_graph_diff(G_prev, G),
+            }
+        G_prev = G
 
     return result
 
 
+@wi.timed("network graph")
 def create_network_graph(
     net,
     induced_nuc_xpath="",
@@ -1113,32 +1672,18 @@ def create_network_graph(
         direction == "forward" or direction == "reverse" or direction == "both"
     )
 
-    result = {}
-
-    nuclides = net.get_nuclides()
-    reactions = net.get_reactions(reac_xpath=induced_reac_xpath)
-
     # Get the subset of nuclides to view in the graph.  Get anchors.
 
     val, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
 
-    DG = nx.MultiDiGraph()
-
-    for nuc in nuclides:
-        DG.add_node(nuc, shape="box", fontsize=16)
-
-    for r in reactions:
-        if direction == "forward" or direction == "both":
-            for reactant in reactions[r].nuclide_reactants:
-                for product in reactions[r].nuclide_products:
-                    DG.add_edge(reactant, product, reaction=r, arrowsize=0.2)
-
-        if not net.is_weak_reaction(r) and (
-            direction == "reverse" or direction == "both"
-        ):
-            for product in reactions[r].nuclide_products:
-                for reactant in reactions[r].nuclide_reactants:
-                    DG.add_edge(product, reactant, reaction=r, arrowsize=0.2)
+    DG = net.get_topology(
+        nuc_xpath=induced_nuc_xpath,
+        reac_xpath=induced_reac_xpath,
+        direction=direction,
+    ).get_graph(
+        node_attributes={"shape": "box", "fontsize": 16},
+        edge_attributes={"arrowsize": 0.2},
+    )
 
     # Apply attributes
 
@@ -1172,12 +1717,10 @@ def create_network_graph(
     if node_label_func:
         _node_label_func = node_label_func
     else:
-        g_names = net.xml.get_graphviz_names(list(S.nodes.keys()))
+        g_names = _get_graphviz_names(net, S.nodes)
         _node_label_func = lambda name: make_node_label(name, g_names)
 
-    for node in S.nodes:
-        S.nodes[node]["pos"] = _get_pos(net, node, state_scaling)
-        S.nodes[node]["label"] = _node_label_func(node)
+    _set_node_positions_and_labels(S, net, state_scaling, _node_label_func)
 
     _color_edges(S, net, reaction_color_tuples)
 
@@ -1186,10 +1729,10 @@ def create_network_graph(
 
 def _create_integrated_current_graph(
     net,
-    zone,
+    currents,
+    current_reactions,
     subset_nuclides,
-    induced_nuc_xpath,
-    induced_reac_xpath,
+    anchors,
     reaction_color_tuples,
     threshold,
     scale,
@@ -1208,128 +1751,60 @@ def _create_integrated_current_graph(
     nuclides = net.get_nuclides()
     reactions = net.get_reactions()
 
-    # Solar species
-
-    _solar_species = solar_species
-    if not solar_species:
-        _solar_species = get_solar_species()
-
-    # Solar species
-
-    _solar_species = solar_species
-    if not solar_species:
-        _solar_species = get_solar_species()
-
-    subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
-
-    props = zone["properties"]
-
     DG = nx.MultiDiGraph()
 
     for nuc in nuclides:
         DG.add_node(nuc, shape="box", fontsize=16)
 
-    f = {}
-
-    for prop in props:
-        if isinstance(prop, tuple):
-            if prop[0] == "flow current":
-                f[prop[1]] = float(props[prop])
+    for i in np.flatnonzero(currents):
+        r = current_reactions[i]
+        current = float(currents[i])
 
-    for r in f:
-
-        if f[r] > 0:
+        if current > 0:
             for reactant in reactions[r].nuclide_reactants:
                 for product in reactions[r].nuclide_products:
                     DG.add_edge(
                         reactant,
                         product,
-                        weight=f[r],
+                        weight=current,
                         reaction=r,
                         arrowsize=0.2,
                     )
 
-        if f[r] < 0:
+        if current < 0:
             for product in reactions[r].nuclide_products:
                 for reactant in reactions[r].nuclide_reactants:
                     DG.add_edge(
                         product,
                         reactant,
-                        weight=-f[r],
+                        weight=-current,
                         reaction=r,
                         arrowsize=0.2,
                     )
 
-    # Apply attributes
-
-    _apply_graph_attributes(DG, graph_attributes)
-
-    _apply_node_attributes(DG, node_attributes)
-
-    _apply_edge_attributes(DG, edge_attributes)
-
-    _apply_solar_node_attributes(DG, _solar_species, solar_node_attributes)
-
-    _apply_special_node_attributes(DG, special_node_attributes)
-
-    # Subgraph and maximum flow within subgraph
-
-    S = nx.subgraph(DG, subset_nuclides)
-
-    w = nx.get_edge_attributes(S, "weight")
-
-    # Set penwidth.  Remove edges that are below threshold
-
-    f_max = 0
-
-    if len(w) > 0:
-        f_max = max(w.items(), key=operator.itemgetter(1))[1]
-
-        if not scale_edge_weight_func:
-            _scale_edge_weight_func = lambda edge_data: scale_edge_weight(
-                edge_data, f_max, scale, threshold
-            )
-        else:
-            _scale_edge_weight_func = lambda edge_data: scale_edge_weight_func(
-                edge_data, f_max, scale, threshold
-            )
-
-        remove_edges = []
-        for edge in DG.edges:
-            if not _scale_edge_weight_func(DG.get_edge_data(*edge)):
-                remove_edges.append(edge)
-
-        DG.remove_edges_from(remove_edges)
-
-    # Remove isolated nodes if desired
-
-    if not allow_isolated_species:
-        isolated_nodes = list(nx.isolates(DG))
-        for node in isolated_nodes:
-            if node not in _solar_species:
-                DG.remove_node(node)
-
-    # Restore anchors
-
-    for anchor in anchors:
-        if anchor not in DG.nodes:
-            DG.add_node(anchor, style="invis")
-
-    # Get new subset
-
-    S2 = nx.subgraph(DG, subset_nuclides)
-
-    for node in S2.nodes:
-        S2.nodes[node]["pos"] = _get_pos(net, node, state_scaling)
-        S2.nodes[node]["label"] = zone_node_label_func(node)
-
-    DG.graph["label"] = title_func(f_max)
-
-    _color_edges(S2, net, reaction_color_tuples)
-
-    return S2
+    return _finish_flow_graph(
+        DG,
+        net,
+        subset_nuclides,
+        anchors,
+        allow_isolated_species,
+        reaction_color_tuples,
+        threshold,
+        scale,
+        state_scaling,
+        title_func,
+        zone_node_label_func,
+        scale_edge_weight_func,
+        graph_attributes,
+        node_attributes,
+        edge_attributes,
+        solar_species,
+        solar_node_attributes,
+        special_node_attributes,
+    )
 
 
+@wi.timed("zone integrated current graphs")
 def create_zone_integrated_current_graphs(
     net,
     zones,
@@ -1350,6 +1825,8 @@ def create_zone_integrated_current_graphs(
     solar_species=None,
     solar_node_attributes=None,
     special_node_attributes=None,
+    user_funcs="",
+    flow_currents=None,
 ):
     """A routine to create flow graphs for a set of zones.
 
@@ -1420,6 +1897,10 @@ def create_zone_integrated_current_graphs(
 
         ``special_node_attributes`` (:obj:`dict`, optional):  A dictionary of graphviz attributes to be applied to the special nodes in the graph.  The dictionary has as keys the names of the special nodes and as values a dictionary of graphviz properties to be applied to the given special node.
 
+        ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined functions associated with a user_rate key.  The functions are used when the currents are computed from the flows (see :meth:`wnnet.flows.compute_flow_currents_for_zones`).
+
+        ``flow_currents`` (:obj:`dict`, optional): The integrated currents to show, in the format returned by :meth:`wnnet.flows.get_flow_currents_for_zones` or :meth:`wnnet.flows.compute_flow_currents_for_zones`.  The default is the currents stored in the zones or, if the zones have none, the currents computed from the flows in the zones.
+
     Returns:
         A :obj:`dict` of `networkx multidigraphs <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ showing the integrated currents.  The keys are the zone labels.
 
@@ -1429,7 +1910,19 @@ def create_zone_integrated_current_graphs(
 
     subset_nuclides, anchors = _get_subset_and_anchors(net, induced_nuc_xpath)
 
-    for zone in zones:
+    g_names = _get_graphviz_names(net, subset_nuclides)
+
+    if not flow_currents:
+        flow_currents = wf.get_flow_currents_for_zones(zones)
+        if not flow_currents["reactions"]:
+            flow_currents = wf.compute_flow_currents_for_zones(
+                net,
+                zones,
+                reac_xpath=induced_reac_xpath,
+                user_funcs=user_funcs,
+            )
+
+    for i, zone in enumerate(flow_currents["zones"]):
 
         # Title
 
@@ -1442,7 +1935,6 @@ def create_zone_integrated_current_graphs(
 
         # Node label
 
-        g_names = net.xml.get_graphviz_names(subset_nuclides)
         if not zone_node_label_func:
             _zone_node_label_func = lambda name: make_zone_node_label(
                 zones[zone], zone, name, g_names
@@ -1454,10 +1946,10 @@ def create_zone_integrated_current_graphs(
 
         result[zone] = _create_integrated_current_graph(
             net,
-            zones[zone],
+            flow_currents["currents"][i, :],
+            flow_currents["reactions"],
             subset_nuclides,
-            induced_nuc_xpath,
-            induced_reac_xpath,
+            anchors,
             reaction_color_tuples,
             threshold,
             scale,
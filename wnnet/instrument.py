@@ -0,0 +1,193 @@
+"""This module collects the wall time, call counts, and cache statistics of the stages of wnnet computations.
+
+Recording is off by default, in which case an instrumented routine only adds a check of a module variable to its call.  Turn recording on with :func:`recording`::
+
+    with wnnet.instrument.recording(net) as recorder:
+        flows = wnnet.flows.compute_flows_for_zones(net, zones)
+
+    print(recorder.to_json(indent=2))
+
+Stage times are inclusive, so the time of a stage, such as *zone flows*, includes the time of the stages it calls, such as *user rates*.
+"""
+
+import functools
+import json
+import time
+from contextlib import contextmanager
+
+_recorder = None
+
+
+class Recorder:
+    """A class for storing the statistics of instrumented stages and caches.
+
+    Instances are usually obtained from :func:`recording`.
+
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.caches = {}
+        self.sources = []
+
+    def add_stage_time(self, stage, seconds):
+        """Method to add a call to a stage.
+
+        Args:
+            ``stage`` (:obj:`str`):  The name of the stage.
+
+            ``seconds`` (:obj:`float`):  The wall time in seconds of the call.
+
+        Returns:
+            On successful return, the call has been added to the statistics of the stage.
+
+        """
+
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def add_cache_source(self, source, label=None):
+        """Method to add an object whose cache statistics are recorded.
+
+        Args:
+            ``source``: A :obj:`wnnet.net.Net`, :obj:`wnnet.nuc.Nuc`, :obj:`wnnet.reac.Reac`, or :obj:`wnnet.zones.Zones_Xml` instance.
+
+            ``label`` (:obj:`str`, optional):  The label under which to report the statistics.  Default is the class name, with an index if there are several sources.
+
+        Returns:
+            On successful return, the hits, misses, and evictions of the caches of *source* from now on will be recorded.
+
+        """
+
+        if label is None:
+            label = type(source).__name__
+            if any(entry[1] == label for entry in self.sources):
+                label += f" {len(self.sources)}"
+        self.sources.append((source, label, _get_cache_statistics(source)))
+
+    def collect_cache_statistics(self):
+        """Method to record the current cache statistics of the cache sources.
+
+        Returns:
+            On successful return, the cache statistics of the sources since they were added have been recorded.
+
+        """
+
+        for source, label, start in self.sources:
+            current = _get_cache_statistics(source)
+            result = {}
+            for cache, stats in current.items():
+                result[cache] = dict(stats)
+                for key in ("hits", "misses", "evictions"):
+                    if cache in start:
+                        result[cache][key] -= start[cache][key]
+            self.caches[label] = result
+
+    def get_data(self):
+        """Method to return the recorded statistics.
+
+        Returns:
+            A :obj:`dict` with two entries.  The entry *stages* is a :obj:`dict` with the stage names as keys and, as values, a :obj:`dict` giving the number of *calls* and the total *time* in seconds.  The entry *caches* is a :obj:`dict` with the labels of the cache sources as keys and, as values, the cache statistics.
+
+        """
+
+        return {
+            "stages": {
+                stage: {"calls": entry[0], "time": entry[1]}
+                for stage, entry in self.stages.items()
+            },
+            "caches": self.caches,
+        }
+
+    def to_json(self, **kwargs):
+        """Method to return the recorded statistics as JSON.
+
+        Args:
+            ``**kwargs``:  Keyword arguments passed to :func:`json.dumps`.
+
+        Returns:
+            A :obj:`str` giving the JSON encoding of :meth:`get_data`.
+
+        """
+
+        return json.dumps(self.get_data(), **kwargs)
+
+
+def _get_cache_statistics(source):
+    if hasattr(source, "get_cache_statistics"):
+        return source.get_cache_statistics()
+    result = {}
+    for cache in ("nuclides", "reactions"):
+        if hasattr(source, cache):
+            result[cache] = getattr(source, cache).get_statistics()
+    return result
+
+
+def timed(stage):
+    """A decorator recording the wall time and calls of a routine as a stage.
+
+    Args:
+        ``stage`` (:obj:`str`):  The name of the stage.
+
+    Returns:
+        A decorator for the routine.
+
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            recorder = _recorder
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.add_stage_time(stage, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def is_recording():
+    """A routine to determine whether statistics are being recorded.
+
+    Returns:
+        A :obj:`bool` that is True if statistics are being recorded and False if not.
+
+    """
+
+    return _recorder is not None
+
+
+@contextmanager
+def recording(*sources):
+    """A context manager recording the statistics of the instrumented stages while it is active.
+
+    Args:
+        ``*sources``:  The :obj:`wnnet.net.Net`, :obj:`wnnet.nuc.Nuc`, :obj:`wnnet.reac.Reac`, or :obj:`wnnet.zones.Zones_Xml` instances whose cache statistics should be recorded.
+
+    Returns:
+        A :obj:`wnnet.instrument.Recorder` holding the statistics.  The cache statistics are recorded on exit.
+
+    """
+
+    global _recorder
+
+    previous = _recorder
+    recorder = Recorder()
+    for source in sources:
+        recorder.add_cache_source(source)
+
+    _recorder = recorder
+    try:
+        yield recorder
+    finally:
+        _recorder = previous
+        recorder.collect_cache_statistics()
@@ -3,8 +3,16 @@
 import wnutils.xml as wx
 import wnnet.nuc as wn
 import wnnet.reac as wr
+import wnnet.topology as wt
+import wnnet.cache as wca
+import wnnet.rates as wrt
+import wnnet.instrument as wi
+import os
+import hashlib
+import warnings
 import numpy as np
 import wnnet.consts as wc
+from scipy.sparse import csr_matrix
 
 
 class Net(wn.Nuc, wr.Reac):
@@ -17,16 +25,87 @@ class Net(wn.Nuc, wr.Reac):
 
         ``reac_xpath`` (:obj:`str`, optional):  An XPath expression to select reactions.  Default is all reactions.
 
+        ``share_selections`` (:obj:`bool`, optional): Boolean determining whether later XPath selections of nuclides and reactions should only resolve names and share the data already read (True) or read the data anew for each selection (False).  Default is False.
+
     """
 
-    def __init__(self, file, nuc_xpath="", reac_xpath=""):
-        wn.Nuc.__init__(self, file, nuc_xpath=nuc_xpath)
-        wr.Reac.__init__(self, file, reac_xpath=reac_xpath)
-        self.valid_reactions = {}
+    def __init__(
+        self, file, nuc_xpath="", reac_xpath="", share_selections=False
+    ):
+        wn.Nuc.__init__(
+            self, file, nuc_xpath=nuc_xpath, share_selections=share_selections
+        )
+        wr.Reac.__init__(
+            self,
+            file,
+            reac_xpath=reac_xpath,
+            share_selections=share_selections,
+        )
+        self.topologies = wca.LRU_Cache()
+        self.stoichiometry = None
+        self.valid_reaction_masks = wca.LRU_Cache()
+        self.Q_value_array = None
+        self.Q_value_indexes = wca.LRU_Cache()
+        self.rate_table = None
+        self.valid_reactions = wca.Selection_Cache(
+            loader=self.get_reactions, base_key=None
+        )
         self.valid_reactions[("", "")] = self.get_valid_reactions(
             nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
         )
 
+    def _reset_reaction_caches(self):
+        self.topologies.clear()
+        self.stoichiometry = None
+        self.valid_reaction_masks.clear()
+        self.Q_value_array = None
+        self.Q_value_indexes.clear()
+        self.rate_table = None
+        self.valid_reactions.clear()
+
+    def _get_caches(self):
+        return {
+            "nuclides": self.nuclides,
+            "reactions": self.reactions,
+            "valid reactions": self.valid_reactions,
+            "valid reaction masks": self.valid_reaction_masks,
+            "Q value indexes": self.Q_value_indexes,
+            "topologies": self.topologies,
+            "projections": self.projections,
+        }
+
+    def set_cache_policy(self, max_entries=None, max_bytes=None):
+        """Method to set the eviction policy of the caches of XPath selections and of the data computed for them.
+
+        The caches of nuclides, reactions, and valid reactions keep their full (base) collection.  Each cache evicts the least recently used entries beyond the policy but always keeps the most recently used one.
+
+        Args:
+            ``max_entries`` (:obj:`int`, optional): The maximum number of entries to keep in each cache.  Default is no limit.
+
+            ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the entries in each cache.  Default is no limit.
+
+        Returns:
+            On successful return, the policy has been applied to the caches.
+
+        """
+
+        for cache in self._get_caches().values():
+            cache.set_policy(max_entries=max_entries, max_bytes=max_bytes)
+
+    def get_cache_statistics(self):
+        """Method to return the statistics of the caches of XPath selections and of the data computed for them.
+
+        Returns:
+            A :obj:`dict` with entries *nuclides*, *reactions*, *valid reactions*, *valid reaction masks*, *Q value indexes*, *topologies*, and *projections*, each a :obj:`dict` as returned by :meth:`wnnet.cache.Selection_Cache.get_statistics` or :meth:`wnnet.cache.LRU_Cache.get_statistics`.
+
+        """
+
+        return {
+            name: cache.get_statistics()
+            for name, cache in self._get_caches().items()
+        }
+
+    @wi.timed("Q values")
     def compute_Q_values(self, nuc_xpath="", reac_xpath=""):
         """A method to compute reaction Q values for valid reactions in the network.
 
@@ -45,15 +124,106 @@ class Net(wn.Nuc, wr.Reac):
 
         result = {}
 
+        q_values = self._get_Q_value_array()
+        index = self.get_stoichiometry()["reaction index"]
+
         for r in self.get_valid_reactions(
             nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
         ):
-            tmp = self.compute_reaction_Q_value(r)
-            if tmp:
-                result[r] = tmp
+            tmp = q_values[index[r]]
+            if tmp and not np.isnan(tmp):
+                result[r] = float(tmp)
 
         return result
 
+    def _get_Q_value_array(self):
+        if self.Q_value_array is None:
+            nuclides = self.get_nuclides()
+            stoichiometry = self.get_stoichiometry()
+
+            mass_excess = np.full(len(stoichiometry["species"]), np.nan)
+            for i, sp in enumerate(stoichiometry["species"]):
+                if sp in nuclides:
+                    mass_excess[i] = nuclides[sp]["mass excess"]
+
+            self.Q_value_array = (
+                stoichiometry["reactants"] - stoichiometry["products"]
+            ) @ mass_excess - np.where(
+                stoichiometry["positron emission"], 2.0 * wc.m_e_in_MeV, 0.0
+            )
+
+        return self.Q_value_array
+
+    def _get_Q_value_index(self, nuc_xpath, reac_xpath):
+        result = self.Q_value_indexes.get((nuc_xpath, reac_xpath))
+
+        if result is None:
+            q_values = self.compute_Q_values(
+                nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+            )
+            reactions = list(q_values.keys())
+            values = np.array(list(q_values.values()))
+            order = np.argsort(values, kind="stable")
+            result = ([reactions[i] for i in order], values[order])
+            self.Q_value_indexes[(nuc_xpath, reac_xpath)] = result
+
+        return result
+
+    def get_reactions_in_Q_range(
+        self, q_min, q_max, nuc_xpath="", reac_xpath=""
+    ):
+        """Method to retrieve the valid reactions with Q values in a range.
+
+        The Q values are sorted once for each set of XPath expressions, so repeated queries are fast.
+
+        Args:
+            ``q_min`` (:obj:`float`): The lower end of the Q value range (in MeV).
+
+            ``q_max`` (:obj:`float`): The upper end of the Q value range (in MeV).
+
+            ``nuc_xpath`` (:obj:`str`, optional): An XPath expression to select
+            the nuclides.
+
+            ``reac_xpath`` (:obj:`str`, optional): An XPath expression to select
+            the reactions.
+
+        Returns:
+            A :obj:`dict`.  The keys for the dictionary are the strings of the reactions with Q values in [*q_min*, *q_max*] and the values are the corresponding Q values.  The entries are in order of increasing Q value.
+
+        """
+
+        reactions, values = self._get_Q_value_index(nuc_xpath, reac_xpath)
+
+        lo = np.searchsorted(values, q_min, side="left")
+        hi = np.searchsorted(values, q_max, side="right")
+
+        return {reactions[i]: float(values[i]) for i in range(lo, hi)}
+
+    def get_most_exothermic_reactions(self, k, nuc_xpath="", reac_xpath=""):
+        """Method to retrieve the valid reactions with the largest Q values.
+
+        Args:
+            ``k`` (:obj:`int`): The number of reactions to retrieve.
+
+            ``nuc_xpath`` (:obj:`str`, optional): An XPath expression to select
+            the nuclides.
+
+            ``reac_xpath`` (:obj:`str`, optional): An XPath expression to select
+            the reactions.
+
+        Returns:
+            A :obj:`dict`.  The keys for the dictionary are the strings of the *k* reactions with the largest Q values and the values are the corresponding Q values.  The entries are in order of decreasing Q value.
+
+        """
+
+        reactions, values = self._get_Q_value_index(nuc_xpath, reac_xpath)
+
+        return {
+            reactions[i]: float(values[i])
+            for i in range(len(values) - 1, max(len(values) - k, 0) - 1, -1)
+        }
+
+    @wi.timed("valid reactions")
     def get_valid_reactions(self, nuc_xpath="", reac_xpath=""):
         """Method to retrieve the valid reactions in the network.
 
@@ -67,15 +237,54 @@ class Net(wn.Nuc, wr.Reac):
 
         """
 
-        if (nuc_xpath, reac_xpath) not in self.valid_reactions:
+        result = self.valid_reactions.get((nuc_xpath, reac_xpath))
+
+        if result is None:
             result = {}
+            mask = self.get_valid_reaction_mask(nuc_xpath=nuc_xpath)
+            index = self.get_stoichiometry()["reaction index"]
             reactions = self.get_reactions(reac_xpath=reac_xpath)
             for r in reactions:
-                if self.is_valid_reaction(r, nuc_xpath=nuc_xpath):
+                if mask[index[r]]:
                     result[r] = reactions[r]
             self.valid_reactions[(nuc_xpath, reac_xpath)] = result
 
-        return self.valid_reactions[(nuc_xpath, reac_xpath)]
+        return result
+
+    def get_reactions_for_species(self, species, nuc_xpath="", reac_xpath=""):
+        """Method to retrieve the valid reactions in which any of a set of species participates.
+
+        The reactions are found from the *species reactions* index of :meth:`get_stoichiometry`, so the work scales with the number of reactions of the species and not with the size of the network.
+
+        Args:
+            ``species`` (:obj:`list`):  A list of the species names.  Names not in the network are ignored.
+
+            ``nuc_xpath`` (:obj:`str`, optional):  An XPath expression to select nuclides.  Default is all nuclides.
+
+            ``reac_xpath`` (:obj:`str`, optional):  An XPath expression to select reactions.  Default is all reactions.
+
+        Returns:
+            A :obj:`dict` of `wnutils <https://wnutils.readthedocs.io>`_ reactions.
+
+        """
+
+        stoichiometry = self.get_stoichiometry()
+        species_index = stoichiometry["species index"]
+        index = stoichiometry["species reactions"]
+
+        rows = [species_index[sp] for sp in species if sp in species_index]
+
+        valid_reactions = self.get_valid_reactions(
+            nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+        )
+
+        result = {}
+        for i in np.unique(index[rows].indices).tolist():
+            r = stoichiometry["reactions"][i]
+            if r in valid_reactions:
+                result[r] = valid_reactions[r]
+
+        return result
 
     def compute_reaction_Q_value(self, name):
         """Method to compute the Q value for a reaction.
@@ -88,29 +297,16 @@ class Net(wn.Nuc, wr.Reac):
 
         """
 
-        nuclides = self.get_nuclides()
-        reaction = self.get_reactions()[name]
-        result = 0
-        for sp in reaction.nuclide_reactants:
-            if sp not in nuclides:
-                return None
-            else:
-                result += nuclides[sp]["mass excess"]
-        for sp in reaction.nuclide_products:
-            if sp not in nuclides:
-                return None
-            else:
-                result -= nuclides[sp]["mass excess"]
+        result = self._get_Q_value_array()[
+            self.get_stoichiometry()["reaction index"][name]
+        ]
 
-        if (
-            "positron" in reaction.products
-            and "neutrino_e" in reaction.products
-        ):
-            result -= 2.0 * wc.m_e_in_MeV
+        if np.isnan(result):
+            return None
 
-        return result
+        return float(result)
 
-    def _obeys_conservation_laws(self, nuclides, reaction):
+    def _compute_non_nuclide_changes(self, reaction):
         ep = {"electron": -1, "positron": 1}
         e_lepton = {
             "electron": 1,
@@ -122,43 +318,138 @@ class Net(wn.Nuc, wr.Reac):
         tau_lepton = {"neutrino_tau": 1, "anti-neutrino_tau": -1}
 
         d_z = 0
-        d_a = 0
         d_l_e = 0
         d_l_mu = 0
         d_l_tau = 0
 
         for sp in reaction.reactants:
-            if sp in nuclides:
-                d_a += nuclides[sp]["a"]
-                d_z += nuclides[sp]["z"]
-            if sp in ep:
-                d_z += ep[sp]
-            if sp in e_lepton:
-                d_l_e += e_lepton[sp]
-            if sp in mu_lepton:
-                d_l_mu += mu_lepton[sp]
-            if sp in tau_lepton:
-                d_l_tau += tau_lepton[sp]
+            d_z += ep.get(sp, 0)
+            d_l_e += e_lepton.get(sp, 0)
+            d_l_mu += mu_lepton.get(sp, 0)
+            d_l_tau += tau_lepton.get(sp, 0)
         for sp in reaction.products:
-            if sp in nuclides:
-                d_a -= nuclides[sp]["a"]
-                d_z -= nuclides[sp]["z"]
-            if sp in ep:
-                d_z -= ep[sp]
-            if sp in e_lepton:
-                d_l_e -= e_lepton[sp]
-            if sp in mu_lepton:
-                d_l_mu -= mu_lepton[sp]
-            if sp in tau_lepton:
-                d_l_tau -= tau_lepton[sp]
+            d_z -= ep.get(sp, 0)
+            d_l_e -= e_lepton.get(sp, 0)
+            d_l_mu -= mu_lepton.get(sp, 0)
+            d_l_tau -= tau_lepton.get(sp, 0)
 
-        return (
-            d_a == 0
-            and d_z == 0
-            and d_l_e == 0
-            and d_l_mu == 0
-            and d_l_tau == 0
-        )
+        return (d_z, d_l_e, d_l_mu, d_l_tau)
+
+    def get_stoichiometry(self):
+        """Method to retrieve the stoichiometry of all reactions in the network as sparse matrices.
+
+        The data are computed on the first call and then stored.
+
+        Returns:
+            A :obj:`dict` with the entries *reactions*, a :obj:`list` of the reaction strings; *reaction index*, a :obj:`dict` giving the row for each reaction string; *species*, a :obj:`list` of the nuclide names in the network followed by any other nuclide names appearing in the reactions; *species index*, a :obj:`dict` giving the column for each species name; *reactants* and *products*, `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ objects giving the number of times each species appears as a nuclide reactant or product in each reaction; *incidence*, the sum of *reactants* and *products*; *species reactions*, a `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ giving, for each species (row), the number of times it appears in each reaction (column), so the non-zero columns of a row index the reactions in which the species participates; *conserved*, a :obj:`numpy.array` of :obj:`bool` indicating whether each reaction conserves mass number, charge, and lepton numbers when all its nuclides are present; and *positron emission*, a :obj:`numpy.array` of :obj:`bool` indicating whether each reaction emits a positron and an electron neutrino.
+
+        """
+
+        table = self.get_reaction_table()
+
+        if self.stoichiometry is None:
+            nuclides = self.get_nuclides()
+            reactions = self.get_reactions()
+
+            species_index = {sp: i for i, sp in enumerate(nuclides)}
+
+            rows = {"reactants": [], "products": []}
+            cols = {"reactants": [], "products": []}
+            non_nuclide = np.zeros((len(reactions), 4), dtype=np.int64)
+            positron_emission = np.zeros(len(reactions), dtype=bool)
+
+            for i, r in enumerate(reactions):
+                for key, elements in (
+                    ("reactants", reactions[r].nuclide_reactants),
+                    ("products", reactions[r].nuclide_products),
+                ):
+                    for sp in elements:
+                        if sp not in species_index:
+                            species_index[sp] = len(species_index)
+                        rows[key].append(i)
+                        cols[key].append(species_index[sp])
+                non_nuclide[i, :] = self._compute_non_nuclide_changes(
+                    reactions[r]
+                )
+                positron_emission[i] = (
+                    "positron" in reactions[r].products
+                    and "neutrino_e" in reactions[r].products
+                )
+
+            species = list(species_index.keys())
+            z = np.zeros(len(species), dtype=np.int64)
+            a = np.zeros(len(species), dtype=np.int64)
+            for i, sp in enumerate(species):
+                if sp in nuclides:
+                    z[i] = nuclides[sp]["z"]
+                    a[i] = nuclides[sp]["a"]
+                else:
+                    z[i], a[i], state = (
+                        self.xml.get_z_a_state_from_nuclide_name(sp)
+                    )
+
+            shape = (len(reactions), len(species))
+            matrices = {}
+            for key in rows:
+                matrices[key] = csr_matrix(
+                    (
+                        np.ones(len(rows[key]), dtype=np.int64),
+                        (rows[key], cols[key]),
+                    ),
+                    shape=shape,
+                )
+
+            incidence = matrices["reactants"] + matrices["products"]
+
+            d_matrix = matrices["reactants"] - matrices["products"]
+            d_a = d_matrix @ a
+            d_z = d_matrix @ z + non_nuclide[:, 0]
+
+            self.stoichiometry = {
+                "reactions": table["reactions"],
+                "reaction index": table["index"],
+                "species": species,
+                "species index": species_index,
+                "reactants": matrices["reactants"],
+                "products": matrices["products"],
+                "incidence": incidence,
+                "species reactions": incidence.T.tocsr(),
+                "conserved": (d_a == 0)
+                & (d_z == 0)
+                & np.all(non_nuclide[:, 1:] == 0, axis=1),
+                "positron emission": positron_emission,
+            }
+
+        return self.stoichiometry
+
+    def get_valid_reaction_mask(self, nuc_xpath=""):
+        """Method to determine which reactions in the network are valid for a set of nuclides.
+
+        Args:
+            ``nuc_xpath`` (:obj:`str`, optional):  An XPath expression to select nuclides.  Default is all nuclides.
+
+        Returns:
+            A :obj:`numpy.array` of :obj:`bool` with value True for the reactions that are valid and False for those that are not.  The array is ordered as the *reactions* entry of :meth:`get_stoichiometry`.
+
+        """
+
+        result = self.valid_reaction_masks.get(nuc_xpath)
+
+        if result is None:
+            stoichiometry = self.get_stoichiometry()
+            species_index = stoichiometry["species index"]
+
+            outside = np.ones(len(species_index), dtype=np.int64)
+            for sp in self.get_nuclides(nuc_xpath=nuc_xpath):
+                if sp in species_index:
+                    outside[species_index[sp]] = 0
+
+            result = stoichiometry["conserved"] & (
+                stoichiometry["incidence"] @ outside == 0
+            )
+            self.valid_reaction_masks[nuc_xpath] = result
+
+        return result
 
     def is_valid_reaction(self, name, nuc_xpath=""):
         """Method to determine a reaction is valid in the network.
@@ -173,18 +464,13 @@ class Net(wn.Nuc, wr.Reac):
 
         """
 
-        nuclides = self.get_nuclides(nuc_xpath=nuc_xpath)
-        reaction = self.get_reactions()[name]
+        index = self.get_stoichiometry()["reaction index"]
 
-        if not self._obeys_conservation_laws(nuclides, reaction):
-            return False
+        return bool(self.get_valid_reaction_mask(nuc_xpath)[index[name]])
 
-        for sp in reaction.nuclide_reactants + reaction.nuclide_products:
-            if sp not in nuclides:
-                return False
-        return True
-
-    def compute_rates_for_reaction(self, name, t9, user_funcs=""):
+    def compute_rates_for_reaction(
+        self, name, t9, user_funcs="", forward=None
+    ):
         """Method to compute the forward and reverse rates for a valid reaction.
 
         Args:
@@ -192,7 +478,9 @@ class Net(wn.Nuc, wr.Reac):
 
             ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the rates.
 
-            ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined functions associated with a user_rate key.
+            ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined functions associated with a user_rate key.  A function marked with :func:`wnnet.rates.batch_user_rate` is called with a one-element array of temperatures and no zones.
+
+            ``forward`` (:obj:`float`, optional): The forward rate, if already known, for example, from :meth:`compute_user_rates`.  Default is to compute it.
 
         Returns:
             A two-element :obj:`tuple` with the first element being the forward rate and the second element being the reverse rate.  If the reaction is not valid, returns None.
@@ -203,9 +491,21 @@ class Net(wn.Nuc, wr.Reac):
             return None
 
         reaction = self.get_reactions()[name]
-        forward = reaction.compute_rate(t9, user_funcs=user_funcs)
 
-        if self.is_weak_reaction(name):
+        if forward is None:
+            if self.rate_table is not None:
+                rates = self.rate_table.get_rates(name, t9)
+                if rates is not None:
+                    return rates
+
+            forward = reaction.compute_rate(
+                t9, user_funcs=_get_scalar_user_funcs(user_funcs)
+            )
+
+        table = self.get_reaction_table()
+        i = table["index"][name]
+
+        if table["weak"][i]:
             return (forward, 0)
 
         d_exp = 0
@@ -221,10 +521,17 @@ class Net(wn.Nuc, wr.Reac):
         if d_exp > 300.0:
             return (0, 0)
 
-        tup = self.compute_reaction_duplicate_factors(name)
-
-        return (forward, np.exp(d_exp) * (tup[1] / tup[0]) * forward)
+        return (
+            forward,
+            np.exp(d_exp)
+            * (
+                table["reverse duplicate factor"][i]
+                / table["forward duplicate factor"][i]
+            )
+            * forward,
+        )
 
+    @wi.timed("rates")
     def compute_rates(self, t9, nuc_xpath="", reac_xpath="", user_funcs=""):
         """Method to compute the forward and reverse rates for valid reactions in a network.
 
@@ -235,7 +542,7 @@ class Net(wn.Nuc, wr.Reac):
 
             ``reac_xpath`` (:obj:`str`, optional):  An XPath expression to select reactions.  Default is all reactions.
 
-            ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined functions associated with a user_rate key.
+            ``user_funcs`` (:obj:`dict`, optional): A dictionary of user-defined functions associated with a user_rate key.  A function marked with :func:`wnnet.rates.batch_user_rate` is called with a one-element array of temperatures and no zones.
 
         Returns:
             A :obj:`dict` containing the rates.  The key is the reaction string while the value is a two-element  :obj:`tuple` with the first element being the forward rate and the second element being the reverse rate.
@@ -246,11 +553,452 @@ class Net(wn.Nuc, wr.Reac):
             nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
         )
 
+        _user_funcs = _get_scalar_user_funcs(user_funcs)
+
         result = {}
 
         for r in v_reactions:
             result[r] = self.compute_rates_for_reaction(
-                r, t9, user_funcs=user_funcs
+                r, t9, user_funcs=_user_funcs
+            )
+
+        return result
+
+    @wi.timed("user rates")
+    def compute_user_rates(
+        self,
+        t9,
+        user_funcs,
+        zones=None,
+        nuc_xpath="",
+        reac_xpath="",
+        reactions=None,
+    ):
+        """Method to compute the forward rates of the valid reactions with user-defined rates at a set of temperatures.
+
+        A function marked with :func:`wnnet.rates.batch_user_rate` is called once per reaction with all the temperatures.  Other functions are called once per reaction and temperature with the prototype (*reaction*, *t9*), or (*reaction*, *t9*, *zone*) if *zones* is supplied.
+
+        Args:
+            ``t9`` (:obj:`numpy.array`):  The temperatures in 10\ :sup:`9` K at which to compute the rates.
+
+            ``user_funcs`` (:obj:`dict`): A dictionary of user-defined functions associated with a user_rate key.
+
+            ``zones`` (:obj:`list`, optional): A list of the `wnutils <https://wnutils.readthedocs.io>`_ zone instances corresponding to the temperatures.  Default is no zones.
+
+            ``nuc_xpath`` (:obj:`str`, optional):  An XPath expression to select nuclides.  Default is all nuclides.
+
+            ``reac_xpath`` (:obj:`str`, optional):  An XPath expression to select reactions.  Default is all reactions.
+
+            ``reactions`` (:obj:`list`, optional):  The reaction strings for which to compute the rates.  Reactions that are not selected by *nuc_xpath* and *reac_xpath* are ignored.  Default is all the selected reactions.
+
+        Returns:
+            A :obj:`dict` containing the rates.  The key is the reaction string while the value is a :obj:`numpy.array` of the forward rates at the temperatures.  Reactions whose key has no function in *user_funcs* are not included.
+
+        """
+
+        v_reactions = self.get_valid_reactions(
+            nuc_xpath=nuc_xpath, reac_xpath=reac_xpath
+        )
+
+        table = self.get_reaction_table()
+        i_user = wr.RATE_TYPES.index("user_rate")
+
+        t9 = np.asarray(t9, dtype=float)
+
+        if reactions is None:
+            reactions = v_reactions
+
+        result = {}
+
+        for r in reactions:
+            if r not in v_reactions:
+                continue
+            if table["rate type"][table["index"][r]] != i_user:
+                continue
+            reaction = v_reactions[r]
+            func = user_funcs.get(reaction.data["key"]) if user_funcs else None
+            if func is None:
+                continue
+            if wrt.is_batch_user_rate(func):
+                result[r] = np.asarray(
+                    func(reaction, t9, zones), dtype=float
+                ).reshape(t9.shape)
+            elif zones is None:
+                result[r] = np.array([func(reaction, t) for t in t9])
+            else:
+                result[r] = np.array(
+                    [func(reaction, t, zone) for t, zone in zip(t9, zones)]
+                )
+
+        return result
+
+    def _compute_data_fingerprint(self, reactions):
+        # A digest of the data the tabulated rates depend on: the rate data
+        # of the reactions and the data of the nuclides in them.
+
+        all_reactions = self.get_reactions()
+        nuclides = self.get_nuclides()
+
+        digest = hashlib.sha256()
+        species = set()
+
+        for r in reactions:
+            reaction = all_reactions[r]
+            _update_digest(digest, r)
+            _update_digest(digest, reaction.data)
+            species.update(reaction.nuclide_reactants)
+            species.update(reaction.nuclide_products)
+
+        for sp in sorted(species):
+            _update_digest(digest, sp)
+            _update_digest(digest, nuclides[sp])
+
+        return digest.hexdigest()
+
+    def _compute_tabulated_values(self, reactions, t9):
+        table = self.get_reaction_table()
+        all_reactions = self.get_reactions()
+
+        log_forward = np.zeros((len(t9), len(reactions)))
+        d_exp = np.zeros((len(t9), len(reactions)))
+
+        for i, t in enumerate(t9):
+            nse_factors = {}
+            for j, r in enumerate(reactions):
+                reaction = all_reactions[r]
+                forward = reaction.compute_rate(t)
+                log_forward[i, j] = np.log(forward) if forward > 0 else np.nan
+                if table["weak"][table["index"][r]]:
+                    continue
+                for sp in (
+                    reaction.nuclide_reactants + reaction.nuclide_products
+                ):
+                    if sp not in nse_factors:
+                        nse_factors[sp] = self._compute_NSE_factor(sp, t, 1.0)
+                for sp in reaction.nuclide_reactants:
+                    d_exp[i, j] += nse_factors[sp]
+                for sp in reaction.nuclide_products:
+                    d_exp[i, j] -= nse_factors[sp]
+
+        return log_forward, d_exp
+
+    @wi.timed("rate table")
+    def create_rate_table(
+        self,
+        t9_min=1.0e-2,
+        t9_max=10.0,
+        n_points=65,
+        max_error=1.0e-3,
+        max_points=4097,
+        file=None,
+    ):
+        """Method to tabulate the forward and reverse rates of the valid reactions on a grid in log t9.
+
+        The grid is evenly spaced in log t9 and is refined by halving its spacing until the maximum relative interpolation error of the rates, estimated at the midpoints between grid points, is below *max_error* or the grid would exceed *max_points*.  If the grid reaches *max_points* before the error is below *max_error*, a :obj:`RuntimeWarning` is issued.  Reactions with user-defined rates or with rates that are not positive on the grid are not tabulated and are always evaluated directly.  The table is used by :meth:`compute_rates_for_reaction` and :meth:`compute_rates` once it is set with :meth:`set_rate_table`.
+
+        Args:
+            ``t9_min`` (:obj:`float`, optional):  The lowest temperature (in 10\ :sup:`9` K) in the table.  Default is 0.01.
+
+            ``t9_max`` (:obj:`float`, optional):  The highest temperature (in 10\ :sup:`9` K) in the table.  Default is 10.
+
+            ``n_points`` (:obj:`int`, optional):  The number of grid points to start with.  Default is 65.
+
+            ``max_error`` (:obj:`float`, optional):  The target maximum relative interpolation error.  Default is 1.e-3.
+
+            ``max_points`` (:obj:`int`, optional):  The maximum number of grid points.  Default is 4097.
+
+            ``file`` (:obj:`str`, optional):  The name of a *.npz* file in which to store the table.  If the file exists and holds a table for the same reactions, nuclide and reaction data, and temperature range whose stored maximum interpolation error is no larger than *max_error*, the table is read from it instead of being computed.  Otherwise the table is computed and the file is overwritten.  Default is no file.
+
+        Returns:
+            A :obj:`wnnet.rates.Rate_Table`.  Its *max_error* attribute gives the maximum relative interpolation error found.
+
+        """
+
+        reactions = list(self.get_valid_reactions().keys())
+        fingerprint = self._compute_data_fingerprint(reactions)
+
+        if file is not None:
+            if not file.endswith(".npz"):
+                file += ".npz"
+            if os.path.exists(file):
+                rate_table = wrt.read_rate_table(file)
+                if (
+                    rate_table.reactions == reactions
+                    and rate_table.fingerprint == fingerprint
+                    and rate_table.get_temperature_range() == (t9_min, t9_max)
+                    and rate_table.max_error <= max_error
+                ):
+                    return rate_table
+
+        table = self.get_reaction_table()
+        index = [table["index"][r] for r in reactions]
+
+        user = np.array(
+            [
+                wr.RATE_TYPES[table["rate type"][i]] == "user_rate"
+                for i in index
+            ],
+            dtype=bool,
+        )
+        reverse_factor = np.where(
+            table["weak"][index],
+            0.0,
+            table["reverse duplicate factor"][index]
+            / table["forward duplicate factor"][index],
+        )
+
+        tabulated = [r for j, r in enumerate(reactions) if not user[j]]
+
+        t9 = np.geomspace(t9_min, t9_max, n_points)
+        log_forward = np.zeros((n_points, len(reactions)))
+        d_exp = np.zeros((n_points, len(reactions)))
+        log_forward[:, ~user], d_exp[:, ~user] = (
+            self._compute_tabulated_values(tabulated, t9)
+        )
+
+        while True:
+            t9_mid = np.sqrt(t9[:-1] * t9[1:])
+            log_forward_mid = np.zeros((len(t9_mid), len(reactions)))
+            d_exp_mid = np.zeros((len(t9_mid), len(reactions)))
+            log_forward_mid[:, ~user], d_exp_mid[:, ~user] = (
+                self._compute_tabulated_values(tabulated, t9_mid)
+            )
+
+            direct = (
+                user
+                | np.isnan(log_forward).any(axis=0)
+                | np.isnan(log_forward_mid).any(axis=0)
+            )
+            log_forward[:, direct] = 0
+            log_forward_mid[:, direct] = 0
+
+            rate_table = wrt.Rate_Table(
+                reactions,
+                t9,
+                log_forward,
+                d_exp,
+                reverse_factor,
+                direct,
+                0.0,
+                fingerprint,
+            )
+
+            values = rate_table.interpolator(np.log(t9_mid))
+            d_forward = values[:, : len(reactions)] - log_forward_mid
+            d_reverse = d_forward + values[:, len(reactions) :] - d_exp_mid
+            d_forward[d_exp_mid > 300.0] = 0
+            d_reverse[(np.abs(d_exp_mid) > 300.0) | (reverse_factor == 0)] = 0
+            errors = np.maximum(
+                np.abs(np.expm1(d_forward)), np.abs(np.expm1(d_reverse))
+            )
+            rate_table.max_error = float(errors[:, ~direct].max(initial=0.0))
+
+            if (
+                rate_table.max_error <= max_error
+                or 2 * len(t9) - 1 > max_points
+            ):
+                break
+
+            t9 = np.insert(t9, np.arange(1, len(t9)), t9_mid)
+            log_forward = np.insert(
+                log_forward,
+                np.arange(1, len(log_forward)),
+                log_forward_mid,
+                axis=0,
+            )
+            d_exp = np.insert(
+                d_exp, np.arange(1, len(d_exp)), d_exp_mid, axis=0
+            )
+
+        if rate_table.max_error > max_error:
+            # The stack level skips the timing wrapper to reach the caller.
+            warnings.warn(
+                f"Rate table error {rate_table.max_error:g} exceeds the "
+                f"requested {max_error:g} with {len(t9)} grid points; "
+                "increase max_points or loosen max_error.",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+
+        if file is not None:
+            rate_table.write(file)
+
+        return rate_table
+
+    def set_rate_table(self, rate_table):
+        """Method to set the rate table used to compute rates.
+
+        Args:
+            ``rate_table`` (:obj:`wnnet.rates.Rate_Table`): The table, usually from :meth:`create_rate_table`.  Rates for reactions not in the table, for reactions evaluated directly, and at temperatures outside the range of the table are computed directly.  None stops the use of a table.
+
+        Returns:
+            On successful return, the table has been set.
+
+        """
+
+        self.rate_table = rate_table
+
+    @wi.timed("topology")
+    def get_topology(self, nuc_xpath="", reac_xpath="", direction="both"):
+        """Method to retrieve the topology (the links among species) of the network.
+
+        The topology is computed once for each set of arguments and then stored.
+
+        Args:
+            ``nuc_xpath`` (:obj:`str`, optional):  An XPath expression to select the induced subset of nuclides.  Default is all nuclides.
+
+            ``reac_xpath`` (:obj:`str`, optional):  An XPath expression to select reactions.  Default is all reactions.
+
+            ``direction`` (:obj:`str`, optional): A string indicting the reaction directions to include.  Allowed values are `forward`, from reactants to products, `reverse`, from products to reactants for non-weak reactions, and `both` (the default, which includes both `forward` and `reverse`).
+
+        Returns:
+            A :obj:`wnnet.topology.Topology` giving the links among species.
+
+        """
+
+        assert (
+            direction == "forward"
+            or direction == "reverse"
+            or direction == "both"
+        )
+
+        key = (nuc_xpath, reac_xpath, direction)
+
+        result = self.topologies.get(key)
+
+        if result is None:
+            links = None
+            for k in self.topologies.keys():
+                if k[1:] == key[1:]:
+                    links = self.topologies[k]
+                    break
+
+            if links is not None:
+                species = links.species
+                n_nuclides = links.n_nuclides
+                reactions = links.reactions
+                source = links.source
+                target = links.target
+                reaction = links.reaction
+                species_index = links.species_index
+            else:
+                (
+                    species,
+                    n_nuclides,
+                    reactions,
+                    source,
+                    target,
+                    reaction,
+                ) = self._compute_topology_links(reac_xpath, direction)
+                species_index = {sp: i for i, sp in enumerate(species)}
+
+            subset = np.array(
+                [
+                    species_index[sp]
+                    for sp in self.get_nuclides(nuc_xpath=nuc_xpath)
+                    if sp in species_index
+                ],
+                dtype=np.int64,
+            )
+
+            result = wt.Topology(
+                species,
+                n_nuclides,
+                reactions,
+                source,
+                target,
+                reaction,
+                subset,
             )
+            self.topologies[key] = result
 
         return result
+
+    def _compute_topology_links(self, reac_xpath, direction):
+        species = list(self.get_nuclides().keys())
+        n_nuclides = len(species)
+        species_index = {sp: i for i, sp in enumerate(species)}
+
+        def get_index(sp):
+            if sp not in species_index:
+                species_index[sp] = len(species)
+                species.append(sp)
+            return species_index[sp]
+
+        reactions = self.get_reactions(reac_xpath=reac_xpath)
+        table = self.get_reaction_table()
+
+        source = []
+        target = []
+        reaction = []
+
+        for i, r in enumerate(reactions):
+            reactants = [
+                get_index(sp) for sp in reactions[r].nuclide_reactants
+            ]
+            products = [get_index(sp) for sp in reactions[r].nuclide_products]
+
+            if direction == "forward" or direction == "both":
+                for reactant in reactants:
+                    for product in products:
+                        source.append(reactant)
+                        target.append(product)
+                        reaction.append(i)
+
+            if not table["weak"][table["index"][r]] and (
+                direction == "reverse" or direction == "both"
+            ):
+                for product in products:
+                    for reactant in reactants:
+                        source.append(product)
+                        target.append(reactant)
+                        reaction.append(i)
+
+        return (
+            species,
+            n_nuclides,
+            list(reactions.keys()),
+            np.array(source, dtype=np.int64),
+            np.array(target, dtype=np.int64),
+            np.array(reaction, dtype=np.int64),
+        )
+
+
+def _update_digest(digest, value):
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=str):
+            _update_digest(digest, key)
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, np.ndarray):
+        digest.update(str(value.dtype).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b";")
+
+
+def _get_scalar_user_funcs(user_funcs):
+    # Batch functions are called with a one-element temperature array and
+    # no zones so that they can be used where a single rate is needed.
+
+    if not user_funcs or not any(
+        wrt.is_batch_user_rate(func) for func in user_funcs.values()
+    ):
+        return user_funcs
+
+    result = {}
+    for key, func in user_funcs.items():
+        if wrt.is_batch_user_rate(func):
+            result[key] = lambda reaction, t9, func=func: float(
+                np.asarray(func(reaction, np.array([t9]), None)).reshape(-1)[0]
+            )
+        else:
+            result[key] = func
+    return result
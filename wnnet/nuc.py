@@ -3,7 +3,11 @@
 import wnutils.xml as wx
 import numpy as np
 import wnnet.consts as wc
-from scipy.interpolate import interp1d
+import wnnet.cache as wca
+import wnnet.instrument as wi
+
+#: The groups of nuclides available from :meth:`Nuc.get_projection_matrix`: elements (*z*), mass chains (*a*), and isotones (*n*).
+GROUPS = ("z", "a", "n")
 
 
 class Nuc:
@@ -14,12 +18,17 @@ class Nuc:
 
         ``nuc_xpath`` (:obj:`str`, optional): An XPath expression to select nuclides.  Default is all nuclides.
 
+        ``share_selections`` (:obj:`bool`, optional): Boolean determining whether XPath selections of nuclides should only resolve the names of the selected nuclides and share the data already read for the nuclides selected at construction (True) or read the data anew for each selection (False).  Default is False.
+
     """
 
-    def __init__(self, file, nuc_xpath=""):
+    @wi.timed("nuclide data")
+    def __init__(self, file, nuc_xpath="", share_selections=False):
         self.xml = wx.Xml(file)
-        self.nuclides = {}
+        self.share_selections = share_selections
+        self.nuclides = wca.Selection_Cache()
         self.nuclides[""] = self.xml.get_nuclide_data(nuc_xpath=nuc_xpath)
+        self.projections = wca.LRU_Cache()
 
     def get_nuclides(self, nuc_xpath=""):
         """Method to return a collection of nuclides.
@@ -32,11 +41,37 @@ class Nuc:
 
         """
 
-        if nuc_xpath not in self.nuclides:
-            self.nuclides[nuc_xpath] = self.xml.get_nuclide_data(
-                nuc_xpath=nuc_xpath
-            )
-        return self.nuclides[nuc_xpath]
+        result = self.nuclides.get(nuc_xpath)
+        if result is None:
+            if self.share_selections:
+                self.nuclides[nuc_xpath] = self._get_shared_nuclides(nuc_xpath)
+            else:
+                self.nuclides[nuc_xpath] = self.xml.get_nuclide_data(
+                    nuc_xpath=nuc_xpath
+                )
+            result = self.nuclides[nuc_xpath]
+        return result
+
+    def _get_selected_nuclide_names(self, nuc_xpath):
+        result = []
+        for node in self.xml._root.xpath("//nuclear_data/nuclide" + nuc_xpath):
+            z = int(node.findtext("z"))
+            a = int(node.findtext("a"))
+            states = node.findall("states/state")
+            if not states:
+                states = [node]
+            for state in states:
+                result.append(
+                    self.xml.create_nuclide_name(z, a, state.get("id", ""))
+                )
+        return result
+
+    def _get_shared_nuclides(self, nuc_xpath):
+        base = self.nuclides[""]
+        names = self._get_selected_nuclide_names(nuc_xpath)
+        if all(name in base for name in names):
+            return {name: base[name] for name in names}
+        return self.xml.get_nuclide_data(nuc_xpath=nuc_xpath)
 
     def compute_nuclear_partition_function(self, name, t9):
         """Method to compute the nuclear partition function for a species.
@@ -68,6 +103,8 @@ class Nuc:
         elif t9 > t[len(t) - 1]:
             return np.power(10.0, lg[len(t) - 1])
 
+        from scipy.interpolate import interp1d
+
         if len(t) <= 2:
             f = interp1d(t, lg, kind="linear")
             return np.power(10.0, f(t9))
@@ -130,6 +167,51 @@ class Nuc:
             - nuclide["mass excess"]
         )
 
+    def get_projection_matrix(self, group="z", nuc_xpath=""):
+        """Method to return a sparse matrix projecting species onto groups of species with equal atomic number, mass number, or neutron number.
+
+        The matrix is computed once for each set of arguments and then stored.
+
+        Args:
+            ``group`` (:obj:`str`, optional): A string giving the group, one of :data:`GROUPS`.  For *z*, the groups are the elements (isotopic chains); for *a*, the mass chains; and for *n*, the isotones.  Default is *z*.
+
+            ``nuc_xpath`` (:obj:`str`, optional): An XPath expression to select the nuclides.  Default is all species.
+
+        Returns:
+            A :obj:`dict` with two entries.  The entry *groups* is a :obj:`numpy.array` giving the sorted values of the atomic, mass, or neutron number of the groups.  The entry *matrix* is a `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ with shape (number of nuclides, number of groups) with a one in the column of the group of each nuclide (row).  The rows are in the order of :meth:`get_nuclides`.
+
+        """
+
+        assert group in GROUPS
+
+        key = (group, nuc_xpath)
+
+        result = self.projections.get(key)
+
+        if result is None:
+            from scipy.sparse import csr_matrix
+
+            nuclides = self.get_nuclides(nuc_xpath=nuc_xpath)
+            z = np.array([nuclides[sp]["z"] for sp in nuclides], dtype=np.int_)
+            a = np.array([nuclides[sp]["a"] for sp in nuclides], dtype=np.int_)
+            values = {"z": z, "a": a, "n": a - z}[group]
+
+            groups, columns = np.unique(values, return_inverse=True)
+
+            result = {
+                "groups": groups,
+                "matrix": csr_matrix(
+                    (
+                        np.ones(len(values)),
+                        (np.arange(len(values)), columns),
+                    ),
+                    shape=(len(values), len(groups)),
+                ),
+            }
+            self.projections[key] = result
+
+        return result
+
     def _compute_NSE_factor(self, name, t9, rho):
         return np.log(self.compute_quantum_abundance(name, t9, rho)) + (
             (self.compute_binding_energy(name) * wc.MeV_to_ergs)
@@ -0,0 +1,199 @@
+"""This module handles tables of reaction rates tabulated in temperature for fast repeated evaluation and user-defined rate functions that evaluate many temperatures at once."""
+
+import numpy as np
+
+
+class Rate_Table:
+    """A class for storing forward and reverse rates tabulated on a grid in the logarithm of the temperature.
+
+    The table stores the logarithm of the forward rate and the exponent of the reverse ratio of each reaction and interpolates them with a monotone (PCHIP) interpolant, so the rates for all reactions at a temperature come from a single vectorized lookup.  Instances are usually obtained from :meth:`wnnet.net.Net.create_rate_table`.
+
+    Args:
+        ``reactions`` (:obj:`list`): A list of the reaction strings.
+
+        ``t9`` (:obj:`numpy.array`): The temperatures (in 10\ :sup:`9` K) of the grid.
+
+        ``log_forward`` (:obj:`numpy.array`): A two-dimensional array giving the natural logarithm of the forward rate of each reaction (columns) at each grid temperature (rows).
+
+        ``reverse_exponent`` (:obj:`numpy.array`): A two-dimensional array giving the exponent of the reverse ratio of each reaction (columns) at each grid temperature (rows).
+
+        ``reverse_factor`` (:obj:`numpy.array`): An array giving the ratio of the reverse to forward duplicate factors for each reaction, zero for weak reactions.
+
+        ``direct`` (:obj:`numpy.array`): A boolean array that is True for reactions whose rates are not tabulated and must be evaluated directly.
+
+        ``max_error`` (:obj:`float`): The maximum relative interpolation error of the rates found in building the table.
+
+        ``fingerprint`` (:obj:`str`, optional): A fingerprint of the nuclide and reaction data from which the table was built.  Default is the empty string.
+
+    """
+
+    def __init__(
+        self,
+        reactions,
+        t9,
+        log_forward,
+        reverse_exponent,
+        reverse_factor,
+        direct,
+        max_error,
+        fingerprint="",
+    ):
+        self.reactions = list(reactions)
+        self.t9 = t9
+        self.log_forward = log_forward
+        self.reverse_exponent = reverse_exponent
+        self.reverse_factor = reverse_factor
+        self.direct = direct
+        self.max_error = max_error
+        self.fingerprint = fingerprint
+        self.index = {r: i for i, r in enumerate(self.reactions)}
+
+        from scipy.interpolate import PchipInterpolator
+
+        self.interpolator = PchipInterpolator(
+            np.log(t9), np.hstack((log_forward, reverse_exponent)), axis=0
+        )
+        self.last_t9 = None
+        self.last_rates = None
+
+    def get_temperature_range(self):
+        """Method to return the temperature range of the table.
+
+        Returns:
+            A two-element :obj:`tuple` giving the lowest and highest temperature (in 10\ :sup:`9` K) in the table.
+
+        """
+
+        return (float(self.t9[0]), float(self.t9[-1]))
+
+    def compute_rates(self, t9):
+        """Method to interpolate the forward and reverse rates of all reactions in the table.
+
+        The result for the last temperature is stored, so repeated calls at the same temperature do not interpolate again.
+
+        Args:
+            ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the rates.  It must lie within the range of the table.
+
+        Returns:
+            A two-element :obj:`tuple` of :obj:`numpy.array` giving the forward and reverse rates of the reactions in table order.  The entries for reactions that must be evaluated directly are NaN.
+
+        """
+
+        if t9 != self.last_t9:
+            n = len(self.reactions)
+            values = self.interpolator(np.log(t9))
+            d_exp = values[n:]
+            forward = np.exp(values[:n])
+            forward[d_exp > 300.0] = 0
+            reverse = (
+                np.exp(np.clip(d_exp, -300.0, 300.0))
+                * self.reverse_factor
+                * forward
+            )
+            reverse[d_exp < -300.0] = 0
+            forward[self.direct] = np.nan
+            reverse[self.direct] = np.nan
+            self.last_t9 = t9
+            self.last_rates = (forward, reverse)
+
+        return self.last_rates
+
+    def get_rates(self, name, t9):
+        """Method to retrieve the interpolated forward and reverse rates for a reaction.
+
+        Args:
+            ``name`` (:obj:`str`):  A string giving the reaction.
+
+            ``t9`` (:obj:`float`):  The temperature in 10\ :sup:`9` K at which to compute the rates.
+
+        Returns:
+            A two-element :obj:`tuple` with the first element being the forward rate and the second element being the reverse rate.  If the reaction is not tabulated, must be evaluated directly, or *t9* lies outside the range of the table, returns None.
+
+        """
+
+        i = self.index.get(name)
+
+        if i is None or self.direct[i] or not self.t9[0] <= t9 <= self.t9[-1]:
+            return None
+
+        forward, reverse = self.compute_rates(t9)
+
+        return (float(forward[i]), float(reverse[i]))
+
+    def write(self, file):
+        """Method to write the table to a file.
+
+        Args:
+            ``file`` (:obj:`str`): A string giving the name of the output file.  The file is written in `numpy .npz format <https://numpy.org/doc/stable/reference/generated/numpy.savez.html>`_, and the extension *.npz* is added if not present.
+
+        Returns:
+            On successful return, the table has been written to the file.
+
+        """
+
+        np.savez(
+            file,
+            reactions=np.array(self.reactions, dtype=str),
+            t9=self.t9,
+            log_forward=self.log_forward,
+            reverse_exponent=self.reverse_exponent,
+            reverse_factor=self.reverse_factor,
+            direct=self.direct,
+            max_error=self.max_error,
+            fingerprint=self.fingerprint,
+        )
+
+
+def read_rate_table(file):
+    """A routine to read a rate table from a file.
+
+    Args:
+        ``file`` (:obj:`str`): A string giving the name of a file written by :meth:`wnnet.rates.Rate_Table.write`.
+
+    Returns:
+        A :obj:`wnnet.rates.Rate_Table`.
+
+    """
+
+    with np.load(file) as data:
+        return Rate_Table(
+            data["reactions"].tolist(),
+            data["t9"],
+            data["log_forward"],
+            data["reverse_exponent"],
+            data["reverse_factor"],
+            data["direct"],
+            float(data["max_error"]),
+            str(data["fingerprint"]) if "fingerprint" in data else "",
+        )
+
+
+def batch_user_rate(func):
+    """A decorator marking a user-defined rate function as following the batch protocol.
+
+    A batch function has the prototype (*reaction*, *t9*, *zones*), where *reaction* is a `wnutils <https://wnutils.readthedocs.io>`_ reaction instance, *t9* is a :obj:`numpy.array` of temperatures in billions of Kelvin, and *zones* is a :obj:`list` of the `wnutils <https://wnutils.readthedocs.io>`_ zone instances corresponding to the temperatures (or None if there are no zones).  It returns a :obj:`numpy.array` of the rates at the temperatures.  Functions without the decorator follow the scalar protocol and are called once per temperature.  Routines that need the rate at a single temperature, such as :meth:`wnnet.net.Net.compute_rates` and :meth:`wnnet.flows.compute_flows`, call a batch function with a one-element array and no zones.
+
+    Args:
+        ``func``: The user-defined rate function.
+
+    Returns:
+        The function, marked as following the batch protocol.
+
+    """
+
+    func.batch_user_rate = True
+    return func
+
+
+def is_batch_user_rate(func):
+    """A routine to determine whether a user-defined rate function follows the batch protocol.
+
+    Args:
+        ``func``: The user-defined rate function.
+
+    Returns:
+        A :obj:`bool` that is True if the function was marked with :func:`batch_user_rate` and False if not.
+
+    """
+
+    return getattr(func, "batch_user_rate", False)
@@ -1,8 +1,13 @@
 """This module handles `webnucleo <https://webnucleo.readthedocs.io>`_ collections of reactions."""
 
+import math
 import wnutils.xml as wx
 import numpy as np
-from scipy.interpolate import interp1d
+import wnnet.cache as wca
+import wnnet.instrument as wi
+
+#: The rate types, in the order of their codes in the reaction table.
+RATE_TYPES = ("single_rate", "rate_table", "non_smoker_fit", "user_rate")
 
 
 class Reac:
@@ -13,14 +18,20 @@ class Reac:
 
         ``reac_xpath`` (:obj:`str`, optional):  An XPath expression to select reactions.  Default is all reactions.
 
+        ``share_selections`` (:obj:`bool`, optional): Boolean determining whether XPath selections of reactions should only resolve the strings of the selected reactions and share the data read once for all reactions (True) or read the data anew for each selection (False).  Default is False.
+
     """
 
-    def __init__(self, file, reac_xpath=""):
+    @wi.timed("reaction data")
+    def __init__(self, file, reac_xpath="", share_selections=False):
         self.xml = wx.Xml(file)
-        self.reactions = {}
-        self.reactions[reac_xpath] = self.xml.get_reaction_data(
-            reac_xpath=reac_xpath
+        self.share_selections = share_selections
+        self.reaction_table = None
+        self.reaction_table_source = None
+        self.reactions = wca.Selection_Cache(
+            loader=lambda: self.xml.get_reaction_data(reac_xpath="")
         )
+        self.get_reactions(reac_xpath=reac_xpath)
 
     def get_reactions(self, reac_xpath=""):
         """Method to return a collection of reactions.
@@ -33,11 +44,35 @@ class Reac:
 
         """
 
-        if reac_xpath not in self.reactions:
-            self.reactions[reac_xpath] = self.xml.get_reaction_data(
-                reac_xpath=reac_xpath
+        result = self.reactions.get(reac_xpath)
+        if result is None:
+            if self.share_selections and reac_xpath:
+                self.reactions[reac_xpath] = self._get_shared_reactions(
+                    reac_xpath
+                )
+            else:
+                self.reactions[reac_xpath] = self.xml.get_reaction_data(
+                    reac_xpath=reac_xpath
+                )
+            result = self.reactions[reac_xpath]
+        return result
+
+    def _get_selected_reaction_strings(self, reac_xpath):
+        result = []
+        for node in self.xml._root.xpath(
+            "//reaction_data/reaction" + reac_xpath
+        ):
+            result.append(
+                " + ".join(r.text for r in node.xpath("reactant"))
+                + " -> "
+                + " + ".join(p.text for p in node.xpath("product"))
             )
-        return self.reactions[reac_xpath]
+        return result
+
+    def _get_shared_reactions(self, reac_xpath):
+        base = self.get_reactions()
+        names = self._get_selected_reaction_strings(reac_xpath)
+        return {name: base[name] for name in names}
 
     def _compute_duplicate_factor(self, elements):
         dict = {}
@@ -48,9 +83,68 @@ class Reac:
                 dict[sp] = 1
         result = 1
         for sp in dict:
-            result *= np.math.factorial(dict[sp])
+            result *= math.factorial(dict[sp])
         return result
 
+    def _reset_reaction_caches(self):
+        pass
+
+    def get_reaction_table(self):
+        """Method to return a table of metadata for all reactions in the collection.
+
+        The table is computed on the first call and then stored until the collection of reactions changes.
+
+        Returns:
+            A :obj:`dict` with the entries *reactions*, a :obj:`list` of the reaction strings; *index*, a :obj:`dict` giving the position of each reaction string in the arrays; and the :obj:`numpy.array` entries *weak*, which is True for weak reactions; *forward duplicate factor* and *reverse duplicate factor*; *number of reactants* and *number of products*, the number of nuclide reactants and products; and *rate type*, the position of the reaction's rate type in :obj:`wnnet.reac.RATE_TYPES` (or -1 for other types).
+
+        """
+
+        reactions = self.get_reactions()
+
+        if self.reaction_table_source is not reactions:
+            n = len(reactions)
+            weak = np.zeros(n, dtype=bool)
+            forward_dup = np.ones(n)
+            reverse_dup = np.ones(n)
+            n_reactants = np.zeros(n, dtype=np.int64)
+            n_products = np.zeros(n, dtype=np.int64)
+            rate_type = np.full(n, -1, dtype=np.int64)
+
+            for i, r in enumerate(reactions):
+                reaction = reactions[r]
+                for sp in reaction.reactants + reaction.products:
+                    if (
+                        "electron" in sp
+                        or "positron" in sp
+                        or "neutrino" in sp
+                    ):
+                        weak[i] = True
+                forward_dup[i] = self._compute_duplicate_factor(
+                    reaction.nuclide_reactants
+                )
+                reverse_dup[i] = self._compute_duplicate_factor(
+                    reaction.nuclide_products
+                )
+                n_reactants[i] = len(reaction.nuclide_reactants)
+                n_products[i] = len(reaction.nuclide_products)
+                if reaction.data["type"] in RATE_TYPES:
+                    rate_type[i] = RATE_TYPES.index(reaction.data["type"])
+
+            self.reaction_table = {
+                "reactions": list(reactions.keys()),
+                "index": {r: i for i, r in enumerate(reactions)},
+                "weak": weak,
+                "forward duplicate factor": forward_dup,
+                "reverse duplicate factor": reverse_dup,
+                "number of reactants": n_reactants,
+                "number of products": n_products,
+                "rate type": rate_type,
+            }
+            self.reaction_table_source = reactions
+            self._reset_reaction_caches()
+
+        return self.reaction_table
+
     def compute_reaction_duplicate_factors(self, name):
         """Method to compute the duplicate reaction element factors for a reaction.
 
@@ -62,10 +156,11 @@ class Reac:
 
         """
 
-        reaction = self.get_reactions()[name]
+        table = self.get_reaction_table()
+        i = table["index"][name]
         return (
-            self._compute_duplicate_factor(reaction.nuclide_reactants),
-            self._compute_duplicate_factor(reaction.nuclide_products),
+            int(table["forward duplicate factor"][i]),
+            int(table["reverse duplicate factor"][i]),
         )
 
     def compute_duplicate_factors(self, reac_xpath=""):
@@ -95,9 +190,5 @@ class Reac:
 
         """
 
-        reaction = self.get_reactions()[name]
-        result = False
-        for sp in reaction.reactants + reaction.products:
-            if "electron" in sp or "positron" in sp or "neutrino" in sp:
-                result = True
-        return result
+        table = self.get_reaction_table()
+        return bool(table["weak"][table["index"][name]])
@@ -0,0 +1,347 @@
+"""This module handles the topology of `webnucleo <https://webnucleo.readthedocs.io>`_ networks, that is, the links among species through reactions, stored as integer arrays."""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+import wnnet.cache as wca
+
+
+class Topology:
+    """A class for storing the links among species in a network.
+
+    Each link runs from a *source* species to a *target* species through a reaction.  The links are stored as integer arrays indexing into the species and reaction lists, and a `networkx <https://networkx.org>`_ graph is only created on request.  Reachability, connectivity, and shortest-chain queries follow only the links among species in the induced subset, and their results are stored in a least-recently-used cache.  Instances are usually obtained from :meth:`wnnet.net.Net.get_topology`.
+
+    Args:
+        ``species`` (:obj:`list`): A list of the species names.  The first *n_nuclides* entries are the nuclides in the network while any remaining entries are other species that appear in the reactions.
+
+        ``n_nuclides`` (:obj:`int`): The number of nuclides at the start of *species*.
+
+        ``reactions`` (:obj:`list`): A list of the reaction strings.
+
+        ``source`` (:obj:`numpy.array`): An integer array giving the index in *species* of the source of each link.
+
+        ``target`` (:obj:`numpy.array`): An integer array giving the index in *species* of the target of each link.
+
+        ``reaction`` (:obj:`numpy.array`): An integer array giving the index in *reactions* of the reaction of each link.
+
+        ``subset`` (:obj:`numpy.array`): An integer array giving the indices in *species* of the induced subset of species.
+
+    """
+
+    def __init__(
+        self, species, n_nuclides, reactions, source, target, reaction, subset
+    ):
+        self.species = species
+        self.n_nuclides = n_nuclides
+        self.reactions = reactions
+        self.source = source
+        self.target = target
+        self.reaction = reaction
+        self.subset = subset
+        self.species_index = {sp: i for i, sp in enumerate(species)}
+        self.adjacency = None
+        self.traversal = None
+        self.link_keys = None
+        self.link_order = None
+        self.queries = wca.LRU_Cache()
+
+    def set_cache_policy(self, max_entries=None, max_bytes=None):
+        """Method to set the eviction policy of the cache of query results.
+
+        Args:
+            ``max_entries`` (:obj:`int`, optional): The maximum number of query results to keep.  Default is no limit.
+
+            ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the query results.  Default is no limit.
+
+        Returns:
+            On successful return, the policy has been applied to the cache.
+
+        """
+
+        self.queries.set_policy(max_entries=max_entries, max_bytes=max_bytes)
+
+    def get_cache_statistics(self):
+        """Method to return the statistics of the cache of query results.
+
+        Returns:
+            A :obj:`dict` with the entry *queries*, a :obj:`dict` as returned by :meth:`wnnet.cache.LRU_Cache.get_statistics`.
+
+        """
+
+        return {"queries": self.queries.get_statistics()}
+
+    def get_number_of_species(self):
+        """Method to return the number of species in the topology.
+
+        Returns:
+            An :obj:`int` giving the number of species.
+
+        """
+
+        return len(self.species)
+
+    def get_subset_species(self):
+        """Method to return the species in the induced subset.
+
+        Returns:
+            A :obj:`list` of the names of the species in the induced subset.
+
+        """
+
+        return [self.species[i] for i in self.subset]
+
+    def get_graph(self, node_attributes=None, edge_attributes=None):
+        """Method to create a graph of the topology.
+
+        Args:
+            ``node_attributes`` (:obj:`dict`, optional):  A dictionary of attributes to apply to the nuclide nodes.
+
+            ``edge_attributes`` (:obj:`dict`, optional):  A dictionary of attributes to apply to the edges.
+
+        Returns:
+            A `networkx multidigraph <https://networkx.org/documentation/stable/reference/classes/multidigraph.html>`_ with the nuclides as nodes and an edge for each link.  Each edge has a *reaction* attribute giving the reaction string.
+
+        """
+
+        import networkx as nx
+
+        _node_attributes = node_attributes or {}
+        _edge_attributes = edge_attributes or {}
+
+        G = nx.MultiDiGraph()
+
+        G.add_nodes_from(self.species[: self.n_nuclides], **_node_attributes)
+
+        G.add_edges_from(
+            (
+                self.species[s],
+                self.species[t],
+                {"reaction": self.reactions[r], **_edge_attributes},
+            )
+            for s, t, r in zip(
+                self.source.tolist(),
+                self.target.tolist(),
+                self.reaction.tolist(),
+            )
+        )
+
+        return G
+
+    def get_adjacency_matrix(self, induced=False):
+        """Method to return the species adjacency matrix.
+
+        Args:
+            ``induced`` (:obj:`bool`, optional): Boolean determining whether to return the matrix for the induced subset of species only (True) or for all species (False).  Default is False.
+
+        Returns:
+            A `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_.  The element (*i*, *j*) gives the number of links from species *i* to species *j*.  For the induced matrix, the indices are positions in the induced subset.
+
+        """
+
+        if self.adjacency is None:
+            n = len(self.species)
+            self.adjacency = csr_matrix(
+                (
+                    np.ones(len(self.source), dtype=np.int64),
+                    (self.source, self.target),
+                ),
+                shape=(n, n),
+            )
+            self.adjacency.sum_duplicates()
+
+        if induced:
+            return self.adjacency[self.subset, :][:, self.subset]
+
+        return self.adjacency
+
+    def _get_traversal_matrix(self, reverse):
+        if self.traversal is None:
+            n = len(self.species)
+            in_subset = np.zeros(n, dtype=bool)
+            in_subset[self.subset] = True
+            links = in_subset[self.source] & in_subset[self.target]
+            forward = csr_matrix(
+                (
+                    np.ones(np.count_nonzero(links), dtype=np.int64),
+                    (self.source[links], self.target[links]),
+                ),
+                shape=(n, n),
+            )
+            forward.sum_duplicates()
+            self.traversal = (forward, forward.T.tocsr())
+        return self.traversal[1 if reverse else 0]
+
+    def _compute_distances(self, index, max_steps, reverse):
+        A = self._get_traversal_matrix(reverse)
+        distance = np.full(A.shape[0], -1, dtype=np.int64)
+        distance[index] = 0
+        frontier = np.array([index], dtype=np.int64)
+        step = 0
+        while frontier.size > 0 and (max_steps is None or step < max_steps):
+            step += 1
+            neighbors = np.unique(A[frontier].indices)
+            frontier = neighbors[distance[neighbors] < 0]
+            distance[frontier] = step
+        return distance
+
+    def _get_link_reactions(self, source, target):
+        if self.link_keys is None:
+            keys = self.source * len(self.species) + self.target
+            self.link_order = np.argsort(keys, kind="stable")
+            self.link_keys = keys[self.link_order]
+        key = source * len(self.species) + target
+        lo = np.searchsorted(self.link_keys, key, side="left")
+        hi = np.searchsorted(self.link_keys, key, side="right")
+        result = []
+        for i in self.reaction[self.link_order[lo:hi]].tolist():
+            if self.reactions[i] not in result:
+                result.append(self.reactions[i])
+        return result
+
+    def get_reachable_species(self, name, max_steps=None, reverse=False):
+        """Method to find the species reachable from a species through links.
+
+        Only links among the species in the induced subset are followed.  Results are stored, so repeated queries are not recomputed.
+
+        Args:
+            ``name`` (:obj:`str`): The name of the starting species.
+
+            ``max_steps`` (:obj:`int`, optional): The maximum number of links to follow.  Default is no limit.
+
+            ``reverse`` (:obj:`bool`, optional): Boolean determining whether to follow links backward (True), which finds the species from which the starting species can be reached, or forward (False).  Default is False.
+
+        Returns:
+            A :obj:`dict` with the names of the reachable species as keys and, as values, the minimum number of links needed to reach them.  The starting species is included with value 0.
+
+        """
+
+        key = ("reachable", name, max_steps, reverse)
+
+        result = self.queries.get(key)
+
+        if result is None:
+            distance = self._compute_distances(
+                self.species_index[name], max_steps, reverse
+            )
+            result = {
+                self.species[i]: int(distance[i])
+                for i in np.flatnonzero(distance >= 0)
+            }
+            self.queries[key] = result
+
+        return result
+
+    def get_strongly_connected_components(self):
+        """Method to find the strongly connected components of the topology.
+
+        Each species in a strongly connected component can be reached from every other species in the component.  Only the species in the induced subset and the links among them are considered.
+
+        Returns:
+            A :obj:`list` of the components, in order of decreasing size.  Each component is a :obj:`list` of species names.
+
+        """
+
+        key = ("strongly connected components",)
+
+        result = self.queries.get(key)
+
+        if result is None:
+            from scipy.sparse.csgraph import connected_components
+
+            n_components, labels = connected_components(
+                self.get_adjacency_matrix(induced=True),
+                directed=True,
+                connection="strong",
+            )
+            order = np.argsort(labels, kind="stable")
+            bounds = np.searchsorted(
+                labels[order], np.arange(n_components + 1)
+            )
+            result = [
+                [
+                    self.species[i]
+                    for i in self.subset[order[bounds[j] : bounds[j + 1]]]
+                ]
+                for j in range(n_components)
+            ]
+            result.sort(key=len, reverse=True)
+            self.queries[key] = result
+
+        return result
+
+    def get_shortest_reaction_chain(self, source, target):
+        """Method to find a shortest chain of reactions linking two species.
+
+        Only links among the species in the induced subset are followed.
+
+        Args:
+            ``source`` (:obj:`str`): The name of the starting species.
+
+            ``target`` (:obj:`str`): The name of the final species.
+
+        Returns:
+            A :obj:`list` of three-element :obj:`tuple` objects, one for each link in the chain.  The tuple elements are the *source* and *target* of the link and a :obj:`list` of the reactions that provide the link.  The list is empty if *source* and *target* are the same and None if *target* cannot be reached from *source*.
+
+        """
+
+        key = ("chain", source, target)
+
+        if key not in self.queries:
+            distance = self._compute_distances(
+                self.species_index[source], None, False
+            )
+            i_target = self.species_index[target]
+
+            chain = None
+
+            if distance[i_target] >= 0:
+                chain = []
+                reverse_adjacency = self._get_traversal_matrix(True)
+                current = i_target
+                while distance[current] > 0:
+                    candidates = reverse_adjacency[current].indices
+                    previous = candidates[
+                        distance[candidates] == distance[current] - 1
+                    ].min()
+                    chain.append(
+                        (
+                            self.species[previous],
+                            self.species[current],
+                            self._get_link_reactions(previous, current),
+                        )
+                    )
+                    current = previous
+                chain.reverse()
+
+            self.queries[key] = chain
+
+        return self.queries[key]
+
+    def get_reactions_between(self, sources, targets):
+        """Method to find the reactions that link one set of species to another.
+
+        Args:
+            ``sources`` (:obj:`list`): A list of the names of the source species, for example, an isotopic chain.
+
+            ``targets`` (:obj:`list`): A list of the names of the target species.
+
+        Returns:
+            A :obj:`list` of the reaction strings with at least one link from a species in *sources* to a species in *targets*.
+
+        """
+
+        key = ("between", tuple(sources), tuple(targets))
+
+        result = self.queries.get(key)
+
+        if result is None:
+            in_sources = np.zeros(len(self.species), dtype=bool)
+            in_targets = np.zeros(len(self.species), dtype=bool)
+            in_sources[[self.species_index[sp] for sp in sources]] = True
+            in_targets[[self.species_index[sp] for sp in targets]] = True
+            links = in_sources[self.source] & in_targets[self.target]
+            result = [
+                self.reactions[i] for i in np.unique(self.reaction[links])
+            ]
+            self.queries[key] = result
+
+        return result
@@ -1,6 +1,12 @@
 """This module handles zone data from `webnucleo <https://webnucleo.readthedocs.io>`_ files."""
 
+import numpy as np
 import wnutils.xml as wx
+import wnnet.cache as wca
+import wnnet.instrument as wi
+
+#: The numeric zone properties returned by default by :func:`get_zone_arrays`.
+ZONE_PROPERTIES = ("time", "t9", "rho", "dt")
 
 
 class Zones_Xml:
@@ -11,9 +17,11 @@ class Zones_Xml:
 
     """
 
+    @wi.timed("zone data")
     def __init__(self, file):
         self.xml = wx.Xml(file)
         self.zones = self.xml.get_zone_data()
+        self.zone_arrays = wca.LRU_Cache()
 
     def get_zones(self, zone_xpath=""):
         """Method to return zones.
@@ -30,3 +38,216 @@ class Zones_Xml:
             return self.zones
         else:
             return self.xml.get_zone_data(zone_xpath=zone_xpath)
+
+    def get_zone_arrays(
+        self, zone_xpath="", properties=ZONE_PROPERTIES, sparse=False
+    ):
+        """Method to return the numeric properties and mass fractions of zones as arrays.
+
+        The arrays are computed once for each set of arguments and then stored in a cache whose policy is set with :meth:`set_cache_policy`.
+
+        Args:
+            ``zone_xpath`` (:obj:`str`, optional):  An XPath expression to select zones.  Default is all zones.
+
+            ``properties`` (:obj:`tuple`, optional):  The names of the numeric properties to return.  Default is :data:`ZONE_PROPERTIES`.
+
+            ``sparse`` (:obj:`bool`, optional):  Boolean determining whether to return the mass fractions as a sparse matrix (True) or a dense array (False).  Default is False.
+
+        Returns:
+            A :obj:`dict` as returned by :func:`get_zone_arrays`.
+
+        """
+
+        key = (zone_xpath, tuple(properties), sparse)
+
+        result = self.zone_arrays.get(key)
+
+        if result is None:
+            result = get_zone_arrays(
+                self.get_zones(zone_xpath=zone_xpath),
+                properties=properties,
+                sparse=sparse,
+            )
+            self.zone_arrays[key] = result
+
+        return result
+
+    def set_cache_policy(self, max_entries=None, max_bytes=None):
+        """Method to set the eviction policy of the cache of zone arrays.
+
+        Args:
+            ``max_entries`` (:obj:`int`, optional): The maximum number of sets of zone arrays to keep.  Default is no limit.
+
+            ``max_bytes`` (:obj:`int`, optional): The maximum approximate memory in bytes of the stored zone arrays.  Default is no limit.
+
+        Returns:
+            On successful return, the policy has been applied to the cache.
+
+        """
+
+        self.zone_arrays.set_policy(
+            max_entries=max_entries, max_bytes=max_bytes
+        )
+
+    def get_cache_statistics(self):
+        """Method to return the statistics of the cache of zone arrays.
+
+        Returns:
+            A :obj:`dict` with the entry *zone arrays*, a :obj:`dict` as returned by :meth:`wnnet.cache.LRU_Cache.get_statistics`.
+
+        """
+
+        return {"zone arrays": self.zone_arrays.get_statistics()}
+
+
+class Zone_Abundances:
+    """A class for storing the abundances of a set of zones as a sparse matrix aligned with the species of a network.
+
+    The abundances (Y, mass fraction divided by mass number) are stored in a `scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_ with one row per zone and one column per nuclide in the network, so only the non-zero abundances take memory.  Mass fractions of species not in the network are ignored.
+
+    Args:
+        ``net``: A wnnet network.
+
+        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.
+
+    """
+
+    def __init__(self, net, zones):
+        from scipy.sparse import csr_matrix
+
+        arrays = get_zone_arrays(zones, sparse=True)
+
+        self.zones = zones
+        self.labels = arrays["zones"]
+        self.properties = arrays["properties"]
+        self.species = list(net.get_nuclides().keys())
+        self.species_index = {sp: i for i, sp in enumerate(self.species)}
+        self.zone_index = {zone: i for i, zone in enumerate(self.labels)}
+
+        columns = np.array(
+            [self.species_index.get(sp, -1) for sp in arrays["species"]],
+            dtype=np.intp,
+        )
+
+        x = arrays["mass fractions"].tocoo()
+        keep = columns[x.col] >= 0
+        self.abundances = csr_matrix(
+            (
+                x.data[keep] / arrays["a"][x.col[keep]],
+                (x.row[keep], columns[x.col[keep]]),
+            ),
+            shape=(len(self.labels), len(self.species)),
+        )
+
+    def get_number_of_zones(self):
+        """Method to return the number of zones in the store.
+
+        Returns:
+            An :obj:`int` giving the number of zones.
+
+        """
+
+        return len(self.labels)
+
+    def get_row(self, zone):
+        """Method to return the non-zero abundances of a zone.
+
+        Args:
+            ``zone``: The label of the zone.
+
+        Returns:
+            A two-element :obj:`tuple` of :obj:`numpy.array` objects giving the indices (into the network species) and the values of the non-zero abundances.  The arrays are views into the store.
+
+        """
+
+        i = self.zone_index[zone]
+        start, end = self.abundances.indptr[i], self.abundances.indptr[i + 1]
+
+        return (
+            self.abundances.indices[start:end],
+            self.abundances.data[start:end],
+        )
+
+    def get_abundances(self, zone):
+        """Method to return the abundances of a zone as a dense array.
+
+        Args:
+            ``zone``: The label of the zone.
+
+        Returns:
+            A :obj:`numpy.array` giving the abundance of each network species.
+
+        """
+
+        result = np.zeros(len(self.species))
+        indices, values = self.get_row(zone)
+        result[indices] = values
+
+        return result
+
+
+@wi.timed("zone arrays")
+def get_zone_arrays(zones, properties=ZONE_PROPERTIES, sparse=False):
+    """A routine to return the numeric properties and mass fractions of a set of zones as arrays.
+
+    Args:
+        ``zones`` (:obj:`dict`): A dictionary of `wnutils <https://wnutils.readthedocs.io>`_ *zone data*.
+
+        ``properties`` (:obj:`tuple`, optional):  The names of the numeric properties to return.  Default is :data:`ZONE_PROPERTIES`.
+
+        ``sparse`` (:obj:`bool`, optional):  Boolean determining whether to return the mass fractions as a sparse matrix (True) or a dense array (False).  Default is False.
+
+    Returns:
+        A :obj:`dict` with the entries *zones*, a :obj:`list` of the zone labels in row order; *properties*, a :obj:`dict` with the property names as keys and, as values, :obj:`numpy.array` objects giving the property in each zone (NaN where a zone lacks the property); *species*, a :obj:`list` of the names of the species with mass fractions in any zone, ordered by atomic number and then mass number; *species index*, a :obj:`dict` giving the column for each species name; *z* and *a*, :obj:`numpy.array` objects giving the atomic and mass numbers of the species; and *mass fractions*, an array with shape (number of zones, number of species) giving the mass fractions, either dense (:obj:`numpy.array`) or sparse (`scipy.sparse.csr_matrix <https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_matrix.html>`_).
+
+    """
+
+    labels = list(zones.keys())
+
+    values = {prop: np.full(len(labels), np.nan) for prop in properties}
+
+    species = {}
+    rows = []
+    cols = []
+    data = []
+
+    for i, zone in enumerate(labels):
+        props = zones[zone]["properties"]
+        for prop in properties:
+            if prop in props:
+                values[prop][i] = float(props[prop])
+        for key, x in zones[zone]["mass fractions"].items():
+            j = species.get(key)
+            if j is None:
+                j = species[key] = len(species)
+            rows.append(i)
+            cols.append(j)
+            data.append(x)
+
+    keys = sorted(species, key=lambda key: (key[1], key[2], key[0]))
+    order = np.empty(len(keys), dtype=np.intp)
+    for j, key in enumerate(keys):
+        order[species[key]] = j
+
+    rows = np.array(rows, dtype=np.intp)
+    cols = order[np.array(cols, dtype=np.intp)]
+    data = np.array(data, dtype=float)
+    shape = (len(labels), len(keys))
+
+    if sparse:
+        from scipy.sparse import csr_matrix
+
+        mass_fractions = csr_matrix((data, (rows, cols)), shape=shape)
+    else:
+        mass_fractions = np.zeros(shape)
+        mass_fractions[rows, cols] = data
+
+    return {
+        "zones": labels,
+        "properties": values,
+        "species": [key[0] for key in keys],
+        "species index": {key[0]: j for j, key in enumerate(keys)},
+        "z": np.array([key[1] for key in keys], dtype=np.int_),
+        "a": np.array([key[2] for key in keys], dtype=np.int_),
+        "mass fractions": mass_fractions,
+    }